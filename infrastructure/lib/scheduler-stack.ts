@@ -20,6 +20,8 @@ export class SchedulerStack extends cdk.Stack {
   public readonly dataTable: dynamodb.Table;
   public readonly processorLambda: lambda.Function;
   public readonly fetcherLambda: lambda.Function;
+  public readonly compactionLambda: lambda.Function;
+  public readonly rerenderLambda: lambda.Function;
   public readonly distribution: cloudfront.Distribution;
 
   constructor(scope: Construct, id: string, props: SchedulerStackProps) {
@@ -51,6 +53,8 @@ export class SchedulerStack extends cdk.Stack {
       sortKey: { name: 'SK', type: dynamodb.AttributeType.STRING },
       billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
       removalPolicy: cdk.RemovalPolicy.RETAIN,
+      // Tombstones expire; see StorageProcessor.RETENTION_DAYS (META items are pruned by compaction)
+      timeToLiveAttribute: 'expires_at',
     });
 
     // Task 1.5 - Processor Lambda (processing pipeline, triggered by S3)
@@ -70,6 +74,8 @@ export class SchedulerStack extends cdk.Stack {
 
     // Grant Processor Lambda permissions
     this.inputBucket.grantRead(this.processorLambda);
+    this.inputBucket.grantPut(this.processorLambda, 'snapshots/*'); // Oversized storage snapshots
+    this.inputBucket.grantPut(this.processorLambda, 'reports/*'); // conflicts.json (private)
     this.websiteBucket.grantReadWrite(this.processorLambda);
     this.dataTable.grantReadWriteData(this.processorLambda);
 
@@ -102,6 +108,62 @@ export class SchedulerStack extends cdk.Stack {
     });
     fetchSchedule.addTarget(new targets.LambdaFunction(this.fetcherLambda));
 
+    // Compaction Lambda (prunes old schedule versions from DynamoDB)
+    // Same code as the processor, separate entry point
+    this.compactionLambda = new lambda.Function(this, 'CompactionLambda', {
+      functionName: `goldsport-scheduler-compaction-${env}`,
+      runtime: lambda.Runtime.PYTHON_3_11,
+      handler: 'compaction.main',
+      code: lambda.Code.fromAsset('../lambda/processor'),
+      timeout: cdk.Duration.minutes(10),
+      memorySize: 256,
+      environment: {
+        DATA_TABLE: this.dataTable.tableName,
+      },
+    });
+
+    this.dataTable.grantReadWriteData(this.compactionLambda);
+    this.inputBucket.grantDelete(this.compactionLambda, 'snapshots/*');
+
+    // Daily compaction at 17:30 UTC: after the last fetch (17:00 Prague time),
+    // still on the same Prague day, so the day's hourly checkpoints are kept
+    const compactionSchedule = new events.Rule(this, 'CompactionSchedule', {
+      ruleName: `goldsport-scheduler-compaction-schedule-${env}`,
+      schedule: events.Schedule.cron({ minute: '30', hour: '17' }),
+      description: 'Compact versioned schedule history in DynamoDB',
+    });
+    compactionSchedule.addTarget(new targets.LambdaFunction(this.compactionLambda));
+
+    // Re-render Lambda (recomputes data/today.json from today's shard)
+    // Same code as the processor, separate entry point; no DynamoDB access
+    this.rerenderLambda = new lambda.Function(this, 'RerenderLambda', {
+      functionName: `goldsport-scheduler-rerender-${env}`,
+      runtime: lambda.Runtime.PYTHON_3_11,
+      handler: 'rerender.main',
+      code: lambda.Code.fromAsset('../lambda/processor'),
+      timeout: cdk.Duration.seconds(30),
+      memorySize: 256,
+      environment: {
+        WEBSITE_BUCKET: this.websiteBucket.bucketName,
+      },
+    });
+
+    // Reads the pointer, manifest and shard; writes the today view and, once
+    // a day, the rebuilt display payloads and the pointer referencing them
+    this.websiteBucket.grantRead(this.rerenderLambda, 'data/*');
+    this.websiteBucket.grantPut(this.rerenderLambda, 'data/today.json*');
+    this.websiteBucket.grantPut(this.rerenderLambda, 'data/v/display.*');
+    this.websiteBucket.grantPut(this.rerenderLambda, 'data/displays/*');  // Legacy payload copies
+    this.websiteBucket.grantPut(this.rerenderLambda, 'data/current.json');
+
+    // Every minute 05:00-17:59 UTC (covers 08:00-17:00 Prague in winter and summer)
+    const rerenderSchedule = new events.Rule(this, 'RerenderSchedule', {
+      ruleName: `goldsport-scheduler-rerender-schedule-${env}`,
+      schedule: events.Schedule.cron({ minute: '*', hour: '5-17' }),
+      description: 'Re-render current/upcoming lessons between processor runs',
+    });
+    rerenderSchedule.addTarget(new targets.LambdaFunction(this.rerenderLambda));
+
     // Task 1.6 - S3 trigger for Processor Lambda
     // Trigger on file uploads to orders/ and instructors/ prefixes
     this.inputBucket.addEventNotification(
@@ -140,7 +202,22 @@ export class SchedulerStack extends cdk.Stack {
         }),
       },
       additionalBehaviors: {
-        // Shorter cache for dynamic data
+        // Immutable content-hashed versions (listed before data/* so it matches first)
+        'data/v/*': {
+          origin: origins.S3BucketOrigin.withOriginAccessControl(this.websiteBucket),
+          viewerProtocolPolicy: cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+          cachePolicy: new cloudfront.CachePolicy(this, 'VersionCachePolicy', {
+            cachePolicyName: `goldsport-scheduler-version-cache-${env}`,
+            comment: 'Long cache for immutable schedule versions',
+            defaultTtl: cdk.Duration.days(365),
+            maxTtl: cdk.Duration.days(365),
+            minTtl: cdk.Duration.days(1),
+            enableAcceptEncodingGzip: true,
+            enableAcceptEncodingBrotli: true,
+          }),
+        },
+        // Shorter cache for dynamic data (current.json pointer, today.json
+        // view, delta feed); minTtl 0 so their max-age=5 is honoured
         'data/*': {
           origin: origins.S3BucketOrigin.withOriginAccessControl(this.websiteBucket),
           viewerProtocolPolicy: cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
@@ -149,7 +226,7 @@ export class SchedulerStack extends cdk.Stack {
             comment: 'Short cache for schedule data',
             defaultTtl: cdk.Duration.minutes(1),
             maxTtl: cdk.Duration.minutes(5),
-            minTtl: cdk.Duration.seconds(30),
+            minTtl: cdk.Duration.seconds(0),
             enableAcceptEncodingGzip: true,
             enableAcceptEncodingBrotli: true,
           }),
@@ -212,6 +289,16 @@ export class SchedulerStack extends cdk.Stack {
       description: 'Fetcher Lambda function name',
     });
 
+    new cdk.CfnOutput(this, 'CompactionLambdaName', {
+      value: this.compactionLambda.functionName,
+      description: 'Compaction Lambda function name',
+    });
+
+    new cdk.CfnOutput(this, 'RerenderLambdaName', {
+      value: this.rerenderLambda.functionName,
+      description: 'Re-render Lambda function name',
+    });
+
     new cdk.CfnOutput(this, 'DistributionId', {
       value: this.distribution.distributionId,
       description: 'CloudFront distribution ID',
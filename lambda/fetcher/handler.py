@@ -4,9 +4,9 @@ GoldSport Scheduler - Fetcher Lambda
 Fetches data from external URLs and saves to S3 input bucket.
 Triggered by EventBridge schedule (every 5 minutes).
 
-Time-based filtering:
-- 08:00-12:00 CET: Fetch on every trigger (5-min intervals)
-- 12:00-17:00 CET: Fetch only on 10-min marks (12:00, 12:10, etc.)
+Time-based filtering (Prague local time, CET/CEST):
+- 08:00-12:00: Fetch on every trigger (5-min intervals)
+- 12:00-17:00: Fetch only on 10-min marks (12:00, 12:10, etc.)
 - Outside hours: Skip
 
 Data sources configured via environment variables.
@@ -16,7 +16,8 @@ import os
 import json
 import logging
 import urllib.request
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 import boto3
 
@@ -29,36 +30,36 @@ ORDERS_URL = os.environ.get('ORDERS_URL')
 
 s3 = boto3.client('s3')
 
-# CET timezone offset (UTC+1 in winter, UTC+2 in summer)
-# This is a simplified approach - for production, consider using pytz
-CET_OFFSET = timedelta(hours=1)  # Adjust to +2 for CEST (summer)
+# Resort timezone; the same operating hours as the display client
+# (static-site/app.js CONFIG.operatingHours), so both follow the CET/CEST switch
+PRAGUE = ZoneInfo('Europe/Prague')
 
 
 def should_fetch_now() -> tuple[bool, str]:
     """
-    Check if we should fetch based on current time (CET).
+    Check if we should fetch based on the current Prague time.
 
     Returns:
         tuple: (should_fetch: bool, reason: str)
     """
-    now_utc = datetime.now(timezone.utc)
-    now_cet = now_utc + CET_OFFSET
-    hour = now_cet.hour
-    minute = now_cet.minute
+    now_local = datetime.now(PRAGUE)
+    hour = now_local.hour
+    minute = now_local.minute
+    clock = f"{hour:02d}:{minute:02d} {now_local.tzname()}"
 
     # Before 08:00 or after 17:00 - skip
     if hour < 8 or hour >= 17:
-        return False, f"Outside operating hours ({hour:02d}:{minute:02d} CET)"
+        return False, f"Outside operating hours ({clock})"
 
     # 08:00-12:00 - always fetch (peak hours, 5-min intervals)
     if hour < 12:
-        return True, f"Peak hours ({hour:02d}:{minute:02d} CET)"
+        return True, f"Peak hours ({clock})"
 
     # 12:00-17:00 - fetch only on 10-min marks
     if minute % 10 == 0:
-        return True, f"Afternoon 10-min mark ({hour:02d}:{minute:02d} CET)"
+        return True, f"Afternoon 10-min mark ({clock})"
     else:
-        return False, f"Skipping - not a 10-min mark ({hour:02d}:{minute:02d} CET)"
+        return False, f"Skipping - not a 10-min mark ({clock})"
 
 
 def fetch_url(url: str, timeout: int = 30) -> bytes:
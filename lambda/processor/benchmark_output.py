@@ -0,0 +1,101 @@
+"""
+GoldSport Scheduler - Output Size Benchmark
+
+Compares the size and serialization time of schedule.json encodings on a
+synthetic season (every date of a winter season, fully booked mornings
+and afternoons).
+
+Usage:
+    python benchmark_output.py [--dates 90] [--per-date 40] [--repeat 20]
+"""
+
+import argparse
+import gzip
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from processors.output import OutputProcessor, brotli, serialize_schedule
+
+LEVELS = ['dětská školka', 'začátečník', 'mírně pokročilý', 'pokročilý']
+GROUP_TYPES = ['privát', 'skupina']
+LOCATIONS = ['Stone bar', 'Lanovka', 'Sjezdovka A']
+LANGUAGES = ['de', 'en', 'cz', 'nl', 'pl']
+
+
+def synthetic_season(dates: int, per_date: int, first: date = date(2025, 12, 20)) -> List[Dict]:
+    """Lessons for `dates` consecutive days, `per_date` lessons each."""
+    lessons = []
+    for d in range(dates):
+        day = (first + timedelta(days=d)).strftime('%d.%m.%Y')
+        for n in range(per_date):
+            start = 8 * 60 + (n % 16) * 30
+            people = [
+                {
+                    'name': f'Child {d * per_date + n}-{p}',
+                    'language': LANGUAGES[(n + p) % len(LANGUAGES)],
+                    'sponsor': 'Te.Pe.',
+                }
+                for p in range(1 + n % 4)
+            ]
+            lessons.append({
+                'booking_id': f'{d:03d}-{n:03d}',
+                'date': day,
+                'start': f'{start // 60:02d}:{start % 60:02d}',
+                'end': f'{(start + 110) // 60:02d}:{(start + 110) % 60:02d}',
+                'level_key': LEVELS[n % len(LEVELS)],
+                'group_type_key': GROUP_TYPES[n % len(GROUP_TYPES)],
+                'location_key': LOCATIONS[n % len(LOCATIONS)],
+                'people': people,
+                'people_count': len(people),
+                'instructor': {
+                    'id': f'instructor-{n % 12}',
+                    'name': f'Instructor {n % 12}',
+                    'photo': f'assets/instructors/instructor-{n % 12}.jpg',
+                },
+                'notes': None,
+            })
+    return lessons
+
+
+def timed(fn: Callable[[], bytes], repeat: int) -> Tuple[bytes, float]:
+    """Run fn repeat times; return its result and the mean milliseconds per call."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dates', type=int, default=90)
+    parser.add_argument('--per-date', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    processor = OutputProcessor(s3_client=object())  # No uploads
+    schedule = processor._build_schedule(
+        synthetic_season(args.dates, args.per_date), {'data_sources': {}}
+    )
+    compact = serialize_schedule(schedule)
+
+    encodings = {
+        'indent=2 (before)': lambda: json.dumps(schedule, ensure_ascii=False, indent=2).encode('utf-8'),
+        'compact': lambda: serialize_schedule(schedule),
+        'compact + gzip -9': lambda: gzip.compress(serialize_schedule(schedule), compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        encodings['compact + brotli q11'] = lambda: brotli.compress(serialize_schedule(schedule), quality=11)
+
+    print(f"Synthetic season: {args.dates} dates x {args.per_date} lessons")
+    print(f"{'encoding':<24}{'bytes':>12}{'vs compact':>12}{'ms':>10}")
+    for name, fn in encodings.items():
+        body, ms = timed(fn, args.repeat)
+        print(f"{name:<24}{len(body):>12,}{len(body) / len(compact):>11.2f}x{ms:>10.2f}")
+    if brotli is None:
+        print("(brotli not installed - variant skipped)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+GoldSport Scheduler - Bulk Writer
+
+Writes items to DynamoDB with BatchWriteItem on the low-level client.
+
+- Keys are deduplicated within a batch (last write wins); DynamoDB rejects
+  batches that contain the same key twice.
+- UnprocessedItems are retried with jittered exponential backoff.
+- Concurrency adapts to throttling (AIMD): every throttled call halves the
+  number of batches allowed in flight, every run of successful calls adds
+  one back, up to max_concurrency.
+
+One writer is shared by all threads of a run; statistics are aggregated
+across them.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# DynamoDB error codes that mean "slow down and retry"
+THROTTLE_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+}
+
+
+class BulkWriteError(Exception):
+    """Items could not be written after all retries."""
+
+
+class BulkWriter:
+    """
+    Thread-safe batch writer with backoff and adaptive concurrency.
+
+    Attributes:
+        concurrency: Current number of batches allowed in flight
+    """
+
+    BATCH_SIZE = 25  # DynamoDB batch write limit
+
+    # Successful calls in a row before concurrency grows by one
+    INCREASE_AFTER = 4
+
+    def __init__(
+        self,
+        client,
+        table_name: str,
+        max_concurrency: int = 8,
+        max_retries: int = 8,
+        base_delay: float = 0.05,
+        max_delay: float = 5.0
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            client: boto3 DynamoDB client (thread-safe, shared)
+            table_name: Table to write to
+            max_concurrency: Upper bound of batches in flight
+            max_retries: Retries per batch (unprocessed items or throttling)
+            base_delay: First backoff ceiling (seconds)
+            max_delay: Backoff ceiling cap (seconds)
+        """
+        self.client = client
+        self.table_name = table_name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = self.max_concurrency
+
+        self._serializer = TypeSerializer()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._successes = 0
+        self._started: Optional[float] = None
+        self._stats = {
+            'items': 0,
+            'batch_calls': 0,
+            'retries': 0,
+            'throttles': 0,
+            'duplicates': 0,
+            'min_concurrency': self.max_concurrency,
+        }
+
+    def write(self, items: List[Dict[str, Any]]) -> int:
+        """
+        Put items (any number; split into batches of BATCH_SIZE).
+
+        Args:
+            items: Items with PK and SK
+
+        Returns:
+            Number of items written (after deduplication)
+
+        Raises:
+            BulkWriteError: If a batch is still unprocessed after max_retries
+        """
+        with self._cond:
+            if self._started is None:
+                self._started = time.monotonic()
+
+        written = 0
+        for batch in self._batches(items):
+            self._write_batch(batch)
+            written += len(batch)
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Aggregate statistics of all writes so far.
+
+        Returns:
+            Dict with items, batch_calls, retries, throttles, duplicates,
+            concurrency, min_concurrency, seconds and items_per_second
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            elapsed = time.monotonic() - self._started if self._started is not None else 0.0
+            stats['concurrency'] = self.concurrency
+        stats['seconds'] = round(elapsed, 3)
+        stats['items_per_second'] = round(stats['items'] / elapsed, 1) if elapsed > 0 else 0.0
+        return stats
+
+    def _batches(self, items: List[Dict[str, Any]]) -> List[List[Dict]]:
+        """Serialize items into put requests, deduplicating keys (last wins)."""
+        by_key: Dict[Tuple[str, str], Dict] = {}
+        for item in items:
+            key = (item['PK'], item['SK'])
+            if key in by_key:
+                by_key.pop(key)
+                with self._cond:
+                    self._stats['duplicates'] += 1
+            by_key[key] = item
+
+        serialize = self._serializer.serialize
+        requests = [
+            {'PutRequest': {'Item': {k: serialize(v) for k, v in item.items()}}}
+            for item in by_key.values()
+        ]
+        return [requests[i:i + self.BATCH_SIZE] for i in range(0, len(requests), self.BATCH_SIZE)]
+
+    def _write_batch(self, requests: List[Dict]) -> None:
+        """Write one batch, retrying unprocessed items and throttling errors."""
+        total = len(requests)
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._backoff(attempt)
+
+            self._acquire()
+            throttled = False
+            try:
+                response = self.client.batch_write_item(RequestItems={self.table_name: requests})
+                requests = response.get('UnprocessedItems', {}).get(self.table_name, [])
+                throttled = bool(requests)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in THROTTLE_ERRORS:
+                    raise
+                throttled = True
+            finally:
+                self._release(throttled)
+
+            if not requests:
+                with self._cond:
+                    self._stats['items'] += total
+                return
+
+        raise BulkWriteError(
+            f"{len(requests)} items still unprocessed after {self.max_retries} retries"
+        )
+
+    def _backoff(self, attempt: int) -> None:
+        """Sleep for a full-jitter exponential backoff."""
+        with self._cond:
+            self._stats['retries'] += 1
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        time.sleep(random.uniform(0, ceiling))
+
+    def _acquire(self) -> None:
+        """Wait for a free slot under the current concurrency limit."""
+        with self._cond:
+            while self._in_flight >= self.concurrency:
+                self._cond.wait()
+            self._in_flight += 1
+            self._stats['batch_calls'] += 1
+
+    def _release(self, throttled: bool) -> None:
+        """Free a slot and adapt concurrency (AIMD)."""
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._stats['throttles'] += 1
+                self._successes = 0
+                self.concurrency = max(1, self.concurrency // 2)
+                self._stats['min_concurrency'] = min(self._stats['min_concurrency'], self.concurrency)
+            else:
+                self._successes += 1
+                if self._successes >= self.INCREASE_AFTER and self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                    self._successes = 0
+            self._cond.notify_all()
@@ -0,0 +1,289 @@
+"""
+GoldSport Scheduler - Compaction Lambda
+
+Prunes old schedule versions from DynamoDB so SCHEDULE#{date} partitions
+stop growing with every run.
+
+Retention per date:
+- the latest version (META item)
+- for the current day: the last version of every hour (checkpoints)
+- the manifest and every LESSON item it references (never deleted)
+- the SNAPSHOT item the manifest points at (snapshot layout)
+
+A kept version keeps the LESSON items listed in its META item, plus any
+LESSON or SNAPSHOT item written in that run (tombstones, pre-manifest
+snapshots). Everything else in the partition is deleted, including the S3
+overflow objects of deleted snapshots. META items carry no TTL, so the
+versions kept here (and the one LATEST points at) never expire; only
+tombstones also expire through the expires_at TTL set by StorageProcessor.
+
+Triggered by EventBridge schedule (daily, after the last fetch of the
+operating day, so today's hourly checkpoints are kept until the next
+evening). Dates are found by key within a window around today (see
+list_dates); invoke with {"days_back": N} once to reach older partitions,
+or with {"dates": ["DD.MM.YYYY", ...]} to compact specific dates.
+"""
+
+import os
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Set
+
+import boto3
+from boto3.dynamodb.conditions import Key
+
+from processors.storage import StorageProcessor
+from time_index import epoch_minutes, local_date, to_epoch_minutes
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Environment variables (set by CDK)
+DATA_TABLE = os.environ.get('DATA_TABLE')
+
+MANIFEST_SK = StorageProcessor.MANIFEST_SK
+LATEST_SK = StorageProcessor.LATEST_SK
+
+# Past days searched for partitions by the daily run. Dates further back are
+# final (StorageProcessor skips them) and were compacted while in the window.
+DAYS_BACK = int(os.environ.get('COMPACTION_DAYS_BACK', '7'))
+
+
+def list_dates(
+    dynamodb,
+    table_name: str,
+    now: Optional[datetime] = None,
+    days_back: int = DAYS_BACK,
+    days_ahead: int = StorageProcessor.LOOKAHEAD_DAYS
+) -> List[str]:
+    """
+    Find the stored dates within a window around today, by key.
+
+    Every date written since LATEST pointers exist has a LATEST item, older
+    ones a MANIFEST; both are fetched with BatchGetItem. Past dates with
+    neither may be partitions written before manifests existed (only META
+    and LESSON items), so each of those is probed with a one-item query.
+
+    Args:
+        dynamodb: boto3 DynamoDB resource
+        table_name: Data table name
+        now: Current time (defaults to now, for testing)
+        days_back: Past days to search
+        days_ahead: Future days to search
+
+    Returns:
+        Dates in DD.MM.YYYY format, oldest first
+    """
+    now = now or datetime.now(timezone.utc)
+    today = datetime.strptime(local_date(epoch_minutes(now)), '%d.%m.%Y')
+    candidates = [
+        today + timedelta(days=offset) for offset in range(-days_back, days_ahead + 1)
+    ]
+    dates = [day.strftime('%d.%m.%Y') for day in candidates]
+
+    keys = [
+        {'PK': f'SCHEDULE#{date}', 'SK': sk} for date in dates for sk in (LATEST_SK, MANIFEST_SK)
+    ]
+    found = _batch_get_dates(dynamodb, table_name, keys)
+
+    table = dynamodb.Table(table_name)
+    for day, date in zip(candidates, dates):
+        if date not in found and day < today:
+            response = table.query(
+                KeyConditionExpression=Key('PK').eq(f'SCHEDULE#{date}'),
+                ProjectionExpression='PK',
+                Limit=1,
+            )
+            if response.get('Items'):
+                found.add(date)
+
+    return [date for date in dates if date in found]
+
+
+def _batch_get_dates(dynamodb, table_name: str, keys: List[Dict[str, str]]) -> Set[str]:
+    """BatchGetItem the given keys and return the dates of the items found."""
+    found: Set[str] = set()
+    size = StorageProcessor.BATCH_GET_SIZE
+    for i in range(0, len(keys), size):
+        request = {table_name: {'Keys': keys[i:i + size], 'ProjectionExpression': 'PK'}}
+        for attempt in range(StorageProcessor.MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(table_name, []):
+                found.add(item['PK'].split('#', 1)[1])
+            request = response.get('UnprocessedKeys') or {}
+            if not request:
+                break
+            time.sleep(StorageProcessor.RETRY_BASE_DELAY * 2 ** attempt)
+        else:
+            raise RuntimeError(f"Keys still unprocessed after {StorageProcessor.MAX_RETRIES} retries")
+    return found
+
+
+def compact_date(
+    table,
+    date: str,
+    now: Optional[datetime] = None,
+    s3_client=None
+) -> Dict[str, Any]:
+    """
+    Delete versions of one date that fall outside the retention policy.
+
+    Args:
+        table: boto3 DynamoDB Table
+        date: Date in DD.MM.YYYY format
+        now: Current time (defaults to now, for testing)
+        s3_client: Optional boto3 S3 client (deletes overflow snapshots)
+
+    Returns:
+        Dict with kept_versions, metas_deleted and lessons_deleted
+        (LESSON and SNAPSHOT items)
+    """
+    now = now or datetime.now(timezone.utc)
+    pk = f"SCHEDULE#{date}"
+
+    manifest = None
+    metas: Dict[str, Dict] = {}   # version -> META item
+    lesson_sks: List[str] = []
+    snapshots: Dict[str, Dict] = {}  # SK -> SNAPSHOT item
+
+    for item in _query_partition(table, pk):
+        sk = item['SK']
+        if sk == MANIFEST_SK:
+            manifest = item
+        elif sk.startswith('META#'):
+            metas[sk[len('META#'):]] = item
+        elif sk.startswith('LESSON#'):
+            lesson_sks.append(sk)
+        elif sk.startswith('SNAPSHOT#'):
+            snapshots[sk] = item
+
+    kept = keep_versions(list(metas), date == local_date(epoch_minutes(now)))
+
+    # LESSON items still needed by the manifest or a kept version
+    referenced: Set[str] = set()
+    for source in [manifest] + [metas[version] for version in kept]:
+        for lesson_id, entry in ((source or {}).get('lessons') or {}).items():
+            referenced.add(f"LESSON#{entry.get('version')}#{lesson_id}")
+
+    # Versions newer than the newest META may belong to a run still in progress
+    newest = max(metas) if metas else ''
+
+    stale_metas = [f'META#{version}' for version in metas if version not in kept]
+    stale_lessons = [
+        sk for sk in lesson_sks
+        if sk not in referenced
+        and sk.split('#')[1] not in kept
+        and sk.split('#')[1] <= newest
+    ]
+    stale_lessons.extend(
+        sk for sk in snapshots
+        if sk != (manifest or {}).get('snapshot_sk')
+        and sk.split('#')[1] not in kept
+        and sk.split('#')[1] <= newest
+    )
+
+    if stale_metas or stale_lessons:
+        with table.batch_writer() as batch:
+            for sk in stale_metas + stale_lessons:
+                batch.delete_item(Key={'PK': pk, 'SK': sk})
+
+        for sk in stale_lessons:
+            overflow = snapshots.get(sk, {})
+            if overflow.get('s3_key') and s3_client is not None:
+                s3_client.delete_object(Bucket=overflow['s3_bucket'], Key=overflow['s3_key'])
+
+    return {
+        'date': date,
+        'kept_versions': len(kept),
+        'metas_deleted': len(stale_metas),
+        'lessons_deleted': len(stale_lessons),
+    }
+
+
+def keep_versions(versions: List[str], is_today: bool) -> Set[str]:
+    """
+    Select the versions (run timestamps) to keep for one date.
+
+    Args:
+        versions: Version timestamps (YYYY-MM-DDTHH:MM:SSZ)
+        is_today: Whether the date is the current Prague day
+
+    Returns:
+        Latest version, plus the last version of each hour when is_today
+    """
+    if not versions:
+        return set()
+
+    kept = {max(versions)}
+
+    if is_today:
+        last_per_hour: Dict[int, str] = {}
+        for version in versions:
+            minutes = to_epoch_minutes(version)
+            if minutes is None:
+                continue
+            hour = minutes // 60
+            if version > last_per_hour.get(hour, ''):
+                last_per_hour[hour] = version
+        kept.update(last_per_hour.values())
+
+    return kept
+
+
+def _query_partition(table, pk: str) -> List[Dict]:
+    """Read SK, version maps and snapshot pointers of all items in a partition."""
+    items = []
+    kwargs = {
+        'KeyConditionExpression': Key('PK').eq(pk),
+        'ProjectionExpression': '#sk, #lessons, #snapshot, #bucket, #key',
+        'ExpressionAttributeNames': {
+            '#sk': 'SK',
+            '#lessons': 'lessons',
+            '#snapshot': 'snapshot_sk',
+            '#bucket': 's3_bucket',
+            '#key': 's3_key',
+        },
+    }
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    return items
+
+
+def main(event, context):
+    """
+    Lambda handler - compacts the versioned schedule history.
+
+    Compacts the dates listed in the event, or the stored dates within
+    the window (event days_back overrides COMPACTION_DAYS_BACK).
+    """
+    logger.info(f"Compaction event: {json.dumps(event)}")
+
+    if not DATA_TABLE:
+        logger.error("No DATA_TABLE configured")
+        return {'statusCode': 500, 'body': json.dumps({'message': 'No DATA_TABLE configured'})}
+
+    dynamodb = boto3.resource('dynamodb')
+    table = dynamodb.Table(DATA_TABLE)
+    s3_client = boto3.client('s3')
+    dates = event.get('dates') or list_dates(
+        dynamodb, DATA_TABLE, days_back=int(event.get('days_back', DAYS_BACK)),
+    )
+
+    results = [compact_date(table, date, s3_client=s3_client) for date in dates]
+    deleted = sum(r['metas_deleted'] + r['lessons_deleted'] for r in results)
+    logger.info(f"Compacted {len(results)} dates, deleted {deleted} items")
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Compaction complete',
+            'dates': len(results),
+            'deleted': deleted,
+        })
+    }
@@ -2,7 +2,7 @@
 GoldSport Scheduler - Processor Lambda
 
 Processes input data (orders TSV, instructors JSON) through a modular pipeline
-and outputs schedule.json to the website bucket.
+and publishes the schedule to the website bucket.
 
 Triggered by S3 events when new files are uploaded to the input bucket.
 """
@@ -10,6 +10,8 @@ Triggered by S3 events when new files are uploaded to the input bucket.
 import os
 import json
 import logging
+from datetime import datetime
+from typing import Optional
 
 import boto3
 
@@ -18,9 +20,11 @@ from config_loader import ConfigLoader
 from processors import ProcessorError
 from processors.parse_orders import ParseOrdersProcessor
 from processors.parse_instructors import ParseInstructorsProcessor
-from processors.merge_data import MergeDataProcessor
+from processors.merge_data import MergeDataProcessor, MergeState
+from processors.conflicts import ConflictDetectionProcessor
 from processors.validate import ValidateProcessor
 from processors.privacy import PrivacyProcessor
+from processors.validate_privacy import ValidatePrivacyProcessor
 from processors.storage import StorageProcessor
 from processors.output import OutputProcessor
 
@@ -31,6 +35,10 @@ logger.setLevel(logging.INFO)
 DATA_TABLE = os.environ.get('DATA_TABLE')
 WEBSITE_BUCKET = os.environ.get('WEBSITE_BUCKET')
 INPUT_BUCKET = os.environ.get('INPUT_BUCKET')
+INCREMENTAL_MERGE = os.environ.get('INCREMENTAL_MERGE', 'true').lower() == 'true'
+FUSED_VALIDATION = os.environ.get('FUSED_VALIDATION', 'false').lower() == 'true'
+STORAGE_LAYOUT = os.environ.get('STORAGE_LAYOUT', 'items')  # 'items' or 'snapshot'
+STORAGE_HORIZON_DAYS = int(os.environ.get('STORAGE_HORIZON_DAYS', '0'))  # past days still re-checked
 
 # AWS clients
 s3_client = boto3.client('s3')
@@ -39,28 +47,49 @@ dynamodb = boto3.resource('dynamodb')
 # Config loader
 config_loader = ConfigLoader(s3_client=s3_client)
 
+# Merged lessons of the previous run (kept while the container is warm)
+merge_state = MergeState()
 
-def build_pipeline() -> Pipeline:
+
+def build_pipeline(fused_validation: bool = FUSED_VALIDATION) -> Pipeline:
     """
     Build the processing pipeline.
 
     Pipeline stages:
     1. ParseOrdersProcessor - TSV -> internal format
     2. ParseInstructorsProcessor - JSON -> internal format
-    3. MergeDataProcessor - combine sources
-    4. ValidateProcessor - filter invalid records
-    5. PrivacyProcessor - apply name filtering
-    6. StorageProcessor - save to DynamoDB
-    7. OutputProcessor - generate schedule.json
+    3. MergeDataProcessor - combine sources (incremental if INCREMENTAL_MERGE)
+    4. ConflictDetectionProcessor - instructor double-bookings -> conflicts.json
+    5. ValidateProcessor - filter invalid records
+    6. PrivacyProcessor - apply name filtering
+       (5+6 replaced by ValidatePrivacyProcessor when fused_validation)
+    7. OutputProcessor - write schedule versions, swap data/current.json
+    8. StorageProcessor - save to DynamoDB (STORAGE_LAYOUT: items or snapshot);
+       write-behind: runs after the schedule is published and a failure
+       is reported without failing the run
+
+    Args:
+        fused_validation: Run validation and privacy as one pass
+            (ValidatePrivacyProcessor) instead of two separate stages
     """
-    return (PipelineBuilder()
+    builder = (PipelineBuilder()
         .add(ParseOrdersProcessor())
         .add(ParseInstructorsProcessor())
-        .add(MergeDataProcessor())
-        .add(ValidateProcessor())
-        .add(PrivacyProcessor())
-        .add(StorageProcessor())
+        .add(MergeDataProcessor(state=merge_state if INCREMENTAL_MERGE else None))
+        .add(ConflictDetectionProcessor()))
+
+    if fused_validation:
+        builder.add(ValidatePrivacyProcessor())
+    else:
+        builder.add(ValidateProcessor()).add(PrivacyProcessor())
+
+    return (builder
         .add(OutputProcessor())
+        .add_write_behind(StorageProcessor(
+            layout=STORAGE_LAYOUT,
+            s3_client=s3_client,
+            horizon_days=STORAGE_HORIZON_DAYS,
+        ))
         .build())
 
 
@@ -90,7 +119,7 @@ def load_configs() -> dict:
         }
 
 
-def create_initial_data(bucket: str, key: str, configs: dict) -> dict:
+def create_initial_data(bucket: str, key: str, configs: dict, event_time: Optional[str] = None) -> dict:
     """
     Create initial data dictionary for the pipeline.
 
@@ -98,6 +127,7 @@ def create_initial_data(bucket: str, key: str, configs: dict) -> dict:
         bucket: S3 bucket name
         key: S3 object key that triggered the event
         configs: Loaded configuration files
+        event_time: Optional S3 event time (ISO 8601), for publish latency
 
     Returns:
         Initial data dictionary for pipeline processing
@@ -107,6 +137,7 @@ def create_initial_data(bucket: str, key: str, configs: dict) -> dict:
         'trigger': {
             'bucket': bucket,
             'key': key,
+            'triggered_at': _parse_event_time(event_time),
         },
         # Configuration (loaded by processors)
         'config': {
@@ -135,6 +166,17 @@ def create_initial_data(bucket: str, key: str, configs: dict) -> dict:
     }
 
 
+def _parse_event_time(event_time: Optional[str]) -> Optional[float]:
+    """S3 eventTime (e.g. 2026-01-28T10:30:00.123Z) as epoch seconds, or None."""
+    if not event_time:
+        return None
+    try:
+        return datetime.fromisoformat(event_time.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        logger.warning(f"Unparseable eventTime: {event_time}")
+        return None
+
+
 def main(event, context):
     """
     Lambda handler - processes S3 upload events.
@@ -156,7 +198,7 @@ def main(event, context):
 
         try:
             # Create initial data for pipeline
-            data = create_initial_data(bucket, key, configs)
+            data = create_initial_data(bucket, key, configs, record.get('eventTime'))
 
             # Build and run pipeline
             pipeline = build_pipeline()
@@ -166,6 +208,7 @@ def main(event, context):
                 'key': key,
                 'status': 'success',
                 'lessons_processed': len(result.get('lessons', [])),
+                'write_behind': result['metadata'].get('write_behind', {}),
             })
 
         except ProcessorError as e:
@@ -0,0 +1,48 @@
+"""
+GoldSport Scheduler - Structured Metrics
+
+Emits CloudWatch metrics using the Embedded Metric Format (EMF): a JSON log
+line that CloudWatch Logs turns into metrics, so no PutMetricData calls or
+extra dependencies are needed in the Lambda.
+"""
+
+import json
+import time
+from typing import Dict, Optional
+
+# CloudWatch namespace for all scheduler metrics
+NAMESPACE = 'GoldSportScheduler'
+
+
+def emit_metrics(
+    metrics: Dict[str, float],
+    dimensions: Optional[Dict[str, str]] = None,
+    unit: str = 'Count'
+) -> None:
+    """
+    Emit metrics as one EMF log line.
+
+    Args:
+        metrics: Dict mapping metric name -> value
+        dimensions: Optional dimension name -> value (e.g., {'Stage': 'Validate'})
+        unit: CloudWatch unit for all metrics in this line
+    """
+    if not metrics:
+        return
+
+    dimensions = dimensions or {}
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name in metrics],
+            }],
+        },
+        **dimensions,
+        **metrics,
+    }
+
+    # EMF must be written to stdout as a single line
+    print(json.dumps(record, ensure_ascii=False))
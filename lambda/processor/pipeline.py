@@ -2,10 +2,14 @@
 GoldSport Scheduler - Processing Pipeline
 
 Orchestrates the data processing through a chain of processors.
+
+Write-behind processors (e.g. persistence) run after the main chain has
+published its output. Their failures are recorded in the metadata and
+logged, but never fail the run.
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 from processors import Processor, ProcessorError
 
 logger = logging.getLogger(__name__)
@@ -19,14 +23,16 @@ class Pipeline:
     of one processor as input to the next.
     """
 
-    def __init__(self, processors: List[Processor]):
+    def __init__(self, processors: List[Processor], write_behind: Optional[List[Processor]] = None):
         """
         Initialize the pipeline with a list of processors.
 
         Args:
             processors: Ordered list of processors to execute
+            write_behind: Processors run after the chain; failures are reported, not raised
         """
         self.processors = processors
+        self.write_behind = write_behind or []
 
     def run(self, data: dict) -> dict:
         """
@@ -56,9 +62,36 @@ class Pipeline:
                 logger.error(f"Processor {processor.name} failed: {e}")
                 raise ProcessorError(processor.name, str(e), e)
 
+        for processor in self.write_behind:
+            data = self._run_write_behind(processor, data)
+
         logger.info("Pipeline completed successfully")
         return data
 
+    def _run_write_behind(self, processor: Processor, data: dict) -> dict:
+        """
+        Run a write-behind processor, recording (not raising) its failure.
+
+        Failures are appended to metadata['processing_errors'] and the
+        processor's status to metadata['write_behind'].
+        """
+        logger.info(f"Running write-behind processor: {processor.name}")
+        metadata = data.setdefault('metadata', {})
+        status = metadata.setdefault('write_behind', {})
+        try:
+            data = processor.process(data)
+            status[processor.name] = 'ok'
+            logger.info(f"Processor {processor.name} completed")
+        except Exception as e:
+            message = e.message if isinstance(e, ProcessorError) else str(e)
+            logger.error(f"Write-behind processor {processor.name} failed: {message}")
+            status[processor.name] = 'failed'
+            metadata.setdefault('processing_errors', []).append({
+                'processor': processor.name,
+                'error': message,
+            })
+        return data
+
 
 class PipelineBuilder:
     """
@@ -69,17 +102,24 @@ class PipelineBuilder:
             .add(ParseOrdersProcessor())
             .add(ValidateProcessor())
             .add(PrivacyProcessor())
+            .add_write_behind(StorageProcessor())
             .build())
     """
 
     def __init__(self):
         self._processors: List[Processor] = []
+        self._write_behind: List[Processor] = []
 
     def add(self, processor: Processor) -> 'PipelineBuilder':
         """Add a processor to the pipeline."""
         self._processors.append(processor)
         return self
 
+    def add_write_behind(self, processor: Processor) -> 'PipelineBuilder':
+        """Add a processor that runs after the chain and may fail without failing the run."""
+        self._write_behind.append(processor)
+        return self
+
     def build(self) -> Pipeline:
         """Build and return the pipeline."""
-        return Pipeline(self._processors)
+        return Pipeline(self._processors, self._write_behind)
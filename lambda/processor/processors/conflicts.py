@@ -0,0 +1,256 @@
+"""
+GoldSport Scheduler - Conflict Detection Processor
+
+Detects instructor double-bookings and impossible transfers between
+meeting points, and writes them to conflicts.json in the input bucket
+(it holds booking IDs and instructor names, so it stays off the public
+website bucket).
+"""
+
+import heapq
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import boto3
+from botocore.exceptions import ClientError
+
+from processors import Processor, ProcessorError
+
+logger = logging.getLogger(__name__)
+
+
+class ConflictDetectionProcessor(Processor):
+    """
+    Check the roster for instructor conflicts.
+
+    Per instructor and date, lessons are sorted by start time and swept once
+    (O(n log n)) with a heap of lessons still in progress:
+    - overlap: a lesson starts before another lesson of the same instructor ends
+    - transfer: consecutive lessons at different locations with a gap shorter
+      than the configured travel time
+
+    Lessons with the default instructor (no assignment) are ignored.
+    Does not modify lessons; results go to metadata and reports/conflicts.json.
+    """
+
+    # Private input bucket; outside the prefixes that trigger the processor
+    OUTPUT_KEY = 'reports/conflicts.json'
+
+    # Where earlier versions published it (website bucket); removed if still there
+    LEGACY_KEY = 'data/conflicts.json'
+
+    # Travel time between different meeting points (minutes)
+    DEFAULT_TRAVEL_MINUTES = 15
+
+    def __init__(self, s3_client=None, travel_minutes: Optional[int] = None):
+        """
+        Initialize the processor.
+
+        Args:
+            s3_client: Optional boto3 S3 client (for testing)
+            travel_minutes: Optional travel time override (else enrichment config)
+        """
+        self.s3_client = s3_client or boto3.client('s3')
+        self.travel_minutes = travel_minutes
+
+    def process(self, data: dict) -> dict:
+        """
+        Detect conflicts and write conflicts.json.
+
+        Args:
+            data: Pipeline data with merged lessons
+
+        Returns:
+            Data with conflict summary in metadata
+        """
+        lessons = data.get('lessons', [])
+        config = data.get('config', {})
+
+        if not lessons:
+            logger.info("No lessons to check for conflicts")
+            return data
+
+        try:
+            travel_minutes = self._get_travel_minutes(config)
+            overlaps, transfers = self.find_conflicts(lessons, travel_minutes)
+
+            data['metadata']['conflicts'] = {
+                'overlaps': len(overlaps),
+                'transfers': len(transfers),
+                'key': self.OUTPUT_KEY,
+            }
+
+            if overlaps or transfers:
+                logger.warning(
+                    f"Instructor conflicts: {len(overlaps)} overlaps, "
+                    f"{len(transfers)} impossible transfers"
+                )
+            else:
+                logger.info("No instructor conflicts")
+
+            input_bucket = config.get('input_bucket')
+            if input_bucket:
+                self._upload_conflicts(input_bucket, {
+                    'generated_at': datetime.now(timezone.utc).isoformat(),
+                    'travel_minutes': travel_minutes,
+                    'overlaps': overlaps,
+                    'transfers': transfers,
+                })
+            else:
+                logger.warning("No input_bucket configured, conflicts.json not written")
+
+            if config.get('website_bucket'):
+                self._delete_legacy(config['website_bucket'])
+
+        except ProcessorError:
+            raise
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to detect conflicts: {e}", e)
+
+        return data
+
+    def find_conflicts(
+        self,
+        lessons: List[Dict],
+        travel_minutes: int
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Find overlapping lessons and impossible transfers.
+
+        Args:
+            lessons: Merged lessons
+            travel_minutes: Minimum gap between lessons at different locations
+
+        Returns:
+            Tuple of (overlaps, transfers)
+        """
+        # Bucket by instructor and date: O(n)
+        buckets: Dict[Tuple[str, str], List[Tuple[int, int, Dict]]] = defaultdict(list)
+        for lesson in lessons:
+            instructor_id = (lesson.get('instructor') or {}).get('id')
+            if not instructor_id:
+                continue
+            interval = self._lesson_interval(lesson)
+            if interval is None:
+                continue
+            buckets[(instructor_id, lesson.get('date', ''))].append((*interval, lesson))
+
+        overlaps = []
+        transfers = []
+
+        for (instructor_id, date), intervals in buckets.items():
+            if len(intervals) < 2:
+                continue
+            intervals.sort(key=lambda item: (item[0], item[1]))
+
+            active: List[Tuple[int, int]] = []  # heap of (end, index) still in progress
+            last_finished: Optional[int] = None  # index of finished lesson with latest end
+
+            for index, (start, end, lesson) in enumerate(intervals):
+                while active and active[0][0] <= start:
+                    _, done = heapq.heappop(active)
+                    if last_finished is None or intervals[done][1] >= intervals[last_finished][1]:
+                        last_finished = done
+
+                for _, other in active:
+                    overlaps.append(self._conflict(
+                        instructor_id, date, intervals[other][2], lesson,
+                    ))
+
+                if not active and last_finished is not None:
+                    prev_end, prev = intervals[last_finished][1], intervals[last_finished][2]
+                    gap = start - prev_end
+                    if (
+                        gap < travel_minutes
+                        and prev.get('location_key') != lesson.get('location_key')
+                    ):
+                        transfer = self._conflict(instructor_id, date, prev, lesson)
+                        transfer['gap_minutes'] = gap
+                        transfers.append(transfer)
+
+                heapq.heappush(active, (end, index))
+
+        return overlaps, transfers
+
+    def _get_travel_minutes(self, config: Dict) -> int:
+        """Travel time from constructor, enrichment config, or default."""
+        if self.travel_minutes is not None:
+            return self.travel_minutes
+        conflicts_config = config.get('enrichment', {}).get('conflicts', {})
+        return int(conflicts_config.get('travel_minutes', self.DEFAULT_TRAVEL_MINUTES))
+
+    def _lesson_interval(self, lesson: Dict) -> Optional[Tuple[int, int]]:
+        """
+        Return (start, end) in minutes, or None if unusable.
+
+        Epoch minutes from the parser when present, else minutes from midnight.
+        Both are only compared within one date.
+        """
+        start = lesson.get('start_min')
+        end = lesson.get('end_min')
+        if start is None or end is None:
+            start = _hhmm_to_minutes(lesson.get('start', ''))
+            end = _hhmm_to_minutes(lesson.get('end', ''))
+        if start is None or end is None or end <= start:
+            return None
+        return start, end
+
+    def _conflict(self, instructor_id: str, date: str, first: Dict, second: Dict) -> Dict:
+        """Build a conflict record for two lessons of one instructor."""
+        return {
+            'instructor_id': instructor_id,
+            'instructor_name': (second.get('instructor') or {}).get('name', ''),
+            'date': date,
+            'lessons': [self._lesson_ref(first), self._lesson_ref(second)],
+        }
+
+    def _lesson_ref(self, lesson: Dict) -> Dict:
+        """Compact lesson reference for conflicts.json."""
+        return {
+            'lesson_id': lesson.get('lesson_id'),
+            'booking_id': lesson.get('booking_id'),
+            'start': lesson.get('start', ''),
+            'end': lesson.get('end', ''),
+            'location_key': lesson.get('location_key', ''),
+        }
+
+    def _upload_conflicts(self, bucket: str, conflicts: Dict) -> None:
+        """Upload conflicts.json to S3."""
+        try:
+            self.s3_client.put_object(
+                Bucket=bucket,
+                Key=self.OUTPUT_KEY,
+                Body=json.dumps(conflicts, ensure_ascii=False, indent=2),
+                ContentType='application/json',
+            )
+            logger.info(f"Uploaded conflicts.json to s3://{bucket}/{self.OUTPUT_KEY}")
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload to S3: {e}", e)
+
+    def _delete_legacy(self, bucket: str) -> None:
+        """Remove the previously public conflicts.json if it still exists (best effort)."""
+        try:
+            self.s3_client.head_object(Bucket=bucket, Key=self.LEGACY_KEY)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                logger.warning(f"Could not check s3://{bucket}/{self.LEGACY_KEY}: {e}")
+            return
+
+        try:
+            self.s3_client.delete_object(Bucket=bucket, Key=self.LEGACY_KEY)
+            logger.info(f"Deleted s3://{bucket}/{self.LEGACY_KEY}")
+        except Exception as e:
+            logger.warning(f"Could not delete s3://{bucket}/{self.LEGACY_KEY}: {e}")
+
+
+def _hhmm_to_minutes(value: str) -> Optional[int]:
+    """Convert 'HH:MM' to minutes from midnight (None if malformed)."""
+    if not value or len(value) != 5 or value[2] != ':':
+        return None
+    hours, minutes = value[:2], value[3:]
+    if not (hours.isdigit() and minutes.isdigit()):
+        return None
+    return int(hours) * 60 + int(minutes)
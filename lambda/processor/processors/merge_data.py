@@ -2,17 +2,50 @@
 GoldSport Scheduler - Merge Data Processor
 
 Merges orders with instructor assignments to create unified lesson records.
+
+Incremental mode: when a MergeState is supplied, the merged lessons of the
+previous run are kept keyed by lesson ID. Only lessons whose order rows or
+booking -> instructor assignments changed are rebuilt; the rest are reused.
+A run that loaded only one half of the instructor data (a roster or a
+profiles upload) takes the other half from the state.
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 
 from processors import Processor, ProcessorError
-from processors.parse_instructors import get_instructor_for_booking
+from processors.parse_instructors import build_booking_index
+from time_index import local_time, to_epoch_minutes
 
 logger = logging.getLogger(__name__)
 
 
+class MergeState:
+    """
+    Merge results kept between runs (lives in the warm Lambda container).
+
+    All maps are keyed by "{date}#{lesson_id}" because private lesson IDs
+    are only unique within a date.
+    """
+
+    def __init__(self):
+        self.orders: Dict[str, Dict[str, Any]] = {}    # key -> order record
+        self.lessons: Dict[str, Dict[str, Any]] = {}   # key -> merged lesson
+        self.assignments: Dict[str, str] = {}          # booking_id -> instructor_id
+        self.roster: Dict[str, Any] = {}               # Last loaded roster
+        self.profiles: Dict[str, Any] = {}             # instructor_id -> profile
+
+    @property
+    def is_primed(self) -> bool:
+        """True once a merge has been recorded."""
+        return bool(self.lessons)
+
+    def clear(self) -> None:
+        """Forget all previous results (next run does a full merge)."""
+        self.__init__()
+
+
 class MergeDataProcessor(Processor):
     """
     Merge orders with instructor data.
@@ -31,6 +64,15 @@ class MergeDataProcessor(Processor):
         'photo': 'assets/logo.png',
     }
 
+    def __init__(self, state: Optional[MergeState] = None):
+        """
+        Initialize the processor.
+
+        Args:
+            state: Optional MergeState shared across runs; enables incremental mode
+        """
+        self.state = state
+
     def process(self, data: dict) -> dict:
         """
         Merge orders with instructor data.
@@ -44,28 +86,28 @@ class MergeDataProcessor(Processor):
         orders = data.get('raw', {}).get('orders', [])
         instructors = data.get('raw', {}).get('instructors', {})
 
+        if not orders and self.state is not None and self.state.is_primed:
+            # Roster-only upload: re-merge the last known orders
+            orders = list(self.state.orders.values())
+            logger.info(f"No new orders, reusing {len(orders)} orders from previous run")
+
         if not orders:
             logger.warning("No orders to merge")
             data['lessons'] = []
             return data
 
         try:
-            lessons = []
-            merged_count = 0
-            default_count = 0
-
-            for order in orders:
-                lesson = self._create_lesson(order, instructors)
-                if lesson.get('instructor', {}).get('id') is None:
-                    default_count += 1
-                else:
-                    merged_count += 1
-                lessons.append(lesson)
+            if self.state is not None and self.state.is_primed:
+                instructors = self._complete_instructors(instructors)
+                lessons = self._merge_incremental(orders, instructors, data.get('metadata', {}))
+            else:
+                lessons = self._merge_full(orders, instructors)
 
+            merged_count = sum(1 for l in lessons if l['instructor'].get('id') is not None)
             data['lessons'] = lessons
             logger.info(
                 f"Merged {len(lessons)} lessons: "
-                f"{merged_count} with instructors, {default_count} with defaults"
+                f"{merged_count} with instructors, {len(lessons) - merged_count} with defaults"
             )
 
         except Exception as e:
@@ -73,17 +115,153 @@ class MergeDataProcessor(Processor):
 
         return data
 
+    def _merge_full(
+        self,
+        orders: List[Dict[str, Any]],
+        instructors: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Build every lesson from scratch (and record state if enabled)."""
+        booking_index = build_booking_index(instructors)
+        profiles = instructors.get('profiles', {})
+
+        lessons = [self._create_lesson(order, booking_index, profiles) for order in orders]
+
+        if self.state is None:
+            return lessons
+
+        self.state.clear()
+        for order, lesson in zip(orders, lessons):
+            key = self._state_key(lesson)
+            self.state.orders[key] = order
+            self.state.lessons[key] = lesson
+        self.state.assignments = booking_index
+        self.state.roster = instructors.get('roster', {})
+        self.state.profiles = profiles
+
+        return [self._clone_lesson(lesson) for lesson in lessons]
+
+    def _complete_instructors(self, instructors: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fill in the roster or profiles this run did not load from the state.
+
+        An instructors/ upload triggers a run with only that file; without
+        the other half, build_booking_index would drop every assignment.
+        """
+        missing = [part for part in ('roster', 'profiles') if part not in instructors]
+        if not missing:
+            return instructors
+
+        logger.info(f"No {' or '.join(missing)} in this run, reusing them from previous run")
+        completed = dict(instructors)
+        for part in missing:
+            completed[part] = getattr(self.state, part)
+        return completed
+
+    def _merge_incremental(
+        self,
+        orders: List[Dict[str, Any]],
+        instructors: Dict[str, Any],
+        metadata: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Rebuild only lessons touched by changed orders or assignments.
+
+        Args:
+            orders: Current order records
+            instructors: Current instructor data
+            metadata: Pipeline metadata (receives merge statistics)
+
+        Returns:
+            Complete list of lessons, in order of the current orders
+        """
+        state = self.state
+        booking_index = build_booking_index(instructors)
+        profiles = instructors.get('profiles', {})
+        changed_bookings = self._changed_bookings(booking_index, profiles)
+
+        new_orders: Dict[str, Dict[str, Any]] = {}
+        new_lessons: Dict[str, Dict[str, Any]] = {}
+        rebuilt = 0
+
+        for order in orders:
+            key = self._state_key_for_order(order)
+            previous = state.lessons.get(key)
+
+            if (
+                previous is None
+                or state.orders.get(key) != order
+                or order.get('booking_id') in changed_bookings
+            ):
+                lesson = self._create_lesson(order, booking_index, profiles)
+                rebuilt += 1
+            else:
+                lesson = previous
+
+            new_orders[key] = order
+            new_lessons[key] = lesson
+
+        removed = len(set(state.lessons) - set(new_lessons))
+
+        state.orders = new_orders
+        state.lessons = new_lessons
+        state.assignments = booking_index
+        state.roster = instructors.get('roster', {})
+        state.profiles = profiles
+
+        metadata['merge'] = {
+            'mode': 'incremental',
+            'rebuilt': rebuilt,
+            'reused': len(new_lessons) - rebuilt,
+            'removed': removed,
+            'changed_bookings': len(changed_bookings),
+        }
+        logger.info(
+            f"Incremental merge: {rebuilt} rebuilt, "
+            f"{len(new_lessons) - rebuilt} reused, {removed} removed"
+        )
+
+        return [self._clone_lesson(lesson) for lesson in new_lessons.values()]
+
+    def _changed_bookings(
+        self,
+        booking_index: Dict[str, str],
+        profiles: Dict[str, Any]
+    ) -> Set[str]:
+        """
+        Find bookings whose resolved instructor differs from the previous run.
+
+        A booking is changed if it was reassigned, or if the profile of its
+        instructor (name, photo) was edited.
+        """
+        previous_index = self.state.assignments
+        previous_profiles = self.state.profiles
+
+        changed_instructors = {
+            instructor_id
+            for instructor_id in set(profiles) | set(previous_profiles)
+            if profiles.get(instructor_id) != previous_profiles.get(instructor_id)
+        }
+
+        return {
+            booking_id
+            for booking_id in set(booking_index) | set(previous_index)
+            if booking_index.get(booking_id) != previous_index.get(booking_id)
+            or booking_index.get(booking_id) in changed_instructors
+        }
+
     def _create_lesson(
         self,
         order: Dict[str, Any],
-        instructors: Dict[str, Any]
+        booking_index: Dict[str, str],
+        profiles: Dict[str, Any]
     ) -> Dict[str, Any]:
         """
         Create a unified lesson record.
 
         Args:
             order: Order record from ParseOrdersProcessor
-            instructors: Instructor data from ParseInstructorsProcessor
+            booking_index: booking_id -> instructor_id (see build_booking_index)
+            profiles: Instructor profiles from ParseInstructorsProcessor
 
         Returns:
             Unified lesson record
@@ -92,25 +270,29 @@ class MergeDataProcessor(Processor):
 
         # Try to find instructor for this booking
         instructor = None
-        if booking_id:
-            instructor = get_instructor_for_booking(instructors, booking_id)
+        instructor_id = booking_index.get(booking_id) if booking_id else None
+        if instructor_id:
+            instructor = profiles[instructor_id].copy()
+            instructor['id'] = instructor_id
 
         if not instructor:
             instructor = self.DEFAULT_INSTRUCTOR.copy()
 
-        # Extract time from timestamp
-        start_time = self._extract_time(order.get('timestamp_start', ''))
-        end_time = self._extract_time(order.get('timestamp_end', ''))
+        # Epoch minutes (from parser) and Prague local HH:MM
+        start_min, start_time = self._order_time(order, 'start')
+        end_min, end_time = self._order_time(order, 'end')
 
         # Get people list (new format with name, language, sponsor per person)
         people = order.get('people', [])
 
-        return {
+        lesson = {
             'order_id': order.get('order_id', ''),  # Always present for private lessons
             'booking_id': booking_id,
             'date': order.get('date_lesson', ''),
             'start': start_time,
             'end': end_time,
+            'start_min': start_min,
+            'end_min': end_min,
             'level_key': order.get('level', ''),
             'group_type_key': order.get('group_type', ''),  # privát, malá skupina, velká skupina
             'location_key': order.get('location_meeting', ''),
@@ -119,10 +301,64 @@ class MergeDataProcessor(Processor):
             'instructor': instructor,
             'notes': None,
         }
+        lesson['lesson_id'] = generate_lesson_id(lesson)
+        return lesson
+
+    def _state_key(self, lesson: Dict[str, Any]) -> str:
+        """Key of a merged lesson in MergeState."""
+        return f"{lesson.get('date', '')}#{lesson['lesson_id']}"
+
+    def _state_key_for_order(self, order: Dict[str, Any]) -> str:
+        """Key of the lesson an order would produce, without building it."""
+        lesson_id = generate_lesson_id({
+            'order_id': order.get('order_id', ''),
+            'date': order.get('date_lesson', ''),
+            'start': self._order_time(order, 'start')[1],
+            'level_key': order.get('level', ''),
+            'group_type_key': order.get('group_type', ''),
+            'location_key': order.get('location_meeting', ''),
+        })
+        return f"{order.get('date_lesson', '')}#{lesson_id}"
+
+    def _clone_lesson(self, lesson: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a stored lesson for the pipeline.
+
+        Later processors rewrite lesson fields and people in place, so the
+        copy kept in MergeState must never be handed out directly.
+        """
+        clone = dict(lesson)
+        clone['people'] = [dict(p) if isinstance(p, dict) else p for p in lesson.get('people', [])]
+        clone['instructor'] = dict(lesson['instructor'])
+        return clone
+
+    def _order_time(self, order: Dict[str, Any], which: str) -> tuple[Optional[int], str]:
+        """
+        Get epoch minutes and local HH:MM for an order's start or end.
+
+        Uses the epoch minutes computed by ParseOrdersProcessor; falls back to
+        parsing the timestamp for orders that don't carry them.
+
+        Args:
+            order: Order record
+            which: 'start' or 'end'
+
+        Returns:
+            Tuple of (epoch minutes or None, HH:MM in Prague time)
+        """
+        timestamp = order.get(f'timestamp_{which}', '')
+        minutes = order.get(f'{which}_min')
+        if minutes is None:
+            minutes = to_epoch_minutes(timestamp)
+
+        if minutes is None:
+            return None, self._extract_time(timestamp)
+
+        return minutes, local_time(minutes)
 
     def _extract_time(self, timestamp: str) -> str:
         """
-        Extract HH:MM time from ISO timestamp.
+        Extract HH:MM time from ISO timestamp (fallback for unparseable values).
 
         Args:
             timestamp: ISO 8601 timestamp (e.g., "2025-12-28T09:00:00+01:00")
@@ -140,3 +376,33 @@ class MergeDataProcessor(Processor):
             return time_part[:5]
 
         return timestamp
+
+
+def generate_lesson_id(lesson: Dict[str, Any]) -> str:
+    """
+    Helper function to generate a stable ID for a lesson.
+
+    For private lessons: hash of order_id + start
+    For group lessons: hash of date + start + level + group_type + location
+
+    Args:
+        lesson: Merged lesson record
+
+    Returns:
+        16-character hex ID (unique within a date)
+    """
+    group_type = lesson.get('group_type_key', '')
+    order_id = lesson.get('order_id', '')
+    start = lesson.get('start', '')
+
+    if group_type == 'privát':
+        # Private lessons: use order_id + start (one order can have multiple time slots)
+        key_data = f"private_{order_id}_{start}"
+    else:
+        # Group lessons: use all grouping fields
+        date = lesson.get('date', '')
+        level = lesson.get('level_key', '')
+        location = lesson.get('location_key', '')
+        key_data = f"{date}_{start}_{level}_{group_type}_{location}"
+
+    return hashlib.md5(key_data.encode()).hexdigest()[:16]
@@ -1,28 +1,145 @@
 """
 GoldSport Scheduler - Output Processor
 
-Generates schedule.json for the website bucket.
+Generates the schedule documents for the website bucket: immutable
+content-hashed versions (per-date shards with language editions, manifest,
+full schedule, display payloads), the delta feed, and the data/current.json
+pointer that is swapped to them last. The today view is recomputed between
+runs by rerender(); the pre-pointer documents are kept in sync for older
+clients.
+
+See docs/architecture/README.md (Output Documents) for the layout.
 """
 
+import gzip
+import hashlib
 import json
 import logging
-from datetime import datetime, timezone
-from typing import Dict, Any, List
+import re
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 
 import boto3
+from botocore.exceptions import ClientError
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
 
+from metrics import emit_metrics
+from config_loader import translate
 from processors import Processor, ProcessorError
+from processors.merge_data import generate_lesson_id
+from time_index import PRAGUE, epoch_minutes, local_to_epoch_minutes
 
 logger = logging.getLogger(__name__)
 
 
+class _Superseded(Exception):
+    """A newer run published first; this run must not publish anything else."""
+
+
+def serialize_schedule(schedule: Dict) -> bytes:
+    """Serialize a schedule as compact UTF-8 JSON."""
+    return json.dumps(schedule, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def compress_variants(body: bytes) -> Dict[str, Tuple[str, bytes]]:
+    """
+    Pre-compressed variants of a serialized body.
+
+    Returns:
+        Dict mapping key suffix -> (Content-Encoding, compressed body)
+    """
+    variants = {'.gz': ('gzip', gzip.compress(body, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        variants['.br'] = ('br', brotli.compress(body, quality=11))
+    return variants
+
+
+def split_timeline(timeline: Dict[str, List], now_min: int) -> Tuple[List[str], List[str]]:
+    """
+    Split a day's timeline at a minute.
+
+    Upcoming (start > now) is the suffix after bisect_right(now). Current
+    (start <= now < end) can only have started within the longest lesson
+    before now, so a second bisect bounds the window to check.
+
+    Args:
+        timeline: {starts, ends, ids} sorted by start
+        now_min: Epoch minutes
+
+    Returns:
+        Tuple of (current IDs, upcoming IDs), both sorted by start
+    """
+    starts, ends, ids = timeline['starts'], timeline['ends'], timeline['ids']
+    if not starts:
+        return [], []
+
+    longest = max(end - start for start, end in zip(starts, ends))
+    upcoming_from = bisect_right(starts, now_min)
+    window_from = bisect_left(starts, now_min - longest)
+
+    current = [ids[i] for i in range(window_from, upcoming_from) if ends[i] > now_min]
+    return current, ids[upcoming_from:]
+
+
 class OutputProcessor(Processor):
     """
-    Generate schedule.json and upload to website bucket.
+    Write the schedule as immutable versions and swap the pointer to them.
 
-    Separates lessons into current and upcoming based on time.
+    Separates lessons into current and upcoming based on Prague local time.
     """
 
+    CURRENT_KEY = 'data/current.json'
+    TODAY_KEY = 'data/today.json'
+    VERSION_PREFIX = 'data/v/'
+    FEED_PREFIX = 'data/feed/'
+
+    # Deltas kept in the feed (displays further behind reload their shard)
+    FEED_RETENTION = 60
+
+    # Mutable keys polled by clients from before the pointer (transition period)
+    LEGACY_SCHEDULE_KEY = 'data/schedule.json'
+    LEGACY_MANIFEST_KEY = 'data/manifest.json'
+    LEGACY_FEED_KEY = 'data/feed.json'
+    LEGACY_DISPLAY_PREFIX = 'data/displays/'
+
+    # Conditional pointer swaps retried after losing a race
+    POINTER_RETRIES = 3
+
+    # Unreferenced versions are kept this long for displays still reading an older pointer
+    VERSION_RETENTION = timedelta(hours=1)
+
+    # Versions never change once written; the pointer is re-read almost every poll
+    IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+    POINTER_CACHE_CONTROL = 'max-age=5'
+
+    # Rotation time slots (minutes from local midnight). Lessons belong to the
+    # slot containing their start (else the closest earlier slot); a slot is
+    # the main page while the local time is inside its main window.
+    TIME_SLOTS = [
+        {'id': 1, 'label': '09:00', 'start': (480, 599), 'main': (480, 599)},
+        {'id': 2, 'label': '11:00', 'start': (660, 719), 'main': (600, 719)},
+        {'id': 3, 'label': '13:00', 'start': (780, 839), 'main': (720, 839)},
+        {'id': 4, 'label': '14:30', 'start': (870, 1439), 'main': (840, 1019)},
+    ]
+
+    # Compact cards: 6 per section x 2 sections of 710px (docs/display-analysis.md)
+    DEFAULT_CARDS_PER_PAGE = 12
+
+    # Page display time by role: the main slot, slots before it, slots after it
+    PAGE_DURATIONS_MS = {'main': 15000, 'previous': 3000, 'upcoming': 10000}
+
+    # Fields that change on every run without changing the content
+    VOLATILE_FIELDS = ('generated_at',)
+
+    # S3 user metadata key holding the content hash (x-amz-meta-content-hash)
+    HASH_METADATA_KEY = 'content-hash'
+
     def __init__(self, s3_client=None):
         """
         Initialize the processor.
@@ -34,7 +151,7 @@ class OutputProcessor(Processor):
 
     def process(self, data: dict) -> dict:
         """
-        Generate schedule.json and upload to S3.
+        Upload the schedule versions to S3 and swap data/current.json.
 
         Args:
             data: Pipeline data with lessons
@@ -51,23 +168,64 @@ class OutputProcessor(Processor):
         try:
             # Build schedule JSON
             schedule = self._build_schedule(lessons, data['metadata'])
+            previous, etag = self._get_pointer(website_bucket)
 
-            # Upload to S3
-            self._upload_schedule(website_bucket, schedule)
+            # Immutable versions first (shards, deltas, manifest, displays,
+            # full schedule), then the pointer that makes them current
+            shards, manifest_key, manifest = self._upload_shards(website_bucket, schedule, data['config'], previous)
+            displays, display_keys, payloads = self._upload_displays(
+                website_bucket, schedule, data['config'], previous.get('displays', {})
+            )
+            schedule_key, sizes = self._upload_schedule(website_bucket, schedule, previous.get('schedule'))
+            uploaded = schedule_key != previous.get('schedule')
+
+            pointer = {
+                'generated_at': schedule['generated_at'],
+                'seq': manifest['seq'],
+                'min_seq': manifest['min_seq'],
+                'manifest': manifest_key,
+                'schedule': schedule_key,
+                'displays': display_keys,
+                'displays_date': schedule['date'],
+            }
+            swapped = self._swap_pointer(website_bucket, pointer, previous, etag)
+            # Only the run whose pointer is live writes the mutable documents and collects versions
+            today_uploaded = self._upload_today(website_bucket, self._today_view(schedule))
+            legacy_written = self._upload_legacy(website_bucket, schedule, manifest, payloads)
+            versions_deleted = self._collect_versions(website_bucket, self._referenced_keys(pointer, manifest))
 
             data['metadata']['output'] = {
                 'bucket': website_bucket,
-                'key': 'data/schedule.json',
+                'key': schedule_key,
                 'current_lessons': len(schedule.get('current_lessons', [])),
                 'upcoming_lessons': len(schedule.get('upcoming_lessons', [])),
+                'uploaded': int(uploaded),
+                'uploads_skipped': int(not uploaded),
+                'bytes': sizes,
+                'shards': shards,
+                'displays': displays,
+                'pointer_swapped': int(swapped),
+                'today_uploaded': int(today_uploaded),
+                'versions_deleted': versions_deleted,
+                'legacy_written': legacy_written,
             }
 
+            # Trigger -> published latency
+            triggered_at = data.get('trigger', {}).get('triggered_at')
+            if triggered_at is not None:
+                latency_ms = int((time.time() - triggered_at) * 1000)
+                data['metadata']['output']['publish_latency_ms'] = latency_ms
+                emit_metrics({'PublishLatency': latency_ms}, {'Stage': 'Output'}, unit='Milliseconds')
+
             logger.info(
-                f"Generated schedule.json: "
+                f"Generated {schedule_key}: "
                 f"{len(schedule['current_lessons'])} current, "
                 f"{len(schedule['upcoming_lessons'])} upcoming"
             )
 
+        except _Superseded as e:
+            logger.info(f"{e}: today view, legacy documents and version cleanup left to it")
+            data['metadata']['output'] = {'bucket': website_bucket, 'superseded': 1, 'pointer_swapped': 0}
         except ProcessorError:
             raise
         except Exception as e:
@@ -87,44 +245,194 @@ class OutputProcessor(Processor):
             Schedule JSON structure
         """
         now = datetime.now(timezone.utc)
-        today = now.strftime('%Y-%m-%d')
-        today_ddmmyyyy = now.strftime('%d.%m.%Y')
+        today_ddmmyyyy = now.astimezone(PRAGUE).strftime('%d.%m.%Y')
 
-        # Filter to today's lessons
-        today_lessons = [
-            l for l in lessons
-            if self._is_today(l.get('date', ''), today_ddmmyyyy)
-        ]
+        # For debugging: include all lessons by date
+        all_by_date = self._group_all_by_date(lessons)
 
-        # Separate current vs upcoming
-        current_lessons = []
-        upcoming_lessons = []
+        schedule = {
+            'generated_at': now.isoformat(),
+            'data_sources': metadata.get('data_sources', {}),
+            'all_lessons_by_date': all_by_date,  # Debug: all lessons grouped by date
+        }
+        schedule.update(self._split_day(all_by_date.get(today_ddmmyyyy, []), today_ddmmyyyy, now))
+        return schedule
+
+    def rerender(self, bucket: str) -> Dict[str, Any]:
+        """
+        Recompute data/today.json (today's current/upcoming lessons) for now.
 
-        current_time = now.strftime('%H:%M')
+        Uses today's shard of the current manifest as the lesson cache;
+        orders, configs and DynamoDB are not touched. The view is only
+        uploaded if the split changed. Display payloads built for an earlier
+        date are rebuilt for today (see _rebuild_displays), the only case in
+        which the pointer is swapped.
 
-        for lesson in today_lessons:
-            formatted = self._format_lesson(lesson)
-            if self._is_current(lesson, current_time):
-                current_lessons.append(formatted)
-            elif self._is_upcoming(lesson, current_time):
-                upcoming_lessons.append(formatted)
+        Args:
+            bucket: Website bucket
 
-        # Sort by start time
-        current_lessons.sort(key=lambda x: x['start'])
-        upcoming_lessons.sort(key=lambda x: x['start'])
+        Returns:
+            Dict with current_lessons, upcoming_lessons (counts), uploaded and
+            displays_rebuilt
+        """
+        pointer, etag = self._get_pointer(bucket)
+        manifest = self._get_json(bucket, pointer['manifest']) if pointer.get('manifest') else {}
+        if 'dates' not in manifest:
+            logger.warning(f"No published manifest at s3://{bucket}/{self.CURRENT_KEY}, nothing to re-render")
+            return {'current_lessons': 0, 'upcoming_lessons': 0, 'uploaded': 0, 'displays_rebuilt': 0}
 
-        # For debugging: include all lessons by date
-        all_by_date = self._group_all_by_date(lessons)
+        now = datetime.now(timezone.utc)
+        today = now.astimezone(PRAGUE)
+        entry = manifest['dates'].get(today.strftime('%Y-%m-%d'))
+        lessons = self._get_json(bucket, entry['key']).get('lessons', []) if entry else []
+
+        view = {'generated_at': now.isoformat()}
+        view.update(self._split_day(lessons, today.strftime('%d.%m.%Y'), now))
+        uploaded = self._upload_today(bucket, view)
 
+        rebuilt = 0
+        if pointer.get('displays') and pointer.get('displays_date') != view['date']:
+            rebuilt = self._rebuild_displays(bucket, pointer, etag, manifest, view['date'], view['generated_at'])
         return {
-            'generated_at': now.isoformat(),
-            'date': today,
-            'data_sources': metadata.get('data_sources', {}),
-            'current_lessons': current_lessons,
-            'upcoming_lessons': upcoming_lessons,
-            'all_lessons_by_date': all_by_date,  # Debug: all lessons grouped by date
+            'current_lessons': len(view['current_lessons']),
+            'upcoming_lessons': len(view['upcoming_lessons']),
+            'uploaded': int(uploaded),
+            'displays_rebuilt': rebuilt,
         }
 
+    def _rebuild_displays(
+        self,
+        bucket: str,
+        pointer: Dict,
+        etag: Optional[str],
+        manifest: Dict,
+        iso_date: str,
+        generated_at: str
+    ) -> int:
+        """
+        Rebuild the display payloads for a new day and swap the pointer to them.
+
+        Each payload is rebuilt from its previous version (display, filter,
+        language, UI texts) and today's shard in its language edition, so
+        the result matches what the next pipeline run writes. The pointer
+        keeps its generated_at and seq: only displays and displays_date change.
+
+        Args:
+            pointer: Current pointer
+            etag: ETag of the current pointer
+            manifest: Manifest the pointer references
+            iso_date: Today (YYYY-MM-DD)
+            generated_at: Timestamp of the re-render
+
+        Returns:
+            Number of payloads written
+        """
+        year, month, day = iso_date.split('-')
+        today = f'{day}.{month}.{year}'
+        entry = manifest['dates'].get(iso_date)
+        shards: Dict[str, Dict] = {}
+
+        written = 0
+        keys = {}
+        payloads = []
+        try:
+            for display_id, previous_key in sorted(pointer['displays'].items()):
+                previous = self._get_json(bucket, previous_key)
+                if 'cards_per_page' not in previous:
+                    # Payloads written before they carried their filter
+                    logger.warning(f"Display {display_id} payload has no filter, left for the next run")
+                    keys[display_id] = previous_key
+                    continue
+
+                lang = previous.get('lang')
+                edition = f'.{lang}' if 'ui' in previous and lang in manifest['languages'] else ''
+                if edition not in shards:
+                    shards[edition] = self._get_json(bucket, self._edition_key(entry['key'], edition)) if entry else {}
+                lessons = shards[edition].get('lessons', [])
+                if previous.get('location'):
+                    lessons = [lesson for lesson in lessons if lesson['location_key'] == previous['location']]
+
+                display = {
+                    'id': display_id,
+                    'location': previous.get('location'),
+                    'levels': previous.get('levels'),
+                    'language': lang,
+                }
+                payload = self._display_payload(display, today, lessons, generated_at, previous['cards_per_page'])
+                if edition:
+                    payload['ui'] = previous['ui']
+                payloads.append(payload)
+                keys[display_id], uploaded = self._put_display(bucket, payload, previous_key)
+                written += int(uploaded)
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to rebuild display payloads: {e}", e)
+
+        try:
+            self._swap_pointer(bucket, {**pointer, 'displays': keys, 'displays_date': iso_date}, pointer, etag)
+        except _Superseded as e:
+            logger.info(f"{e}: rebuilt display payloads not published")
+            return written
+        self._put_legacy_displays(bucket, payloads)
+        logger.info(f"Rebuilt display payloads for {today}: {written} written")
+        return written
+
+    def _split_day(self, lessons: List[Dict], date: str, now: datetime) -> Dict[str, Any]:
+        """
+        Current and upcoming lessons of a day (formatted lessons, sorted by start).
+
+        Returns:
+            Dict with date (YYYY-MM-DD), current_lessons and upcoming_lessons
+        """
+        by_id = {lesson['id']: lesson for lesson in lessons}
+        current, upcoming = split_timeline(self._build_timeline(lessons, date), epoch_minutes(now))
+        return {
+            'date': now.astimezone(PRAGUE).strftime('%Y-%m-%d'),
+            'current_lessons': [by_id[lesson_id] for lesson_id in current],
+            'upcoming_lessons': [by_id[lesson_id] for lesson_id in upcoming],
+        }
+
+    def _build_timeline(self, lessons: List[Dict], date: str) -> Dict[str, List]:
+        """
+        Timeline of a day: epoch minutes and IDs of its lessons, sorted by start.
+
+        Args:
+            lessons: Formatted lessons of the day
+            date: Date in DD.MM.YYYY format
+
+        Returns:
+            {starts, ends, ids}; lessons without valid times are left out
+        """
+        entries = []
+        for lesson in lessons:
+            start_min, end_min = self._lesson_minutes({**lesson, 'date': date})
+            if start_min is None or end_min is None:
+                continue
+            entries.append((start_min, end_min, lesson['id']))
+        entries.sort(key=lambda entry: entry[0])
+        return {
+            'starts': [start for start, _, _ in entries],
+            'ends': [end for _, end, _ in entries],
+            'ids': [lesson_id for _, _, lesson_id in entries],
+        }
+
+    def _lesson_minutes(self, lesson: Dict) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Get (start, end) epoch minutes for a lesson.
+
+        Uses the values carried from the parser; lessons without them are
+        converted from their Prague local date and HH:MM times.
+        """
+        start_min = lesson.get('start_min')
+        end_min = lesson.get('end_min')
+        date = lesson.get('date', '')
+
+        if start_min is None and lesson.get('start'):
+            start_min = local_to_epoch_minutes(date, lesson['start'])
+        if end_min is None and lesson.get('end'):
+            end_min = local_to_epoch_minutes(date, lesson['end'])
+
+        return start_min, end_min
+
     def _is_today(self, lesson_date: str, today: str) -> bool:
         """Check if lesson is for today."""
         return lesson_date == today
@@ -150,27 +458,6 @@ class OutputProcessor(Processor):
 
         return by_date
 
-    def _is_current(self, lesson: Dict, current_time: str) -> bool:
-        """
-        Check if lesson is currently happening.
-
-        A lesson is current if: start <= now < end
-        """
-        start = lesson.get('start', '')
-        end = lesson.get('end', '')
-
-        if not start or not end:
-            return False
-
-        return start <= current_time < end
-
-    def _is_upcoming(self, lesson: Dict, current_time: str) -> bool:
-        """
-        Check if lesson is upcoming (hasn't started yet).
-        """
-        start = lesson.get('start', '')
-        return start > current_time if start else False
-
     def _format_lesson(self, lesson: Dict) -> Dict:
         """
         Format lesson for output JSON.
@@ -184,6 +471,7 @@ class OutputProcessor(Processor):
         instructor = lesson.get('instructor', {})
 
         return {
+            'id': lesson.get('lesson_id') or generate_lesson_id(lesson),
             'start': lesson.get('start', ''),
             'end': lesson.get('end', ''),
             'level_key': lesson.get('level_key', ''),
@@ -199,16 +487,709 @@ class OutputProcessor(Processor):
             'notes': lesson.get('notes'),
         }
 
-    def _upload_schedule(self, bucket: str, schedule: Dict) -> None:
-        """Upload schedule.json to S3."""
+    def _content_hash(self, schedule: Dict) -> str:
+        """Hash of the canonical schedule body (volatile fields excluded)."""
+        body = {k: v for k, v in schedule.items() if k not in self.VOLATILE_FIELDS}
+        canonical = json.dumps(body, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _version_key(self, name: str, content_hash: str) -> str:
+        """Immutable object key of a document version."""
+        return f'{self.VERSION_PREFIX}{name}.{content_hash[:16]}.json'
+
+    def _edition_key(self, key: str, edition: str) -> str:
+        """Key of a language edition ('' or '.{lang}') of a shard or delta."""
+        return f'{key[:-len(".json")]}{edition}.json'
+
+    def _upload_schedule(
+        self,
+        bucket: str,
+        schedule: Dict,
+        previous_key: Optional[str]
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Upload the full schedule as an immutable version unless it is already current.
+
+        Returns:
+            Tuple of (version key, bytes per encoding - empty if not uploaded)
+        """
+        content_hash = self._content_hash(schedule)
+        key = self._version_key('schedule', content_hash)
+        if key == previous_key:
+            logger.info(f"Schedule unchanged ({key}), upload skipped")
+            return key, {}
+
         try:
-            self.s3_client.put_object(
-                Bucket=bucket,
-                Key='data/schedule.json',
-                Body=json.dumps(schedule, ensure_ascii=False, indent=2),
-                ContentType='application/json',
-                CacheControl='max-age=60',  # Short cache for frequent updates
-            )
-            logger.info(f"Uploaded schedule.json to s3://{bucket}/data/schedule.json")
+            sizes = self._put_json(bucket, key, schedule, content_hash, self.IMMUTABLE_CACHE_CONTROL)
+            logger.info(f"Uploaded schedule to s3://{bucket}/{key} ({sizes})")
         except Exception as e:
             raise ProcessorError(self.name, f"Failed to upload to S3: {e}", e)
+        return key, sizes
+
+    def _upload_legacy(self, bucket: str, schedule: Dict, manifest: Dict, payloads: List[Dict]) -> int:
+        """
+        Keep the legacy schedule.json, manifest.json, feed.json and display payloads in sync.
+
+        Returns:
+            Number of documents written
+        """
+        head = {'seq': manifest['seq'], 'min_seq': manifest['min_seq'], 'generated_at': manifest['generated_at']}
+        try:
+            written = self._put_legacy(bucket, self.LEGACY_SCHEDULE_KEY, schedule, self._content_hash(schedule))
+            # The old client fetched these uncompressed
+            for key, document in ((self.LEGACY_MANIFEST_KEY, manifest), (self.LEGACY_FEED_KEY, head)):
+                written += self._put_legacy(bucket, key, document, self._content_hash(document), variants=False)
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload legacy documents: {e}", e)
+        return written + self._put_legacy_displays(bucket, payloads)
+
+    def _put_legacy_displays(self, bucket: str, payloads: List[Dict]) -> int:
+        """
+        Keep the legacy data/displays/{id}.json copies of display payloads in sync.
+
+        Returns:
+            Number of payloads written
+        """
+        written = 0
+        try:
+            for payload in payloads:
+                written += self._put_legacy(
+                    bucket, f"{self.LEGACY_DISPLAY_PREFIX}{payload['display']}.json",
+                    payload, self._content_hash(payload),
+                )
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload legacy display payloads: {e}", e)
+        return written
+
+    def _put_legacy(
+        self,
+        bucket: str,
+        key: str,
+        document: Dict,
+        content_hash: str,
+        variants: bool = True
+    ) -> int:
+        """
+        Overwrite a legacy document (short cache) unless its content is unchanged.
+
+        Returns:
+            1 if written, else 0
+        """
+        if self._stored_hash(bucket, key) == content_hash:
+            return 0
+        if variants:
+            self._put_json(bucket, key, document, content_hash)
+        else:
+            self._put(bucket, key, serialize_schedule(document), content_hash)
+        return 1
+
+    def _today_view(self, schedule: Dict) -> Dict:
+        """data/today.json: today's current/upcoming split of a schedule."""
+        return {
+            key: schedule[key]
+            for key in ('generated_at', 'date', 'current_lessons', 'upcoming_lessons')
+        }
+
+    def _upload_today(self, bucket: str, view: Dict) -> bool:
+        """
+        Overwrite data/today.json unless its content is unchanged.
+
+        Returns:
+            True if the view was written
+        """
+        content_hash = self._content_hash(view)
+        if self._stored_hash(bucket, self.TODAY_KEY) == content_hash:
+            return False
+        try:
+            self._put_json(bucket, self.TODAY_KEY, view, content_hash, self.POINTER_CACHE_CONTROL)
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload {self.TODAY_KEY}: {e}", e)
+        return True
+
+    def _stored_hash(self, bucket: str, key: str) -> Optional[str]:
+        """Content hash of an uploaded object (None if missing)."""
+        try:
+            response = self.s3_client.head_object(Bucket=bucket, Key=key)
+        except Exception:
+            return None
+        return response.get('Metadata', {}).get(self.HASH_METADATA_KEY)
+
+    def _get_pointer(self, bucket: str) -> Tuple[Dict, Optional[str]]:
+        """
+        Read data/current.json with its ETag.
+
+        Returns:
+            Tuple of (pointer - {} if missing or unreadable, ETag - None if missing)
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=self.CURRENT_KEY)
+            return json.loads(response['Body'].read()), response.get('ETag')
+        except Exception as e:
+            logger.info(f"No previous s3://{bucket}/{self.CURRENT_KEY}: {e}")
+            return {}, None
+
+    def _swap_pointer(self, bucket: str, pointer: Dict, previous: Dict, etag: Optional[str]) -> bool:
+        """
+        Write data/current.json unless it would not change.
+
+        The pointer is the only object that is overwritten: a display either
+        reads the old pointer (and old, still existing versions) or the new one.
+        The PUT only succeeds if the pointer still has the ETag that was read
+        (or still doesn't exist). After losing a race the pointer is re-read:
+        if it was generated later than ours (a newer pipeline run) this run is
+        superseded, otherwise (e.g. the re-render's once-a-day display rebuild)
+        the swap is retried against the new ETag.
+
+        Args:
+            pointer: New pointer
+            previous: Pointer that was read
+            etag: ETag of the pointer that was read (None: no pointer yet)
+
+        Returns:
+            True if the pointer was written, False if it was unchanged
+
+        Raises:
+            _Superseded: A newer run swapped the pointer first
+        """
+        content_hash = self._content_hash(pointer)
+        for attempt in range(self.POINTER_RETRIES):
+            if previous and self._content_hash(previous) == content_hash:
+                return False
+            condition = {'IfMatch': etag} if etag else {'IfNoneMatch': '*'}
+            try:
+                self._put(
+                    bucket, self.CURRENT_KEY, serialize_schedule(pointer), content_hash,
+                    cache_control=self.POINTER_CACHE_CONTROL, condition=condition,
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                    raise ProcessorError(self.name, f"Failed to swap {self.CURRENT_KEY}: {e}", e)
+                previous, etag = self._get_pointer(bucket)
+                if previous.get('generated_at', '') > pointer['generated_at']:
+                    raise _Superseded(f"{self.CURRENT_KEY} swapped by a newer run ({previous['generated_at']})")
+                logger.warning(f"{self.CURRENT_KEY} changed concurrently, retrying ({attempt + 1})")
+                continue
+            except Exception as e:
+                raise ProcessorError(self.name, f"Failed to swap {self.CURRENT_KEY}: {e}", e)
+            logger.info(f"Swapped {self.CURRENT_KEY} to seq {pointer['seq']}, {pointer['schedule']}")
+            return True
+
+        raise ProcessorError(self.name, f"{self.CURRENT_KEY} kept changing concurrently")
+
+    def _referenced_keys(self, pointer: Dict, manifest: Dict) -> set:
+        """Version keys (without encoding suffix) the pointer reaches."""
+        editions = [''] + [f'.{lang}' for lang in manifest['languages']]
+        keys = {pointer['schedule'], pointer['manifest'], *pointer['displays'].values()}
+        for entry in manifest['dates'].values():
+            keys.update(self._edition_key(entry['key'], edition) for edition in editions)
+        return keys
+
+    def _collect_versions(self, bucket: str, referenced: set) -> int:
+        """
+        Delete versions that are not referenced and older than VERSION_RETENTION.
+
+        Best effort: a failure is logged and retried by the next run.
+
+        Returns:
+            Number of objects deleted
+        """
+        cutoff = datetime.now(timezone.utc) - self.VERSION_RETENTION
+        expired = []
+        try:
+            kwargs = {'Bucket': bucket, 'Prefix': self.VERSION_PREFIX}
+            while True:
+                response = self.s3_client.list_objects_v2(**kwargs)
+                for obj in response.get('Contents', []):
+                    key = obj['Key']
+                    base = key[:-3] if key.endswith(('.gz', '.br')) else key
+                    if base not in referenced and obj['LastModified'] < cutoff:
+                        expired.append(key)
+                if not response.get('IsTruncated'):
+                    break
+                kwargs['ContinuationToken'] = response['NextContinuationToken']
+            self._delete_keys(bucket, expired)
+        except Exception as e:
+            logger.warning(f"Version cleanup failed: {e}")
+            return 0
+
+        if expired:
+            logger.info(f"Deleted {len(expired)} expired versions")
+        return len(expired)
+
+    def _build_shards(self, schedule: Dict, cards_per_page: int) -> Dict[str, Dict]:
+        """
+        Split the schedule into one document per date.
+
+        Returns:
+            Dict mapping YYYY-MM-DD -> {date (DD.MM.YYYY), generated_at, lessons,
+            pages, slots, timeline}
+        """
+        shards = {}
+        for date, lessons in schedule['all_lessons_by_date'].items():
+            parts = date.split('.')
+            if len(parts) != 3:
+                continue
+            day, month, year = parts
+            shards[f'{year}-{month}-{day}'] = {
+                'date': date,
+                'generated_at': schedule['generated_at'],
+                'lessons': lessons,
+                'pages': self._build_pages(lessons, cards_per_page),
+                'slots': self._slot_table(),
+                'timeline': self._build_timeline(lessons, date),
+            }
+        return shards
+
+    def _build_pages(self, lessons: List[Dict], cards_per_page: int) -> List[Dict]:
+        """
+        Group a date's lessons (sorted by start) into rotation pages.
+
+        Returns:
+            Pages in slot order: slot, label, start_window, main_window,
+            lesson_ids and durations_ms
+        """
+        by_slot: Dict[int, List[str]] = {}
+        for lesson in lessons:
+            slot = self._slot_for(lesson.get('start', ''))
+            if slot is not None:
+                by_slot.setdefault(slot['id'], []).append(lesson['id'])
+
+        pages = []
+        for slot in self.TIME_SLOTS:
+            ids = by_slot.get(slot['id'])
+            if not ids:
+                continue
+            parts = -(-len(ids) // cards_per_page)
+            size = -(-len(ids) // parts)  # Split evenly
+            for part in range(parts):
+                pages.append({
+                    'slot': slot['id'],
+                    'label': slot['label'] if parts == 1 else f"{slot['label']} {part + 1}/{parts}",
+                    'start_window': list(slot['start']),
+                    'main_window': list(slot['main']),
+                    'lesson_ids': ids[part * size:(part + 1) * size],
+                    'durations_ms': dict(self.PAGE_DURATIONS_MS),
+                })
+        return pages
+
+    def _slot_table(self) -> List[Dict]:
+        """
+        Every time slot with its windows, including slots without lessons, so a
+        display resolves the main slot from the clock rather than from its pages.
+        """
+        return [
+            {
+                'slot': slot['id'],
+                'label': slot['label'],
+                'start_window': list(slot['start']),
+                'main_window': list(slot['main']),
+            }
+            for slot in self.TIME_SLOTS
+        ]
+
+    def _slot_for(self, start: str) -> Optional[Dict]:
+        """Time slot of a HH:MM start time (closest earlier slot if between slots)."""
+        try:
+            hours, minutes = start.split(':')
+            minute = int(hours) * 60 + int(minutes)
+        except ValueError:
+            return None
+
+        earlier = [slot for slot in self.TIME_SLOTS if slot['start'][0] <= minute]
+        return earlier[-1] if earlier else self.TIME_SLOTS[0]
+
+    def _cards_per_page(self, config: Dict) -> int:
+        """Lesson cards per page from enrichment config, or default."""
+        display_config = config.get('enrichment', {}).get('display', {})
+        return max(1, int(display_config.get('cards_per_page', self.DEFAULT_CARDS_PER_PAGE)))
+
+    def _upload_shards(
+        self,
+        bucket: str,
+        schedule: Dict,
+        config: Dict,
+        previous_pointer: Dict
+    ) -> Tuple[Dict[str, int], str, Dict]:
+        """
+        Upload changed per-date shards, their delta and the manifest as immutable versions.
+
+        Every shard and delta is written once language-neutral and once per
+        configured language (see _localize). Shards of removed dates are left
+        to _collect_versions.
+
+        Returns:
+            Tuple of (counts of shards written, unchanged and removed plus the
+            feed seq, manifest key, manifest)
+        """
+        languages = self._languages(config)
+        editions = [''] + [f'.{lang}' for lang in languages]
+        cards_per_page = self._cards_per_page(config)
+        # Config changes (e.g. a new translation) must rewrite every shard
+        rendering = self._content_hash({
+            'cards_per_page': cards_per_page,
+            'languages': languages,
+            'dictionaries': config.get('dictionaries', {}),
+            'ui_translations': {lang: config['ui_translations'][lang] for lang in languages},
+        })
+
+        previous_key = previous_pointer.get('manifest')
+        previous = self._get_json(bucket, previous_key).get('dates', {}) if previous_key else {}
+        entries: Dict[str, Dict[str, Any]] = {}
+        changes: Dict[str, Dict[str, Dict[str, Any]]] = {edition: {} for edition in editions}
+
+        try:
+            for iso_date, shard in sorted(self._build_shards(schedule, cards_per_page).items()):
+                content_hash = self._content_hash({**shard, 'rendering': rendering})
+                key = self._version_key(iso_date, content_hash)
+                entries[iso_date] = {
+                    'date': shard['date'],
+                    'key': key,
+                    'hash': content_hash,
+                    'count': len(shard['lessons']),
+                }
+                if previous.get(iso_date, {}).get('hash') == content_hash:
+                    continue
+
+                for edition in editions:
+                    document = self._localize(shard, edition[1:], config) if edition else shard
+                    old_key = previous.get(iso_date, {}).get('key')
+                    old = self._get_json(bucket, self._edition_key(old_key, edition)) if old_key else {}
+                    change = self._diff_lessons(old.get('lessons'), document['lessons'])
+                    if not change.get('full'):
+                        change['pages'] = document['pages']
+                        change['timeline'] = document['timeline']
+                    changes[edition][iso_date] = change
+                    self._put_json(
+                        bucket, self._edition_key(key, edition), document, content_hash,
+                        self.IMMUTABLE_CACHE_CONTROL,
+                    )
+
+            removed = sorted(set(previous) - set(entries))
+            for iso_date in removed:
+                for edition in editions:
+                    changes[edition][iso_date] = {'full': True, 'count': 0}
+
+            seq = previous_pointer.get('seq', 0)
+            min_seq = previous_pointer.get('min_seq', seq)
+            if changes['']:
+                seq, min_seq = self._append_feed(bucket, changes, schedule['generated_at'], previous_pointer)
+
+            manifest = {
+                'generated_at': schedule['generated_at'],
+                'seq': seq,
+                'min_seq': min_seq,
+                'languages': languages,
+                'dates': entries,
+            }
+            manifest_hash = self._content_hash(manifest)
+            manifest_key = self._version_key('manifest', manifest_hash)
+            if manifest_key != previous_key:
+                self._put(
+                    bucket, manifest_key, serialize_schedule(manifest), manifest_hash,
+                    cache_control=self.IMMUTABLE_CACHE_CONTROL,
+                )
+        except _Superseded:
+            raise
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload shards to S3: {e}", e)
+
+        written = len(changes['']) - len(removed)
+        logger.info(
+            f"Shards: {written} written, {len(entries) - written} unchanged, "
+            f"{len(removed)} removed (feed seq {seq}, languages {languages})"
+        )
+        stats = {'written': written, 'unchanged': len(entries) - written, 'removed': len(removed), 'seq': seq}
+        return stats, manifest_key, manifest
+
+    def _displays(self, config: Dict) -> List[Dict]:
+        """Valid entries of the enrichment display registry (invalid ones are logged and skipped)."""
+        displays = []
+        for display in config.get('enrichment', {}).get('displays') or []:
+            display_id = display.get('id') if isinstance(display, dict) else None
+            if not display_id or not re.fullmatch(r'[a-z0-9][a-z0-9-]*', display_id):
+                logger.warning(f"Skipping display without a valid id (lowercase, digits, '-'): {display}")
+                continue
+            displays.append(display)
+        return displays
+
+    def _upload_displays(
+        self,
+        bucket: str,
+        schedule: Dict,
+        config: Dict,
+        previous_keys: Dict[str, str]
+    ) -> Tuple[Dict[str, int], Dict[str, str], List[Dict]]:
+        """
+        Upload one payload version per registered display: today's lessons of
+        its location and levels, in its language.
+
+        Returns:
+            Tuple of (counts of payloads written and unchanged, display ID ->
+            version key, payloads)
+        """
+        displays = self._displays(config)
+        if not displays:
+            return {'written': 0, 'unchanged': 0}, {}, []
+
+        year, month, day = schedule['date'].split('-')
+        today = f'{day}.{month}.{year}'
+        cards_per_page = self._cards_per_page(config)
+        languages = self._languages(config)
+
+        # One pass over today's lessons (already sorted by start)
+        today_lessons = schedule['all_lessons_by_date'].get(today, [])
+        by_location: Dict[str, List[Dict]] = {}
+        for lesson in today_lessons:
+            by_location.setdefault(lesson['location_key'], []).append(lesson)
+
+        written = 0
+        keys = {}
+        payloads = []
+        try:
+            for display in displays:
+                location = display.get('location')
+                lessons = by_location.get(location, []) if location else today_lessons
+                payload = self._display_payload(display, today, lessons, schedule['generated_at'], cards_per_page)
+                lang = display.get('language')
+                if lang in languages:
+                    payload = self._localize(payload, lang, config)
+
+                payloads.append(payload)
+                keys[display['id']], uploaded = self._put_display(bucket, payload, previous_keys.get(display['id']))
+                written += int(uploaded)
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to upload display payloads to S3: {e}", e)
+
+        logger.info(f"Displays: {written} written, {len(displays) - written} unchanged")
+        return {'written': written, 'unchanged': len(displays) - written}, keys, payloads
+
+    def _display_payload(
+        self,
+        display: Dict,
+        today: str,
+        lessons: List[Dict],
+        generated_at: str,
+        cards_per_page: int
+    ) -> Dict:
+        """
+        Payload of a display from today's lessons of its location (sorted by start).
+
+        The filter is included so rerender() can rebuild the payload without configs.
+        """
+        levels = display.get('levels')
+        if levels:
+            lessons = [lesson for lesson in lessons if lesson['level_key'] in levels]
+        return {
+            'display': display['id'],
+            'date': today,
+            'generated_at': generated_at,
+            'lang': display.get('language'),
+            'location': display.get('location'),
+            'levels': levels,
+            'cards_per_page': cards_per_page,
+            'lessons': lessons,
+            'pages': self._build_pages(lessons, cards_per_page),
+            'slots': self._slot_table(),
+            'timeline': self._build_timeline(lessons, today),
+        }
+
+    def _put_display(self, bucket: str, payload: Dict, previous_key: Optional[str]) -> Tuple[str, bool]:
+        """
+        Upload a display payload version unless it is already current.
+
+        Returns:
+            Tuple of (version key, True if uploaded)
+        """
+        content_hash = self._content_hash(payload)
+        key = self._version_key(f"display.{payload['display']}", content_hash)
+        if key == previous_key:
+            return key, False
+        self._put_json(bucket, key, payload, content_hash, self.IMMUTABLE_CACHE_CONTROL)
+        return key, True
+
+    def _languages(self, config: Dict) -> List[str]:
+        """Display languages configured in ui_translations."""
+        return sorted(config.get('ui_translations') or {})
+
+    def _localize(self, shard: Dict, lang: str, config: Dict) -> Dict:
+        """
+        Language edition of a shard: labels resolved with config_loader.translate
+        and the UI texts of the language included, so displays need no config.
+        """
+        dictionaries = config.get('dictionaries', {})
+        lessons = [
+            {
+                **lesson,
+                'group_type': translate(lesson['group_type_key'], 'group_types', lang, dictionaries),
+                'level': translate(lesson['level_key'], 'levels', lang, dictionaries),
+                'location': translate(lesson['location_key'], 'locations', lang, dictionaries),
+            }
+            for lesson in shard['lessons']
+        ]
+        return {
+            **shard,
+            'lang': lang,
+            'ui': config['ui_translations'][lang],
+            'lessons': lessons,
+        }
+
+    def _delete_editions(self, bucket: str, stems: List[str]) -> None:
+        """Delete every language edition and encoding of the given key stems."""
+        keys = set()
+        for stem in stems:
+            response = self.s3_client.list_objects_v2(Bucket=bucket, Prefix=f'{stem}.')
+            keys.update(obj['Key'] for obj in response.get('Contents', []))
+            keys.update(f'{stem}.json{suffix}' for suffix in ('', '.gz', '.br'))
+        self._delete_keys(bucket, sorted(keys))
+
+    def _delete_keys(self, bucket: str, keys: List[str]) -> None:
+        """DeleteObjects in batches of 1000 (the API limit)."""
+        for i in range(0, len(keys), 1000):
+            self.s3_client.delete_objects(Bucket=bucket, Delete={
+                'Objects': [{'Key': key} for key in keys[i:i + 1000]],
+            })
+
+    def _diff_lessons(self, old: Optional[List[Dict]], new: List[Dict]) -> Dict[str, Any]:
+        """
+        Operations turning the old lessons of a date into the new ones.
+
+        Returns:
+            {upsert: {id: lesson}, remove: [id], count} or {full: True, count}
+            when the old lessons are unknown
+        """
+        if old is None or any('id' not in lesson for lesson in old):
+            return {'full': True, 'count': len(new)}
+
+        old_by_id = {lesson['id']: lesson for lesson in old}
+        new_by_id = {lesson['id']: lesson for lesson in new}
+        return {
+            'upsert': {
+                lesson_id: lesson for lesson_id, lesson in new_by_id.items()
+                if old_by_id.get(lesson_id) != lesson
+            },
+            'remove': sorted(set(old_by_id) - set(new_by_id)),
+            'count': len(new),
+        }
+
+    def _append_feed(
+        self,
+        bucket: str,
+        changes: Dict[str, Dict[str, Dict]],
+        generated_at: str,
+        previous_pointer: Dict
+    ) -> Tuple[int, int]:
+        """
+        Write the next delta (per edition); drop expired deltas.
+
+        Every object of a delta is written with If-None-Match: *, so of two
+        runs that read the same pointer only the first claims the seq; the
+        other is superseded instead of overwriting the delta clients apply.
+        Without a pointer the sequence continues after the deltas still in
+        the feed. Deltas keep the short cache: a sequence restarting after a
+        lost pointer must not be answered with cached deltas of the old one.
+
+        Args:
+            changes: Edition suffix ('' or '.{lang}') -> {date: operations}
+
+        Returns:
+            Tuple of (sequence number of the new delta, oldest retained seq)
+
+        Raises:
+            _Superseded: A concurrent run wrote this seq first
+        """
+        last = previous_pointer['seq'] if 'seq' in previous_pointer else self._last_feed_seq(bucket)
+        seq = last + 1
+        min_seq = max(previous_pointer.get('min_seq', seq), seq - self.FEED_RETENTION + 1)
+
+        for edition, dates in changes.items():
+            delta = {'seq': seq, 'generated_at': generated_at, 'dates': dates}
+            try:
+                self._put_json(
+                    bucket, f'{self.FEED_PREFIX}{seq}{edition}.json', delta, self._content_hash(delta),
+                    condition={'IfNoneMatch': '*'},
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                    raise
+                raise _Superseded(f"Delta {seq} written by a concurrent run")
+
+        expired = seq - self.FEED_RETENTION
+        if expired > 0:
+            self._delete_editions(bucket, [f'{self.FEED_PREFIX}{expired}'])
+        return seq, min_seq
+
+    def _last_feed_seq(self, bucket: str) -> int:
+        """Highest seq in the feed (0 if empty or unreadable)."""
+        seqs = [0]
+        try:
+            kwargs = {'Bucket': bucket, 'Prefix': self.FEED_PREFIX}
+            while True:
+                response = self.s3_client.list_objects_v2(**kwargs)
+                for obj in response.get('Contents', []):
+                    match = re.match(r'(\d+)\.', obj['Key'][len(self.FEED_PREFIX):])
+                    if match:
+                        seqs.append(int(match.group(1)))
+                if not response.get('IsTruncated'):
+                    break
+                kwargs['ContinuationToken'] = response['NextContinuationToken']
+        except Exception as e:
+            logger.warning(f"Could not list {self.FEED_PREFIX}, starting the feed at 1: {e}")
+        return max(seqs)
+
+    def _get_json(self, bucket: str, key: str) -> Dict:
+        """Previously uploaded JSON document ({} if missing or unreadable)."""
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            return json.loads(response['Body'].read())
+        except Exception as e:
+            logger.info(f"No previous s3://{bucket}/{key}: {e}")
+            return {}
+
+    def _put_json(
+        self,
+        bucket: str,
+        key: str,
+        document: Dict,
+        content_hash: str,
+        cache_control: str = 'max-age=60',
+        condition: Optional[Dict[str, str]] = None
+    ) -> Dict[str, int]:
+        """
+        Upload a JSON document with its compressed variants (plain object last).
+
+        Args:
+            condition: Optional IfMatch/IfNoneMatch for every object written
+
+        Returns:
+            Bytes per encoding
+        """
+        body = serialize_schedule(document)
+        sizes = {'identity': len(body)}
+        for suffix, (encoding, compressed) in compress_variants(body).items():
+            self._put(bucket, key + suffix, compressed, content_hash, encoding, cache_control, condition)
+            sizes[encoding] = len(compressed)
+        self._put(bucket, key, body, content_hash, cache_control=cache_control, condition=condition)
+        return sizes
+
+    def _put(
+        self,
+        bucket: str,
+        key: str,
+        body: bytes,
+        content_hash: str,
+        encoding: Optional[str] = None,
+        cache_control: str = 'max-age=60',  # Short cache for frequent updates
+        condition: Optional[Dict[str, str]] = None
+    ) -> None:
+        """PutObject a JSON body (optionally pre-compressed, optionally conditional: IfMatch/IfNoneMatch)."""
+        kwargs = {'ContentEncoding': encoding} if encoding else {}
+        kwargs.update(condition or {})
+        self.s3_client.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body,
+            ContentType='application/json',
+            CacheControl=cache_control,
+            Metadata={self.HASH_METADATA_KEY: content_hash},
+            **kwargs,
+        )
@@ -170,3 +170,31 @@ def get_instructor_for_booking(
                 return profile
 
     return None
+
+
+def build_booking_index(instructors_data: dict) -> Dict[str, str]:
+    """
+    Helper function to index roster assignments by booking.
+
+    Resolves the same instructor as get_instructor_for_booking (first
+    assignment whose instructor has a profile), but in one pass over the
+    roster so each booking lookup is a dict access.
+
+    Args:
+        instructors_data: The raw.instructors data
+
+    Returns:
+        Dict mapping booking_id -> instructor_id
+    """
+    roster = instructors_data.get('roster', {})
+    profiles = instructors_data.get('profiles', {})
+
+    index: Dict[str, str] = {}
+    for assignment in roster.get('assignments', []):
+        instructor_id = assignment.get('instructor_id')
+        if not instructor_id or instructor_id not in profiles:
+            continue
+        for booking_id in assignment.get('booking_ids', []):
+            index.setdefault(booking_id, instructor_id)
+
+    return index
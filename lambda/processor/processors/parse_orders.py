@@ -17,7 +17,9 @@ from typing import List, Dict, Any, Optional
 
 import boto3
 
+from metrics import emit_metrics
 from processors import Processor, ProcessorError
+from time_index import to_epoch_minutes
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +28,9 @@ class ParseOrdersProcessor(Processor):
     """
     Parse TSV orders file and convert to internal lesson format.
 
-    Reads TSV from S3, deduplicates conflicting orders, groups participants
-    by order_id and time slot, filters out invalid records (1970 dates).
+    Reads TSV from S3, filters out invalid records (1970 dates, missing
+    fields, unparseable timestamps), deduplicates conflicting orders and
+    groups participants by order_id and time slot.
     """
 
     # Required TSV columns
@@ -83,7 +86,7 @@ class ParseOrdersProcessor(Processor):
             logger.info(f"Parsed {len(records)} raw records from {key}")
 
             # Filter invalid records
-            valid_records = self._filter_invalid(records)
+            valid_records = self._filter_invalid(records, data['metadata'])
             logger.info(f"Filtered to {len(valid_records)} valid records")
 
             # Deduplicate conflicting orders (same participant+sponsor+time, different order_id)
@@ -129,42 +132,79 @@ class ParseOrdersProcessor(Processor):
 
         return records
 
-    def _filter_invalid(self, records: List[Dict]) -> List[Dict]:
+    def _filter_invalid(self, records: List[Dict], metadata: Optional[Dict] = None) -> List[Dict]:
         """
-        Filter out invalid records.
+        Filter out invalid records before any grouping or merge work.
 
         Invalid records:
         - date_lesson = "01.01.1970"
         - timestamp contains "1970-01-01"
         - Missing required fields
+        - Start or end timestamp that doesn't parse
+
+        Valid records get start_min/end_min (epoch minutes) so the
+        timestamps are parsed only once. Rejected rows are counted per
+        reason in metadata['rows_rejected'].
         """
         valid = []
-        filtered_count = 0
+        rejected: Dict[str, int] = {}
 
         for record in records:
-            # Check for 1970 dates (placeholder/invalid)
-            date_lesson = record.get('date_lesson', '')
-            timestamp_start = record.get('timestamp_start_lesson', '')
-
-            if '1970' in date_lesson or '1970' in timestamp_start:
-                logger.debug(f"Filtered invalid date: {date_lesson}")
-                filtered_count += 1
-                continue
-
-            # Check for required fields
-            missing = [col for col in self.REQUIRED_COLUMNS if not record.get(col)]
-            if missing:
-                logger.debug(f"Filtered missing fields: {missing}")
-                filtered_count += 1
+            reason = self._reject_reason(record)
+            if reason:
+                rejected[reason] = rejected.get(reason, 0) + 1
                 continue
-
             valid.append(record)
 
-        if filtered_count > 0:
-            logger.info(f"Filtered {filtered_count} invalid records")
+        if rejected:
+            logger.info(f"Filtered {sum(rejected.values())} invalid records: {rejected}")
+            emit_metrics(
+                {f'Rejected.{reason}': count for reason, count in rejected.items()},
+                dimensions={'Stage': 'ParseOrders'},
+            )
+
+        if metadata is not None:
+            rows_rejected = metadata.setdefault('rows_rejected', {})
+            for reason, count in rejected.items():
+                rows_rejected[reason] = rows_rejected.get(reason, 0) + count
 
         return valid
 
+    def _reject_reason(self, record: Dict) -> str:
+        """
+        Check a single TSV row.
+
+        Parses the lesson timestamps into record['start_min'] and
+        record['end_min'] when the row is valid.
+
+        Returns:
+            Reject reason, or '' if the row is valid
+        """
+        # Check for 1970 dates (placeholder/invalid)
+        date_lesson = record.get('date_lesson', '')
+        timestamp_start = record.get('timestamp_start_lesson', '')
+
+        if '1970' in date_lesson or '1970' in timestamp_start:
+            return 'invalid_date'
+
+        # Check for required fields
+        for col in self.REQUIRED_COLUMNS:
+            if not record.get(col):
+                return f'missing_{col}'
+
+        # Check timestamps parse (the only time-format check in the pipeline)
+        start_min = to_epoch_minutes(timestamp_start)
+        if start_min is None:
+            return 'invalid_start_time'
+
+        end_min = to_epoch_minutes(record.get('timestamp_end_lesson', ''))
+        if end_min is None:
+            return 'invalid_end_time'
+
+        record['start_min'] = start_min
+        record['end_min'] = end_min
+        return ''
+
     def _deduplicate_orders(self, records: List[Dict]) -> List[Dict]:
         """
         Deduplicate conflicting orders.
@@ -248,6 +288,8 @@ class ParseOrdersProcessor(Processor):
                     'date_lesson': date,
                     'timestamp_start': start,
                     'timestamp_end': end,
+                    'start_min': record.get('start_min'),  # Epoch minutes (parsed in filter)
+                    'end_min': record.get('end_min'),
                     'level': level,
                     'group_type': group_type,  # privát, malá skupina, velká skupina
                     'location_meeting': location,
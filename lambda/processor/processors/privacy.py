@@ -5,12 +5,16 @@ Applies privacy rules to names for public display.
 """
 
 import logging
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Iterable
 
 from processors import Processor, ProcessorError
 
 logger = logging.getLogger(__name__)
 
+# Max distinct sponsor names memoized per (warm) Lambda container
+SPONSOR_CACHE_SIZE = 4096
+
 
 class PrivacyProcessor(Processor):
     """
@@ -39,10 +43,15 @@ class PrivacyProcessor(Processor):
             return data
 
         try:
+            # The cache outlives the run (warm container); report this run's share
+            before = abbreviate_sponsor.cache_info()
+
+            # Abbreviate each distinct sponsor once, then look up per person
+            sponsors = abbreviate_sponsors(self._collect_sponsors(lessons))
+
             for lesson in lessons:
                 # Transform sponsor name
-                original_sponsor = lesson.get('sponsor', '')
-                lesson['sponsor'] = self._filter_sponsor_name(original_sponsor)
+                lesson['sponsor'] = sponsors[lesson.get('sponsor', '')]
 
                 # People: each has {name, language, sponsor}
                 # Names are already given names only - no transformation needed
@@ -52,11 +61,10 @@ class PrivacyProcessor(Processor):
                 for p in people:
                     if isinstance(p, dict):
                         # New format with language and sponsor
-                        sponsor_filtered = self._filter_sponsor_name(p.get('sponsor', ''))
                         filtered_people.append({
                             'name': str(p.get('name', '')).strip(),
                             'language': str(p.get('language', '')).strip(),
-                            'sponsor': sponsor_filtered,
+                            'sponsor': sponsors[p.get('sponsor', '')],
                         })
                     elif p:
                         # Legacy string format
@@ -67,6 +75,13 @@ class PrivacyProcessor(Processor):
                         })
                 lesson['people'] = filtered_people
 
+            cache = abbreviate_sponsor.cache_info()
+            data['metadata']['privacy'] = {
+                'unique_sponsors': len(sponsors),
+                'cache_hits': cache.hits - before.hits,
+                'cache_misses': cache.misses - before.misses,
+                'cache_added': cache.currsize - before.currsize,
+            }
             logger.info(f"Applied privacy rules to {len(lessons)} lessons")
 
         except Exception as e:
@@ -74,35 +89,71 @@ class PrivacyProcessor(Processor):
 
         return data
 
+    def _collect_sponsors(self, lessons) -> set:
+        """Collect the raw sponsor strings of all lessons and people."""
+        names = set()
+        for lesson in lessons:
+            names.add(lesson.get('sponsor', ''))
+            for p in lesson.get('people', []):
+                if isinstance(p, dict):
+                    names.add(p.get('sponsor', ''))
+        return names
+
     def _filter_sponsor_name(self, name: str) -> str:
         """
         Filter sponsor name for privacy.
 
-        Abbreviates both names: first 2 letters of given name + first 2 letters of surname
-        Example: "Iryna Schröder" -> "Ir.Sc."
+        See abbreviate_sponsor (memoized).
+        """
+        return abbreviate_sponsor(name)
+
 
-        Args:
-            name: Full sponsor name
+def abbreviate_sponsors(names: Iterable[str]) -> Dict[str, str]:
+    """
+    Abbreviate a batch of sponsor names.
 
-        Returns:
-            Privacy-filtered name (e.g., "Ir.Sc.")
-        """
-        if not name:
-            return ''
+    Args:
+        names: Raw sponsor names (duplicates allowed)
+
+    Returns:
+        Dict mapping each distinct raw name -> privacy-filtered name
+    """
+    return {name: abbreviate_sponsor(name) for name in set(names)}
+
+
+@lru_cache(maxsize=SPONSOR_CACHE_SIZE)
+def abbreviate_sponsor(name: str) -> str:
+    """
+    Filter sponsor name for privacy.
+
+    Abbreviates both names: first 2 letters of given name + first 2 letters of surname
+    Example: "Iryna Schröder" -> "Ir.Sc."
+
+    Memoized on the raw string with a bounded LRU cache that lives as long as
+    the Lambda container, since the same sponsors recur across runs.
+
+    Args:
+        name: Full sponsor name
+
+    Returns:
+        Privacy-filtered name (e.g., "Ir.Sc.")
+    """
+    if not name:
+        return ''
 
-        name = name.strip()
-        parts = name.split()
+    name = name.strip()
+    parts = name.split()
 
-        if len(parts) == 0:
-            return ''
+    if len(parts) == 0:
+        return ''
 
-        if len(parts) == 1:
-            # Only one name part - abbreviate it
-            abbrev = parts[0][:2] if len(parts[0]) >= 2 else parts[0]
-            return f"{abbrev}."
+    if len(parts) == 1:
+        # Only one name part - abbreviate it
+        abbrev = parts[0][:2] if len(parts[0]) >= 2 else parts[0]
+        return f"{abbrev}."
 
-        # First 2 letters of given name + first 2 letters of surname
-        given_abbrev = parts[0][:2] if len(parts[0]) >= 2 else parts[0]
-        surname_abbrev = parts[-1][:2] if len(parts[-1]) >= 2 else parts[-1]
+    # First 2 letters of given name + first 2 letters of surname
+    given_abbrev = parts[0][:2] if len(parts[0]) >= 2 else parts[0]
+    surname_abbrev = parts[-1][:2] if len(parts[-1]) >= 2 else parts[-1]
 
-        return f"{given_abbrev}.{surname_abbrev}."
+    return f"{given_abbrev}.{surname_abbrev}."
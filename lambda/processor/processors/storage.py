@@ -2,17 +2,53 @@
 GoldSport Scheduler - Storage Processor
 
 Stores processed schedule data in DynamoDB.
+
+Writes are diff-based: a per-date MANIFEST item maps lesson ID -> content
+hash and version, so each run only writes lessons that were added,
+changed or removed since the previous run.
+
+Optional snapshot layout: instead of one item per lesson, each changed
+date gets one SNAPSHOT#{timestamp} item holding all its lessons as a
+zlib-compressed, column-encoded JSON blob (see encode_snapshot). Snapshots
+too large for a DynamoDB item are stored in S3 and the item points there.
+
+Storage horizon: dates that ended more than horizon_days ago are final.
+Their LATEST pointers are fetched in bulk and dates whose content hash
+still matches are skipped without any per-date reads or writes. Today's
+date is always written first.
+
+Emptied dates: a date whose lessons were all cancelled has no lessons in
+the run. The manifests of the dates from the horizon to LOOKAHEAD_DAYS
+ahead are fetched in bulk, and stored dates that still list lessons are
+written as empty (tombstones, empty manifest, META and LATEST).
+
+Dates are written in parallel by a bounded thread pool. All workers share
+the low-level DynamoDB client (thread-safe, one connection pool) and one
+BulkWriter, which retries unprocessed items in the calling worker with
+jittered backoff and lowers the number of batches in flight while the table
+is throttled. boto3 resources (Table) are not thread-safe, so workers never
+use them: single-item reads and writes go through the client as well.
 """
 
-import logging
 import hashlib
-from datetime import datetime, timezone
-from typing import Dict, Any, List
+import json
+import logging
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 
 import boto3
+from boto3.dynamodb.conditions import Attr, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from botocore.exceptions import ClientError
 
+from bulk_writer import BulkWriter
+from metrics import emit_metrics
 from processors import Processor, ProcessorError
+from processors.merge_data import generate_lesson_id
+from time_index import epoch_minutes, local_date
 
 logger = logging.getLogger(__name__)
 
@@ -22,31 +58,103 @@ class StorageProcessor(Processor):
     Store processed lessons in DynamoDB with versioning.
 
     Schema (with versioning):
-    - PK: SCHEDULE#{date}, SK: META#{timestamp} - Schedule metadata
-    - PK: SCHEDULE#{date}, SK: LESSON#{timestamp}#{id} - Individual lessons
-
-    Each processing run creates new entries with unique timestamps,
-    preserving history for auditing and debugging.
+    - PK: SCHEDULE#{date}, SK: LATEST - Pointer to the latest stored version (and its content hash)
+    - PK: SCHEDULE#{date}, SK: MANIFEST - Current lessons: {id: {hash, version}}
+    - PK: SCHEDULE#{date}, SK: META#{timestamp} - Metadata of a run that changed the date
+    - PK: SCHEDULE#{date}, SK: LESSON#{timestamp}#{id} - Lesson version (or tombstone)
+    - PK: SCHEDULE#{date}, SK: SNAPSHOT#{timestamp} - All lessons of a version
+      (snapshot layout only; replaces the LESSON items)
+
+    Only lessons whose content hash differs from the manifest get a new
+    LESSON item; removed lessons get a tombstone item (deleted=True).
+    Dates without changes are not written at all, so write capacity scales
+    with churn rather than with season size. The current schedule of a date
+    is the manifest plus the LESSON items it references; each META item
+    carries the same {id: version} map for the version it created.
+
+    Retention: tombstones get an expires_at TTL attribute. META items do
+    not: the latest version of a date (and the final version of a past day)
+    must stay readable however long the date goes unchanged, so superseded
+    versions are pruned by compaction.py instead. The manifest and the
+    LESSON items it references never expire.
     """
 
     BATCH_SIZE = 25  # DynamoDB batch write limit
 
-    def __init__(self, dynamodb_resource=None, timestamp_override=None):
+    MANIFEST_SK = 'MANIFEST'
+    LATEST_SK = 'LATEST'
+
+    # Attempts to update a manifest changed concurrently by another run
+    MANIFEST_RETRIES = 3
+
+    # Days until tombstones expire via TTL
+    RETENTION_DAYS = 30
+
+    # Parallel date writers (stays below botocore's default pool of 10 connections)
+    MAX_WORKERS = 8
+
+    # Storage layouts: one item per lesson, or one compressed item per date
+    LAYOUTS = ('items', 'snapshot')
+
+    # Largest inline snapshot blob (DynamoDB items are limited to 400KB)
+    SNAPSHOT_MAX_BYTES = 350_000
+
+    # S3 key prefix (input bucket) for snapshots over SNAPSHOT_MAX_BYTES
+    SNAPSHOT_PREFIX = 'snapshots/'
+
+    # DynamoDB BatchGetItem limit
+    BATCH_GET_SIZE = 100
+
+    # Days ahead checked for stored dates that lost all their lessons
+    # (bookings are fetched about three weeks ahead)
+    LOOKAHEAD_DAYS = 60
+
+    # Retries per batch (unprocessed items or throttling), jittered backoff
+    # starting at RETRY_BASE_DELAY
+    MAX_RETRIES = 8
+    RETRY_BASE_DELAY = 0.05  # seconds
+
+    def __init__(
+        self,
+        dynamodb_resource=None,
+        timestamp_override=None,
+        max_workers=None,
+        layout: str = 'items',
+        s3_client=None,
+        horizon_days: Optional[int] = None
+    ):
         """
         Initialize the processor.
 
         Args:
             dynamodb_resource: Optional boto3 DynamoDB resource (for testing)
             timestamp_override: Optional timestamp string for testing
+            max_workers: Optional number of parallel date writers (default MAX_WORKERS)
+            layout: 'items' (one item per lesson) or 'snapshot' (one item per date)
+            s3_client: Optional boto3 S3 client for snapshot overflow (for testing)
+            horizon_days: Optional storage horizon; dates more than this many days
+                before today are skipped when unchanged (None: check every date)
         """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Unknown storage layout: {layout}")
+
         self.dynamodb = dynamodb_resource or boto3.resource('dynamodb')
-        self._table = None
+        self.max_workers = max_workers or self.MAX_WORKERS
+        self.layout = layout
+        self.s3_client = s3_client
+        self.horizon_days = horizon_days
+        self._snapshot_bucket = None
+        self._table_name = None
+        self._client = None
+        self._writer = None
         self._timestamp_override = timestamp_override
         self._processing_timestamp = None
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
 
     def process(self, data: dict) -> dict:
         """
-        Store lessons in DynamoDB with versioning.
+        Store changed lessons in DynamoDB.
 
         Args:
             data: Pipeline data with lessons
@@ -65,7 +173,10 @@ class StorageProcessor(Processor):
             return data
 
         try:
-            self._table = self.dynamodb.Table(table_name)
+            # Every worker call goes through the shared, thread-safe low-level client
+            self._table_name = table_name
+            self._snapshot_bucket = data['config'].get('input_bucket')
+            self._client = self.dynamodb.meta.client
 
             # Generate processing timestamp (once per run for consistency)
             self._processing_timestamp = (
@@ -73,16 +184,79 @@ class StorageProcessor(Processor):
                 datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
             )
 
-            # Group lessons by date
+            # Group lessons by date (plus stored dates that lost all lessons), today first
             lessons_by_date = self._group_by_date(lessons)
-
-            total_stored = 0
-            for date, date_lessons in lessons_by_date.items():
-                stored = self._store_date_schedule(date, date_lessons, data['metadata'])
-                total_stored += stored
-
+            emptied = self._emptied_dates(set(lessons_by_date))
+            if emptied:
+                logger.info(f"Removing all lessons of {len(emptied)} dates: {emptied}")
+                lessons_by_date.update((date, []) for date in emptied)
+            lessons_by_date = self._order_dates(lessons_by_date)
+            content = {date: self._date_content(l) for date, l in lessons_by_date.items()}
+
+            # Skip final dates that are already stored unchanged
+            skipped = self._unchanged_final_dates(content) if self.horizon_days is not None else set()
+            if skipped:
+                logger.info(f"Skipping {len(skipped)} unchanged dates beyond the storage horizon")
+
+            # Fan dates out over the pool; each worker fills its own counters
+            workers = max(1, min(self.max_workers, len(lessons_by_date) - len(skipped)))
+            self._writer = BulkWriter(
+                self._client,
+                table_name,
+                max_concurrency=workers,
+                max_retries=self.MAX_RETRIES,
+                base_delay=self.RETRY_BASE_DELAY,
+            )
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                jobs = []
+                for date, date_lessons in lessons_by_date.items():
+                    if date in skipped:
+                        continue
+                    date_stats = self._new_stats()
+                    future = pool.submit(
+                        self._store_date_schedule, date, date_lessons, data['metadata'],
+                        date_stats, content[date],
+                    )
+                    jobs.append((future, date_stats))
+
+                stats = self._new_stats()
+                total_stored = 0
+                for future, date_stats in jobs:
+                    total_stored += future.result()
+                    for name, value in date_stats.items():
+                        stats[name] += value
+            elapsed = time.monotonic() - started
+
+            writes = self._writer.stats()
+            stats['items_written'] = total_stored
+            stats['skipped_dates'] = len(skipped)
+            stats['emptied_dates'] = len(emptied)
+            stats['workers'] = workers
+            stats['batch_calls'] = writes['batch_calls']
+            stats['unprocessed_retries'] = writes['retries']
+            stats['throttles'] = writes['throttles']
+            stats['duplicates'] = writes['duplicates']
+            stats['concurrency'] = writes['concurrency']
+            stats['min_concurrency'] = writes['min_concurrency']
+            stats['seconds'] = round(elapsed, 3)
+            stats['items_per_second'] = round(total_stored / elapsed, 1) if elapsed > 0 else 0.0
             data['metadata']['lessons_stored'] = total_stored
-            logger.info(f"Stored {total_stored} lessons in DynamoDB")
+            data['metadata']['storage'] = stats
+            logger.info(
+                f"Stored {total_stored} items in DynamoDB: {stats['added']} added, "
+                f"{stats['changed']} changed, {stats['removed']} removed, "
+                f"{stats['unchanged']} unchanged ({workers} workers, "
+                f"{stats['items_per_second']} items/s, {stats['throttles']} throttled)"
+            )
+            emit_metrics(
+                {
+                    'StoredItems': total_stored,
+                    'WriteRetries': stats['unprocessed_retries'],
+                    'WriteThrottles': stats['throttles'],
+                },
+                dimensions={'Stage': 'Storage'},
+            )
 
         except ProcessorError:
             raise
@@ -91,6 +265,10 @@ class StorageProcessor(Processor):
 
         return data
 
+    def _new_stats(self) -> Dict[str, int]:
+        """Empty storage counters."""
+        return {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0, 'dates_written': 0}
+
     def _group_by_date(self, lessons: List[Dict]) -> Dict[str, List[Dict]]:
         """Group lessons by date."""
         by_date = {}
@@ -102,19 +280,130 @@ class StorageProcessor(Processor):
                 by_date[date].append(lesson)
         return by_date
 
+    def _order_dates(self, by_date: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Order dates for writing: today, then upcoming dates, then past dates
+        (most recent first), so a timeout never leaves today unwritten.
+        """
+        today = self._today()
+
+        def priority(date: str):
+            day = _date_key(date)
+            if day >= today:
+                return (0, day)
+            return (1, tuple(-part for part in day))
+
+        return {date: by_date[date] for date in sorted(by_date, key=priority)}
+
+    def _today(self) -> Tuple[int, int, int]:
+        """Today's Prague date (as of the processing timestamp) as (year, month, day)."""
+        processed = datetime.strptime(self._processing_timestamp, '%Y-%m-%dT%H:%M:%SZ')
+        return _date_key(local_date(epoch_minutes(processed.replace(tzinfo=timezone.utc))))
+
+    def _date_content(self, lessons: List[Dict]) -> Tuple[Dict[str, Tuple[str, Dict]], str]:
+        """
+        Prepare the lessons of a date.
+
+        Returns:
+            Tuple of (lesson ID -> (hash, DynamoDB item), content hash of the date)
+        """
+        current: Dict[str, Tuple[str, Dict]] = {}
+        for lesson in lessons:
+            item = self._prepare_lesson_item(lesson)
+            current[self._generate_lesson_id(lesson)] = (self._content_hash(item), item)
+
+        digest = hashlib.md5()
+        for lesson_id in sorted(current):
+            digest.update(f"{lesson_id}:{current[lesson_id][0]};".encode())
+        return current, digest.hexdigest()[:16]
+
+    def _unchanged_final_dates(self, content: Dict[str, Tuple[Dict, str]]) -> set:
+        """
+        Find dates beyond the horizon whose stored content hash is unchanged.
+
+        Reads the LATEST items of all final dates with BatchGetItem.
+        """
+        today = datetime(*self._today())
+        final = [
+            date for date in content
+            if (today - datetime(*_date_key(date))).days > self.horizon_days
+        ]
+
+        stored = {
+            date: item.get('content_hash')
+            for date, item in self._batch_get(final, self.LATEST_SK, 'PK, content_hash').items()
+        }
+
+        unchanged = {date for date in final if stored.get(date) == content[date][1]}
+        changed = [date for date in final if date in stored and date not in unchanged]
+        if changed:
+            logger.warning(f"Final dates changed since their last version: {changed}")
+        return unchanged
+
+    def _emptied_dates(self, dates: set) -> List[str]:
+        """
+        Find stored dates within the horizon that have no lessons in this run.
+
+        Past dates beyond the horizon are final: they drop out of the fetched
+        orders without having been cancelled.
+
+        Args:
+            dates: Dates (DD.MM.YYYY) that have lessons in this run
+
+        Returns:
+            Dates whose manifest still lists lessons
+        """
+        today = datetime(*self._today())
+        candidates = [
+            (today + timedelta(days=offset)).strftime('%d.%m.%Y')
+            for offset in range(-(self.horizon_days or 0), self.LOOKAHEAD_DAYS + 1)
+        ]
+        candidates = [date for date in candidates if date not in dates]
+
+        manifests = self._batch_get(candidates, self.MANIFEST_SK, 'PK, lesson_count')
+        return [date for date in candidates if manifests.get(date, {}).get('lesson_count')]
+
+    def _batch_get(self, dates: List[str], sk: str, projection: str) -> Dict[str, Dict]:
+        """
+        BatchGetItem one item (sk) of each date's partition.
+
+        Returns:
+            Dict mapping date -> projected item (dates without the item are left out)
+        """
+        keys = [{'PK': f'SCHEDULE#{date}', 'SK': sk} for date in dates]
+        found: Dict[str, Dict] = {}
+        for i in range(0, len(keys), self.BATCH_GET_SIZE):
+            request = {self._table_name: {
+                'Keys': keys[i:i + self.BATCH_GET_SIZE],
+                'ProjectionExpression': projection,
+            }}
+            for _ in range(self.MAX_RETRIES + 1):
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                for item in response.get('Responses', {}).get(self._table_name, []):
+                    found[item['PK'].split('#', 1)[1]] = item
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    break
+                time.sleep(self.RETRY_BASE_DELAY)
+        return found
+
     def _store_date_schedule(
         self,
         date: str,
         lessons: List[Dict],
-        metadata: Dict
+        metadata: Dict,
+        stats: Optional[Dict[str, int]] = None,
+        content: Optional[Tuple[Dict[str, Tuple[str, Dict]], str]] = None
     ) -> int:
         """
-        Store schedule for a specific date.
+        Store the changes to the schedule of a specific date.
 
         Args:
             date: Date string (DD.MM.YYYY)
             lessons: List of lessons for this date
             metadata: Processing metadata
+            stats: Optional counters (added, changed, removed, unchanged, dates_written)
+            content: Optional result of _date_content(lessons)
 
         Returns:
             Number of items stored
@@ -122,62 +411,315 @@ class StorageProcessor(Processor):
         pk = f"SCHEDULE#{date}"
         ts = self._processing_timestamp
 
-        # Store metadata item with versioned SK
+        # Lesson ID -> (hash, DynamoDB item)
+        current, content_hash = content or self._date_content(lessons)
+
+        items_stored = 0
+
+        for attempt in range(self.MANIFEST_RETRIES):
+            manifest = self._load_manifest(pk)
+            previous = manifest.get('lessons', {}) if manifest else {}
+
+            added = [lid for lid in current if lid not in previous]
+            changed = [
+                lid for lid in current
+                if lid in previous and previous[lid].get('hash') != current[lid][0]
+            ]
+            removed = [lid for lid in previous if lid not in current]
+
+            if not (added or changed or removed):
+                if stats is not None:
+                    stats['unchanged'] += len(current)
+                return items_stored
+
+            if self.layout == 'snapshot':
+                # One item with every lesson of the date
+                snapshot_sk = self._put_snapshot(pk, date, current)
+                items_stored += 1
+                extra = {'layout': 'snapshot', 'snapshot_sk': snapshot_sk}
+                lesson_versions = self._lesson_versions(current, previous)
+                if self._put_manifest(pk, date, lesson_versions, manifest, extra):
+                    break
+                logger.warning(f"Manifest for {date} changed concurrently, retrying ({attempt + 1})")
+                continue
+
+            extra = {}
+
+            # Store new lesson versions and tombstones in batches with versioned SK
+            items = [
+                {'PK': pk, 'SK': f'LESSON#{ts}#{lesson_id}', **current[lesson_id][1]}
+                for lesson_id in added + changed
+            ]
+            items.extend(
+                {
+                    'PK': pk,
+                    'SK': f'LESSON#{ts}#{lesson_id}',
+                    'date': date,
+                    'deleted': True,
+                    'expires_at': self._expires_at(),
+                }
+                for lesson_id in removed
+            )
+            self._batch_write(items)
+            items_stored += len(items)
+
+            lesson_versions = self._lesson_versions(current, previous)
+
+            if self._put_manifest(pk, date, lesson_versions, manifest):
+                break
+            logger.warning(f"Manifest for {date} changed concurrently, retrying ({attempt + 1})")
+        else:
+            raise ProcessorError(self.name, f"Manifest for {date} kept changing concurrently")
+
+        items_stored += 1
+
+        # Store metadata item with versioned SK, pointing at the manifest
         meta_item = {
             'PK': pk,
             'SK': f'META#{ts}',
             'date': date,
             'lesson_count': len(lessons),
             'generated_at': ts,
+            'manifest_sk': self.MANIFEST_SK,
+            'manifest_version': ts,
+            'added': len(added),
+            'changed': len(changed),
+            'removed': len(removed),
+            'lessons': lesson_versions,
             'data_sources': metadata.get('data_sources', {}),
             'records_filtered': metadata.get('records_filtered', 0),
+            **extra,
         }
 
         try:
-            self._table.put_item(Item=meta_item)
+            self._put_item(meta_item)
         except ClientError as e:
             logger.error(f"Failed to store metadata: {e}")
             raise
 
-        # Store lesson items in batches with versioned SK
-        items_stored = 1  # Count metadata item
+        items_stored += 1
 
-        with self._table.batch_writer() as batch:
-            for lesson in lessons:
-                lesson_id = self._generate_lesson_id(lesson)
-                item = {
-                    'PK': pk,
-                    'SK': f'LESSON#{ts}#{lesson_id}',
-                    **self._prepare_lesson_item(lesson)
-                }
-                batch.put_item(Item=item)
-                items_stored += 1
+        if self._put_latest(pk, date, len(lessons), content_hash, extra):
+            items_stored += 1
+
+        if stats is not None:
+            stats['added'] += len(added)
+            stats['changed'] += len(changed)
+            stats['removed'] += len(removed)
+            stats['unchanged'] += len(current) - len(added) - len(changed)
+            stats['dates_written'] += 1
 
         return items_stored
 
-    def _generate_lesson_id(self, lesson: Dict) -> str:
+    def _lesson_versions(
+        self,
+        current: Dict[str, Tuple[str, Dict]],
+        previous: Dict[str, Dict[str, str]]
+    ) -> Dict[str, Dict[str, str]]:
+        """Manifest map: lesson ID -> {hash, version}; unchanged lessons keep their version."""
+        ts = self._processing_timestamp
+        return {
+            lesson_id: {
+                'hash': lesson_hash,
+                'version': (
+                    previous[lesson_id].get('version', ts)
+                    if lesson_id in previous and previous[lesson_id].get('hash') == lesson_hash
+                    else ts
+                ),
+            }
+            for lesson_id, (lesson_hash, _) in current.items()
+        }
+
+    def _put_snapshot(self, pk: str, date: str, current: Dict[str, Tuple[str, Dict]]) -> str:
         """
-        Generate unique ID for a lesson.
+        Store all lessons of a date as one compressed snapshot item.
+
+        Blobs over SNAPSHOT_MAX_BYTES go to S3 (input bucket) and the item
+        keeps a pointer instead.
 
-        For private lessons: hash of order_id
-        For group lessons: hash of date + start + level + group_type + location
+        Returns:
+            SK of the snapshot item
         """
-        group_type = lesson.get('group_type_key', '')
-        order_id = lesson.get('order_id', '')
+        ts = self._processing_timestamp
+        sk = f'SNAPSHOT#{ts}'
+        blob = encode_snapshot([
+            {'lesson_id': lesson_id, **item} for lesson_id, (_, item) in current.items()
+        ])
+
+        item = {
+            'PK': pk,
+            'SK': sk,
+            'date': date,
+            'lesson_count': len(current),
+            'encoding': SNAPSHOT_ENCODING,
+            'size': len(blob),
+        }
 
-        if group_type == 'privát':
-            # Private lessons: use order_id + start (one order can have multiple time slots)
-            start = lesson.get('start', '')
-            key_data = f"private_{order_id}_{start}"
+        if len(blob) <= self.SNAPSHOT_MAX_BYTES:
+            item['blob'] = blob
         else:
-            # Group lessons: use all grouping fields
-            start = lesson.get('start', '')
-            date = lesson.get('date', '')
-            level = lesson.get('level_key', '')
-            location = lesson.get('location_key', '')
-            key_data = f"{date}_{start}_{level}_{group_type}_{location}"
+            if not self._snapshot_bucket:
+                raise ProcessorError(
+                    self.name, f"Snapshot for {date} too large and no input_bucket configured"
+                )
+            key = f"{self.SNAPSHOT_PREFIX}{date}/{ts}.zlib"
+            if self.s3_client is None:
+                self.s3_client = boto3.client('s3')
+            self.s3_client.put_object(Bucket=self._snapshot_bucket, Key=key, Body=blob)
+            item['s3_bucket'] = self._snapshot_bucket
+            item['s3_key'] = key
+            logger.info(f"Snapshot for {date} ({len(blob)} bytes) stored in s3://{self._snapshot_bucket}/{key}")
+
+        self._put_item(item)
+        return sk
+
+    def _batch_write(self, items: List[Dict]) -> None:
+        """
+        Put items through the run's BulkWriter.
+
+        Args:
+            items: Items to put (any number)
+
+        Raises:
+            BulkWriteError: If items are still unprocessed after MAX_RETRIES
+        """
+        if items:
+            self._writer.write(items)
+
+    def _get_item(self, key: Dict[str, str], consistent: bool = False) -> Optional[Dict]:
+        """GetItem through the low-level client (None if missing)."""
+        response = self._client.get_item(
+            TableName=self._table_name,
+            Key={name: self._serializer.serialize(value) for name, value in key.items()},
+            ConsistentRead=consistent,
+        )
+        item = response.get('Item')
+        if item is None:
+            return None
+        return {name: self._deserializer.deserialize(value) for name, value in item.items()}
+
+    def _put_item(self, item: Dict[str, Any], condition=None) -> None:
+        """
+        PutItem through the low-level client.
+
+        Args:
+            item: Item (Python values)
+            condition: Optional boto3 condition (Attr expression)
+        """
+        kwargs = {}
+        if condition is not None:
+            # A builder numbers its placeholders with a counter: one per call
+            built = ConditionExpressionBuilder().build_expression(condition)
+            kwargs['ConditionExpression'] = built.condition_expression
+            kwargs['ExpressionAttributeNames'] = built.attribute_name_placeholders
+            if built.attribute_value_placeholders:
+                kwargs['ExpressionAttributeValues'] = {
+                    name: self._serializer.serialize(value)
+                    for name, value in built.attribute_value_placeholders.items()
+                }
+        self._client.put_item(
+            TableName=self._table_name,
+            Item={name: self._serializer.serialize(value) for name, value in item.items()},
+            **kwargs,
+        )
+
+    def _load_manifest(self, pk: str) -> Optional[Dict]:
+        """Read the manifest item of a date (None if the date was never stored)."""
+        return self._get_item({'PK': pk, 'SK': self.MANIFEST_SK}, consistent=True)
+
+    def _put_manifest(
+        self,
+        pk: str,
+        date: str,
+        lesson_versions: Dict[str, Dict[str, str]],
+        previous: Optional[Dict],
+        extra: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Write the manifest, unless another run replaced it since it was read.
+
+        Returns:
+            True if written, False on a concurrent update
+        """
+        if previous:
+            condition = Attr('version').eq(previous.get('version'))
+        else:
+            condition = Attr('PK').not_exists()
+
+        try:
+            self._put_item(
+                {
+                    'PK': pk,
+                    'SK': self.MANIFEST_SK,
+                    'date': date,
+                    'version': self._processing_timestamp,
+                    'lesson_count': len(lesson_versions),
+                    'lessons': lesson_versions,
+                    **(extra or {}),
+                },
+                condition,
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+    def _expires_at(self) -> int:
+        """TTL value (epoch seconds) for tombstones written in this run."""
+        written = datetime.strptime(self._processing_timestamp, '%Y-%m-%dT%H:%M:%SZ')
+        written = written.replace(tzinfo=timezone.utc)
+        return int(written.timestamp()) + self.RETENTION_DAYS * 86400
+
+    def _put_latest(
+        self,
+        pk: str,
+        date: str,
+        lesson_count: int,
+        content_hash: str,
+        extra: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Point LATEST at this run's version, unless a newer run already did.
+
+        Returns:
+            True if written, False if LATEST already points at a newer version
+        """
+        ts = self._processing_timestamp
+        try:
+            self._put_item(
+                {
+                    'PK': pk,
+                    'SK': self.LATEST_SK,
+                    'date': date,
+                    'version': ts,
+                    'meta_sk': f'META#{ts}',
+                    'layout': self.layout,
+                    'lesson_count': lesson_count,
+                    'content_hash': content_hash,
+                    **(extra or {}),
+                },
+                Attr('PK').not_exists() | Attr('version').lt(ts),
+            )
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+                logger.info(f"LATEST for {date} already points at a newer version")
+                return False
+            raise
+        return True
 
-        return hashlib.md5(key_data.encode()).hexdigest()[:16]
+    def _content_hash(self, item: Dict) -> str:
+        """Hash of a prepared lesson item (stable across runs)."""
+        encoded = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.md5(encoded.encode()).hexdigest()[:16]
+
+    def _generate_lesson_id(self, lesson: Dict) -> str:
+        """
+        Get the unique ID for a lesson.
+
+        Uses the ID assigned by MergeDataProcessor, or derives it the same way.
+        """
+        return lesson.get('lesson_id') or generate_lesson_id(lesson)
 
     def _prepare_lesson_item(self, lesson: Dict) -> Dict:
         """
@@ -190,6 +732,8 @@ class StorageProcessor(Processor):
             'date': lesson.get('date'),
             'start': lesson.get('start'),
             'end': lesson.get('end'),
+            'start_min': lesson.get('start_min'),
+            'end_min': lesson.get('end_min'),
             'level_key': lesson.get('level_key'),
             'group_type_key': lesson.get('group_type_key'),
             'location_key': lesson.get('location_key'),
@@ -206,3 +750,70 @@ class StorageProcessor(Processor):
             item['instructor_photo'] = instructor.get('photo')
 
         return item
+
+
+def _date_key(date: str) -> Tuple[int, int, int]:
+    """Sortable (year, month, day) for a DD.MM.YYYY date."""
+    day, month, year = date.split('.')
+    return int(year), int(month), int(day)
+
+
+# Snapshot blob format: zlib-compressed JSON {"fields": [...], "rows": [[...], ...]}
+SNAPSHOT_ENCODING = 'zlib+json-columns'
+
+
+def encode_snapshot(items: List[Dict[str, Any]]) -> bytes:
+    """
+    Helper function to encode lesson items as a compressed snapshot blob.
+
+    Items are stored column-wise (field names once, then one row of values
+    per lesson) as compact JSON, then zlib-compressed.
+
+    Args:
+        items: Prepared lesson items (see StorageProcessor._prepare_lesson_item)
+
+    Returns:
+        Compressed blob
+    """
+    fields = sorted({field for item in items for field in item})
+    rows = [[item.get(field) for field in fields] for item in items]
+    encoded = json.dumps(
+        {'fields': fields, 'rows': rows},
+        separators=(',', ':'), ensure_ascii=False, default=str,
+    )
+    return zlib.compress(encoded.encode('utf-8'), 6)
+
+
+def decode_snapshot(blob: bytes) -> List[Dict[str, Any]]:
+    """
+    Helper function to decode a snapshot blob back into lesson items.
+
+    Args:
+        blob: Blob from encode_snapshot (bytes or boto3 Binary)
+
+    Returns:
+        List of lesson items
+    """
+    raw = getattr(blob, 'value', blob)
+    decoded = json.loads(zlib.decompress(bytes(raw)).decode('utf-8'))
+    fields = decoded['fields']
+    return [dict(zip(fields, row)) for row in decoded['rows']]
+
+
+def load_snapshot(item: Dict[str, Any], s3_client=None) -> List[Dict[str, Any]]:
+    """
+    Helper function to read the lessons of a SNAPSHOT item.
+
+    Args:
+        item: Snapshot item from DynamoDB
+        s3_client: Optional boto3 S3 client (for overflow snapshots)
+
+    Returns:
+        List of lesson items
+    """
+    if 'blob' in item:
+        return decode_snapshot(item['blob'])
+
+    s3_client = s3_client or boto3.client('s3')
+    response = s3_client.get_object(Bucket=item['s3_bucket'], Key=item['s3_key'])
+    return decode_snapshot(response['Body'].read())
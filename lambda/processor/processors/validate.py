@@ -2,16 +2,133 @@
 GoldSport Scheduler - Validate Processor
 
 Validates and cleans lesson records.
+
+Rows with missing fields or unparseable timestamps are already rejected by
+ParseOrdersProcessor, so this is a cheap final assertion: every lesson is
+expected to pass, and any reject is logged as a warning.
+
+Validation rules are declared in LESSON_SCHEMA and compiled once into a
+CompiledSchema. Valid lessons take a fast path: time fields are a set
+lookup against all 1440 valid HH:MM strings and required fields a
+truthiness check. Only rejected lessons run the ordered per-rule checks
+that determine the reject reason.
 """
 
 import logging
-import re
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
+from metrics import emit_metrics
 from processors import Processor, ProcessorError
 
 logger = logging.getLogger(__name__)
 
+# Declarative lesson schema, checked in order (first failing rule is the reason)
+# - required: present and not blank
+# - time: HH:MM, 00:00-23:59
+LESSON_SCHEMA: List[Tuple[str, str]] = [
+    ('date', 'required'),
+    ('start', 'required'),
+    ('end', 'required'),
+    ('start', 'time'),
+    ('end', 'time'),
+]
+
+# Max rejected lessons listed in metadata['validation']['rejected_sample']
+REJECTED_SAMPLE_SIZE = 20
+
+
+def _is_present(value: Any) -> bool:
+    """Required-field check: non-empty, and not only whitespace for strings."""
+    if not value:
+        return False
+    return not isinstance(value, str) or not value.isspace()
+
+
+# Every valid HH:MM value (00:00-23:59)
+VALID_TIMES = frozenset(f'{h:02d}:{m:02d}' for h in range(24) for m in range(60))
+
+
+def _is_hhmm(value: Any) -> bool:
+    """Time check: HH:MM with 00 <= HH <= 23 and 00 <= MM <= 59."""
+    return isinstance(value, str) and value in VALID_TIMES
+
+
+RULE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    'required': _is_present,
+    'time': _is_hhmm,
+}
+
+RULE_REASONS: Dict[str, str] = {
+    'required': 'missing_{field}',
+    'time': 'invalid_{field}_time',
+}
+
+
+class CompiledSchema:
+    """
+    Validator compiled from a declarative schema.
+
+    Attributes:
+        time_fields: Fields checked by set lookup on the fast path
+        required_fields: Required fields not already implied by a time rule
+        checks: Ordered (field, check, reason) triples for rejected lessons
+    """
+
+    VALID = (True, "")
+
+    def __init__(self, schema: List[Tuple[str, str]]):
+        self.time_fields = tuple(field for field, rule in schema if rule == 'time')
+        self.required_fields = tuple(
+            field for field, rule in schema
+            if rule == 'required' and field not in self.time_fields
+        )
+        self.checks = tuple(
+            (field, RULE_CHECKS[rule], RULE_REASONS[rule].format(field=field))
+            for field, rule in schema
+        )
+
+    def validate(self, lesson: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Validate a lesson.
+
+        Returns:
+            Tuple of (is_valid, reason) - reason is the first failing rule
+        """
+        get = lesson.get
+
+        # Fast path: all rules pass
+        for field in self.time_fields:
+            value = get(field)
+            # Unhashable values (lists, dicts) would raise in the set lookup
+            if not isinstance(value, str) or value not in VALID_TIMES:
+                break
+        else:
+            for field in self.required_fields:
+                value = get(field)
+                if not value or (value.__class__ is str and value.isspace()):
+                    break
+            else:
+                return self.VALID
+
+        # Slow path: find the reason
+        for field, check, reason in self.checks:
+            if not check(get(field)):
+                return False, reason
+        return self.VALID
+
+
+def compile_schema(schema: List[Tuple[str, str]]) -> CompiledSchema:
+    """
+    Helper function to compile a declarative schema into a validator.
+
+    Args:
+        schema: List of (field, rule) pairs
+
+    Returns:
+        CompiledSchema
+    """
+    return CompiledSchema(schema)
+
 
 class ValidateProcessor(Processor):
     """
@@ -20,16 +137,13 @@ class ValidateProcessor(Processor):
     Removes records with:
     - Missing required fields (date, start, end)
     - Invalid time formats
-    - Empty participant lists
 
-    Logs warnings for filtered records.
+    Reject counts per reason are emitted as a CloudWatch metric; a capped
+    sample of rejected lessons goes to metadata.
     """
 
-    # Required fields that must be present and non-empty
-    REQUIRED_FIELDS = ['date', 'start', 'end']
-
-    # Time format pattern (HH:MM)
-    TIME_PATTERN = re.compile(r'^([01]\d|2[0-3]):[0-5]\d$')
+    # Compiled LESSON_SCHEMA (built once at import)
+    SCHEMA = compile_schema(LESSON_SCHEMA)
 
     def process(self, data: dict) -> dict:
         """
@@ -49,34 +163,38 @@ class ValidateProcessor(Processor):
 
         try:
             valid_lessons = []
-            filtered_count = 0
-            filter_reasons = {}
+            filter_reasons: Dict[str, int] = {}
+            rejected_sample: List[Dict[str, str]] = []
+            validate = self.SCHEMA.validate
 
             for lesson in lessons:
-                is_valid, reason = self._validate_lesson(lesson)
+                is_valid, reason = validate(lesson)
                 if is_valid:
                     valid_lessons.append(lesson)
                 else:
-                    filtered_count += 1
                     filter_reasons[reason] = filter_reasons.get(reason, 0) + 1
-                    logger.debug(f"Filtered lesson: {reason} - {lesson.get('booking_id', 'unknown')}")
+                    sample_rejected(rejected_sample, lesson, reason)
 
             data['lessons'] = valid_lessons
-            data['metadata']['records_filtered'] = data['metadata'].get('records_filtered', 0) + filtered_count
+            record_filtered(data['metadata'], filter_reasons, rejected_sample, stage='Validate')
 
-            if filtered_count > 0:
-                logger.info(f"Filtered {filtered_count} invalid lessons: {filter_reasons}")
+            if filter_reasons:
+                # Should have been rejected at parse time
+                logger.warning(
+                    "Filtered %d invalid lessons after parsing: %s",
+                    sum(filter_reasons.values()), filter_reasons,
+                )
 
-            logger.info(f"Validated {len(valid_lessons)} lessons")
+            logger.info("Validated %d lessons", len(valid_lessons))
 
         except Exception as e:
             raise ProcessorError(self.name, f"Failed to validate: {e}", e)
 
         return data
 
-    def _validate_lesson(self, lesson: Dict[str, Any]) -> tuple[bool, str]:
+    def _validate_lesson(self, lesson: Dict[str, Any]) -> Tuple[bool, str]:
         """
-        Validate a single lesson.
+        Validate a single lesson against the compiled schema.
 
         Args:
             lesson: Lesson record to validate
@@ -84,28 +202,7 @@ class ValidateProcessor(Processor):
         Returns:
             Tuple of (is_valid, reason)
         """
-        # Check required fields
-        for field in self.REQUIRED_FIELDS:
-            value = lesson.get(field, '')
-            if not value or (isinstance(value, str) and not value.strip()):
-                return False, f"missing_{field}"
-
-        # Validate time formats
-        start = lesson.get('start', '')
-        end = lesson.get('end', '')
-
-        if not self._is_valid_time(start):
-            return False, "invalid_start_time"
-
-        if not self._is_valid_time(end):
-            return False, "invalid_end_time"
-
-        # Check for valid people list (warn but don't filter)
-        people = lesson.get('people', [])
-        if not people:
-            logger.debug(f"Lesson has no people listed")
-
-        return True, ""
+        return self.SCHEMA.validate(lesson)
 
     def _is_valid_time(self, time_str: str) -> bool:
         """
@@ -117,6 +214,55 @@ class ValidateProcessor(Processor):
         Returns:
             True if valid, False otherwise
         """
-        if not time_str:
-            return False
-        return bool(self.TIME_PATTERN.match(time_str))
+        return _is_hhmm(time_str)
+
+
+def sample_rejected(sample: List[Dict[str, str]], lesson: Dict[str, Any], reason: str) -> None:
+    """
+    Helper function to keep a capped sample of rejected lessons.
+
+    Args:
+        sample: Sample list to append to (at most REJECTED_SAMPLE_SIZE entries)
+        lesson: Rejected lesson
+        reason: Reject reason
+    """
+    if len(sample) < REJECTED_SAMPLE_SIZE:
+        key = lesson.get('lesson_id') or lesson.get('booking_id') or 'unknown'
+        sample.append({'key': key, 'reason': reason})
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Filtered lesson: %s - %s", reason, key)
+
+
+def record_filtered(
+    metadata: Dict[str, Any],
+    filter_reasons: Dict[str, int],
+    rejected_sample: Optional[List[Dict[str, str]]] = None,
+    stage: str = 'Validate'
+) -> None:
+    """
+    Helper function to add filter counts to pipeline metadata.
+
+    Updates records_filtered (total), filter_reasons (per reason) and
+    validation.rejected_sample, and emits the per-reason counts as metrics.
+
+    Args:
+        metadata: Pipeline metadata
+        filter_reasons: Dict mapping reason -> number of lessons filtered
+        rejected_sample: Optional capped sample of rejected lesson keys
+        stage: Metric dimension value for the reporting stage
+    """
+    metadata['records_filtered'] = metadata.get('records_filtered', 0) + sum(filter_reasons.values())
+    reasons = metadata.setdefault('filter_reasons', {})
+    for reason, count in filter_reasons.items():
+        reasons[reason] = reasons.get(reason, 0) + count
+
+    if rejected_sample is not None:
+        validation = metadata.setdefault('validation', {'rejected_sample': []})
+        room = REJECTED_SAMPLE_SIZE - len(validation['rejected_sample'])
+        validation['rejected_sample'].extend(rejected_sample[:max(room, 0)])
+
+    if filter_reasons:
+        emit_metrics(
+            {f'Rejected.{reason}': count for reason, count in filter_reasons.items()},
+            dimensions={'Stage': stage},
+        )
@@ -0,0 +1,112 @@
+"""
+GoldSport Scheduler - Validate + Privacy Processor
+
+Single-pass replacement for ValidateProcessor followed by PrivacyProcessor.
+"""
+
+import logging
+from typing import Dict, Any, List
+
+from processors import Processor, ProcessorError
+from processors.validate import ValidateProcessor, record_filtered, sample_rejected
+from processors.privacy import PrivacyProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ValidatePrivacyProcessor(Processor):
+    """
+    Validate lessons and apply privacy rules in one pass.
+
+    Uses the same rules as ValidateProcessor and PrivacyProcessor and
+    produces the same lessons and filter counters, but:
+    - filters the lessons list in place instead of building a new one
+    - rewrites person dicts in place instead of allocating new ones
+    """
+
+    def __init__(self):
+        """Initialize the processor."""
+        self._validator = ValidateProcessor()
+        self._privacy = PrivacyProcessor()
+
+    def process(self, data: dict) -> dict:
+        """
+        Validate lessons, drop invalid ones and filter names.
+
+        Args:
+            data: Pipeline data with lessons
+
+        Returns:
+            Data with validated, privacy-filtered lessons
+        """
+        lessons = data.get('lessons', [])
+
+        if not lessons:
+            logger.info("No lessons to validate")
+            return data
+
+        try:
+            filter_reasons: Dict[str, int] = {}
+            rejected_sample: List[Dict[str, str]] = []
+            validate = self._validator._validate_lesson
+            filter_sponsor = self._privacy._filter_sponsor_name
+            kept = 0
+
+            for lesson in lessons:
+                is_valid, reason = validate(lesson)
+                if not is_valid:
+                    filter_reasons[reason] = filter_reasons.get(reason, 0) + 1
+                    sample_rejected(rejected_sample, lesson, reason)
+                    continue
+
+                lesson['sponsor'] = filter_sponsor(lesson.get('sponsor', ''))
+                self._filter_people(lesson, filter_sponsor)
+
+                lessons[kept] = lesson
+                kept += 1
+
+            del lessons[kept:]
+            data['lessons'] = lessons
+            record_filtered(data['metadata'], filter_reasons, rejected_sample, stage='ValidatePrivacy')
+
+            if filter_reasons:
+                logger.info(f"Filtered {sum(filter_reasons.values())} invalid lessons: {filter_reasons}")
+
+            logger.info(f"Validated and applied privacy rules to {kept} lessons")
+
+        except Exception as e:
+            raise ProcessorError(self.name, f"Failed to validate and apply privacy rules: {e}", e)
+
+        return data
+
+    def _filter_people(self, lesson: Dict[str, Any], filter_sponsor) -> None:
+        """
+        Apply privacy rules to lesson people in place.
+
+        Person dicts are normalised to {name, language, sponsor}, exactly as
+        PrivacyProcessor does. The list is only rebuilt when it contains
+        legacy string entries or empty entries.
+        """
+        people: List = lesson.get('people', [])
+        needs_rebuild = False
+
+        for p in people:
+            if isinstance(p, dict):
+                p['name'] = str(p.get('name', '')).strip()
+                p['language'] = str(p.get('language', '')).strip()
+                p['sponsor'] = filter_sponsor(p.get('sponsor', ''))
+                if len(p) > 3:
+                    for key in [k for k in p if k not in ('name', 'language', 'sponsor')]:
+                        del p[key]
+            else:
+                needs_rebuild = True
+
+        if needs_rebuild:
+            people = [
+                p if isinstance(p, dict)
+                else {'name': str(p).strip(), 'language': '', 'sponsor': ''}
+                for p in people
+                if isinstance(p, dict) or p
+            ]
+
+        lesson['people'] = people
@@ -0,0 +1,50 @@
+"""
+GoldSport Scheduler - Re-render Lambda
+
+Keeps the current/upcoming split of today correct between pipeline runs.
+Reads today's shard through data/current.json and the manifest, recomputes
+which lessons are current and upcoming for the current minute and, only if
+the split changed, rewrites data/today.json (OutputProcessor.rerender).
+
+No version is written and the pointer is not swapped, so displays polling
+data/current.json keep getting 304s. The exception is the first run of a
+new day: display payloads still holding yesterday's lessons are rebuilt
+from today's shard and the pointer is swapped once. Orders, configs and DynamoDB are not
+touched; a run costs three small S3 reads and a HEAD (plus the upload when
+a lesson starts or ends).
+
+Triggered by EventBridge schedule (every minute during operating hours).
+"""
+
+import os
+import json
+import logging
+
+from processors.output import OutputProcessor
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Environment variables (set by CDK)
+WEBSITE_BUCKET = os.environ.get('WEBSITE_BUCKET')
+
+
+def main(event, context):
+    """
+    Lambda handler - re-renders the current/upcoming views of the schedule.
+    """
+    if not WEBSITE_BUCKET:
+        logger.error("No WEBSITE_BUCKET configured")
+        return {'statusCode': 500, 'body': json.dumps({'message': 'No WEBSITE_BUCKET configured'})}
+
+    result = OutputProcessor().rerender(WEBSITE_BUCKET)
+    logger.info(
+        f"Re-rendered schedule: {result['current_lessons']} current, "
+        f"{result['upcoming_lessons']} upcoming, uploaded={result['uploaded']}, "
+        f"displays_rebuilt={result['displays_rebuilt']}"
+    )
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({'message': 'Re-render complete', **result})
+    }
@@ -0,0 +1,221 @@
+"""
+GoldSport Scheduler - Schedule Reader
+
+Reads stored schedules back from DynamoDB (for dashboards and rebuild
+tools). Written by StorageProcessor; both storage layouts are supported.
+
+Read path for a date:
+1. GetItem MANIFEST for the latest version, or META#{version} for a given
+   one - layout and {lesson_id: version} map. META items of superseded
+   versions may be removed by compaction; the MANIFEST is never removed, so
+   the current version is still readable when its META is gone.
+2. Lessons:
+   - items layout: BatchGetItem of the referenced LESSON items (projected),
+     or a paginated query over LESSON#{version}# for versions written
+     before manifests existed
+   - snapshot layout: GetItem SNAPSHOT#{version} (plus S3 for overflow)
+"""
+
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, Any, List, Optional
+
+import boto3
+from boto3.dynamodb.conditions import Key
+
+from processors.storage import StorageProcessor, load_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Lesson attributes returned by get_schedule (see StorageProcessor._prepare_lesson_item)
+LESSON_FIELDS = [
+    'SK', 'deleted',
+    'booking_id', 'date', 'start', 'end', 'start_min', 'end_min',
+    'level_key', 'group_type_key', 'location_key',
+    'people_count', 'people', 'notes',
+    'instructor_id', 'instructor_name', 'instructor_photo',
+]
+
+# DynamoDB BatchGetItem limit
+BATCH_GET_SIZE = 100
+
+
+class ScheduleReader:
+    """
+    Read stored schedules from the DynamoDB data table.
+
+    Reading the latest schedule of a date costs one GetItem plus one
+    BatchGetItem per 100 lessons (items layout) or one more GetItem
+    (snapshot layout), independent of how many versions are stored.
+    """
+
+    # Retries of UnprocessedKeys, with exponential backoff starting at
+    # RETRY_BASE_DELAY (throttled reads would otherwise be retried at once)
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 0.05  # seconds
+
+    def __init__(self, table_name: str, dynamodb_resource=None, s3_client=None):
+        """
+        Initialize the reader.
+
+        Args:
+            table_name: DynamoDB data table name
+            dynamodb_resource: Optional boto3 DynamoDB resource (for testing)
+            s3_client: Optional boto3 S3 client (for overflow snapshots)
+        """
+        self.dynamodb = dynamodb_resource or boto3.resource('dynamodb')
+        self.table_name = table_name
+        self.table = self.dynamodb.Table(table_name)
+        self.s3_client = s3_client
+
+    def get_latest_version(self, date: str) -> Optional[str]:
+        """
+        Get the latest stored version of a date.
+
+        Args:
+            date: Date in DD.MM.YYYY format
+
+        Returns:
+            Version timestamp, or None if the date was never stored
+        """
+        pk = f"SCHEDULE#{date}"
+        latest = self._get(pk, StorageProcessor.LATEST_SK)
+        if latest:
+            return latest['version']
+
+        # Dates stored before LATEST pointers existed
+        manifest = self._get(pk, StorageProcessor.MANIFEST_SK)
+        return manifest.get('version') if manifest else None
+
+    def get_schedule(self, date: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the lessons of a date.
+
+        Args:
+            date: Date in DD.MM.YYYY format
+            version: Optional version timestamp (default: latest)
+
+        Returns:
+            Dict with date, version, layout and lessons (sorted by start),
+            or None if the date or version is not stored
+        """
+        pk = f"SCHEDULE#{date}"
+        source = self._version_source(pk, version)
+        if not source:
+            logger.warning(f"No MANIFEST or META item for {date} version {version or 'latest'}")
+            return None
+        version = source['version']
+
+        if source.get('snapshot_sk'):
+            layout = 'snapshot'
+            snapshot = self._get(pk, source['snapshot_sk'])
+            lessons = load_snapshot(snapshot, self.s3_client) if snapshot else []
+        elif 'lessons' in source:
+            layout = 'items'
+            lessons = self._get_lessons(pk, source['lessons'])
+        else:
+            layout = 'items'
+            lessons = self._query_version(pk, version)
+
+        lessons = [_plain(lesson) for lesson in lessons if not lesson.get('deleted')]
+        for lesson in lessons:
+            sk = lesson.pop('SK', None)
+            if sk and 'lesson_id' not in lesson:
+                lesson['lesson_id'] = sk.rsplit('#', 1)[1]
+            lesson.pop('deleted', None)
+        lessons.sort(key=lambda l: (l.get('start_min') or 0, l.get('start') or ''))
+
+        return {
+            'date': date,
+            'version': version,
+            'layout': layout,
+            'lessons': lessons,
+        }
+
+    def _version_source(self, pk: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Item holding the lesson map of a version (MANIFEST or META).
+
+        Args:
+            pk: Partition key of the date
+            version: Version timestamp (None: latest)
+
+        Returns:
+            Item with 'version' set, or None if the version is not stored
+        """
+        manifest = self._get(pk, StorageProcessor.MANIFEST_SK)
+        if manifest and (version is None or manifest.get('version') == version):
+            return manifest
+
+        # Older versions, and dates stored before manifests existed
+        version = version or self.get_latest_version(pk.split('#', 1)[1])
+        if not version:
+            return None
+        meta = self._get(pk, f'META#{version}')
+        return {**meta, 'version': version} if meta else None
+
+    def _get(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
+        """GetItem by key (None if missing)."""
+        return self.table.get_item(Key={'PK': pk, 'SK': sk}).get('Item')
+
+    def _get_lessons(self, pk: str, lesson_versions: Dict[str, Dict[str, str]]) -> List[Dict]:
+        """BatchGetItem the LESSON items referenced by a version map."""
+        keys = [
+            {'PK': pk, 'SK': f"LESSON#{entry['version']}#{lesson_id}"}
+            for lesson_id, entry in sorted(lesson_versions.items())
+        ]
+        projection = self._projection()
+
+        lessons = []
+        for i in range(0, len(keys), BATCH_GET_SIZE):
+            request = {self.table_name: {'Keys': keys[i:i + BATCH_GET_SIZE], **projection}}
+
+            for attempt in range(self.MAX_RETRIES + 1):
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+                lessons.extend(response.get('Responses', {}).get(self.table_name, []))
+                request = response.get('UnprocessedKeys') or {}
+                if not request:
+                    break
+                time.sleep(self.RETRY_BASE_DELAY * 2 ** attempt)
+            else:
+                raise RuntimeError(f"Lessons of {pk} still unprocessed after {self.MAX_RETRIES} retries")
+
+        if len(lessons) != len(keys):
+            logger.warning(f"{pk}: {len(keys) - len(lessons)} referenced lessons missing")
+
+        return lessons
+
+    def _query_version(self, pk: str, version: str) -> List[Dict]:
+        """Query all LESSON items written by one version (paginated)."""
+        kwargs = {
+            'KeyConditionExpression': Key('PK').eq(pk) & Key('SK').begins_with(f'LESSON#{version}#'),
+            **self._projection(),
+        }
+        lessons = []
+        while True:
+            response = self.table.query(**kwargs)
+            lessons.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return lessons
+
+    def _projection(self) -> Dict[str, Any]:
+        """ProjectionExpression for LESSON_FIELDS (many are reserved words)."""
+        names = {f'#f{i}': field for i, field in enumerate(LESSON_FIELDS)}
+        return {
+            'ProjectionExpression': ', '.join(names),
+            'ExpressionAttributeNames': names,
+        }
+
+
+def _plain(value: Any) -> Any:
+    """Convert DynamoDB Decimals back to int/float (recursively)."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
@@ -0,0 +1,422 @@
+"""
+In-memory stand-in for a boto3 DynamoDB Table (PK/SK schema).
+
+Supports the calls used by the processor: get_item, put_item (with
+ConditionExpression), delete_item, query, scan, and batch_writer, plus
+the resource's batch_get_item and the low-level client's get_item,
+put_item (string ConditionExpression) and batch_write_item. Queries and
+scans return pages of page_size items to exercise pagination.
+"""
+
+import copy
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+
+class FakeTable:
+    """In-memory DynamoDB table keyed by (PK, SK)."""
+
+    def __init__(self, name: str = 'test-table', page_size: int = 100):
+        self.name = name
+        self.page_size = page_size
+        self.items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.write_count = 0
+        self._lock = threading.RLock()
+
+    # Single-item operations
+
+    def get_item(self, Key: Dict[str, str], **kwargs) -> Dict:
+        item = self.items.get((Key['PK'], Key['SK']))
+        return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def put_item(self, Item: Dict[str, Any], ConditionExpression=None, **kwargs) -> Dict:
+        key = (Item['PK'], Item['SK'])
+        with self._lock:
+            if ConditionExpression is not None:
+                if not _evaluate(ConditionExpression, self.items.get(key) or {}):
+                    raise ClientError(
+                        {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}},
+                        'PutItem',
+                    )
+            self.items[key] = copy.deepcopy(Item)
+            self.write_count += 1
+        return {}
+
+    def delete_item(self, Key: Dict[str, str], **kwargs) -> Dict:
+        with self._lock:
+            self.items.pop((Key['PK'], Key['SK']), None)
+            self.write_count += 1
+        return {}
+
+    # Multi-item operations
+
+    def query(self, KeyConditionExpression, **kwargs) -> Dict:
+        with self._lock:
+            matches = [
+                item for key, item in sorted(self.items.items())
+                if _evaluate(KeyConditionExpression, item)
+            ]
+        if not kwargs.get('ScanIndexForward', True):
+            matches.reverse()
+        return self._page(matches, kwargs)
+
+    def scan(self, **kwargs) -> Dict:
+        with self._lock:
+            items = [item for _, item in sorted(self.items.items())]
+        return self._page(items, kwargs)
+
+    def batch_writer(self, **kwargs) -> '_FakeBatchWriter':
+        return _FakeBatchWriter(self)
+
+    # Helpers for tests
+
+    def keys(self, pk: Optional[str] = None) -> List[str]:
+        """Sorted SKs of all items (optionally of one partition)."""
+        return sorted(sk for p, sk in self.items if pk is None or p == pk)
+
+    def _page(self, items: List[Dict], kwargs: Dict) -> Dict:
+        start_key = kwargs.get('ExclusiveStartKey')
+        if start_key:
+            keys = [(i['PK'], i['SK']) for i in items]
+            items = items[keys.index((start_key['PK'], start_key['SK'])) + 1:]
+
+        filter_expression = kwargs.get('FilterExpression')
+        limit = min(kwargs.get('Limit', self.page_size), self.page_size)
+        page, rest = items[:limit], items[limit:]
+        if filter_expression is not None:
+            page = [item for item in page if _evaluate(filter_expression, item)]
+
+        response = {
+            'Items': [_project(item, kwargs) for item in page],
+            'Count': len(page),
+        }
+        if rest:
+            last = items[limit - 1]
+            response['LastEvaluatedKey'] = {'PK': last['PK'], 'SK': last['SK']}
+        return response
+
+
+class FakeClient:
+    """
+    Stand-in for the low-level DynamoDB client (get_item, put_item and
+    batch_write_item on serialized attribute values).
+
+    Injects throttling:
+    - unprocessed: number of leading put requests to return as unprocessed
+      on each call, for as many calls as listed (e.g. [2, 1])
+    - throttled_calls: number of calls (after the unprocessed ones) that
+      raise ProvisionedThroughputExceededException
+    - latency: seconds each call takes (lets calls overlap across threads)
+    """
+
+    def __init__(
+        self,
+        table: FakeTable,
+        unprocessed: Optional[List[int]] = None,
+        throttled_calls: int = 0,
+        latency: float = 0.0
+    ):
+        self.table = table
+        self.unprocessed = list(unprocessed or [])
+        self.throttled_calls = throttled_calls
+        self.latency = latency
+        self.batch_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._deserializer = TypeDeserializer()
+        self._serializer = TypeSerializer()
+
+    def get_item(self, TableName: str, Key: Dict[str, Dict], **kwargs) -> Dict:
+        response = self.table.get_item(Key=self._deserialize(Key))
+        if 'Item' not in response:
+            return {}
+        return {'Item': {k: self._serializer.serialize(v) for k, v in response['Item'].items()}}
+
+    def put_item(self, TableName: str, Item: Dict[str, Dict], **kwargs) -> Dict:
+        item = self._deserialize(Item)
+        condition = kwargs.get('ConditionExpression')
+        if condition is None:
+            return self.table.put_item(Item=item)
+
+        names = kwargs.get('ExpressionAttributeNames', {})
+        values = self._deserialize(kwargs.get('ExpressionAttributeValues', {}))
+        key = (item['PK'], item['SK'])
+        with self.table._lock:
+            current = self.table.items.get(key) or {}
+            if not _ConditionParser(condition, names, values).evaluate(current):
+                raise ClientError(
+                    {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}},
+                    'PutItem',
+                )
+            return self.table.put_item(Item=item)
+
+    def _deserialize(self, attrs: Dict[str, Dict]) -> Dict[str, Any]:
+        return {k: self._deserializer.deserialize(v) for k, v in attrs.items()}
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict]]) -> Dict:
+        with self._lock:
+            self.batch_calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            skip = self.unprocessed.pop(0) if self.unprocessed else 0
+            throttle = not skip and self.throttled_calls > 0
+            if throttle:
+                self.throttled_calls -= 1
+
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if throttle:
+                raise ClientError(
+                    {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': ''}},
+                    'BatchWriteItem',
+                )
+            return self._apply(RequestItems, skip)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _apply(self, RequestItems: Dict[str, List[Dict]], skip: int) -> Dict:
+        """Write all but the first skip requests of each table."""
+        unprocessed = {}
+        for table_name, requests in RequestItems.items():
+            if len(requests) > 25:
+                raise ClientError(
+                    {'Error': {'Code': 'ValidationException', 'Message': 'Too many items'}},
+                    'BatchWriteItem',
+                )
+            keys = [_request_key(r) for r in requests]
+            if len(set(keys)) != len(keys):
+                raise ClientError(
+                    {'Error': {'Code': 'ValidationException',
+                               'Message': 'Provided list of item keys contains duplicates'}},
+                    'BatchWriteItem',
+                )
+            if skip:
+                unprocessed[table_name] = requests[:skip]
+            for request in requests[skip:]:
+                if 'PutRequest' in request:
+                    item = {
+                        k: self._deserializer.deserialize(v)
+                        for k, v in request['PutRequest']['Item'].items()
+                    }
+                    self.table.put_item(Item=item)
+                else:
+                    key = {
+                        k: self._deserializer.deserialize(v)
+                        for k, v in request['DeleteRequest']['Key'].items()
+                    }
+                    self.table.delete_item(Key=key)
+
+        return {'UnprocessedItems': unprocessed}
+
+
+class FakeResource:
+    """Stand-in for boto3.resource('dynamodb') returning one FakeTable."""
+
+    def __init__(self, table: Optional[FakeTable] = None, **client_kwargs):
+        self.table = table or FakeTable()
+        self.meta = SimpleNamespace(client=FakeClient(self.table, **client_kwargs))
+
+    def Table(self, name: str) -> FakeTable:
+        return self.table
+
+    def batch_get_item(self, RequestItems: Dict[str, Dict]) -> Dict:
+        responses = {}
+        for table_name, request in RequestItems.items():
+            if len(request['Keys']) > 100:
+                raise ClientError(
+                    {'Error': {'Code': 'ValidationException', 'Message': 'Too many keys'}},
+                    'BatchGetItem',
+                )
+            found = []
+            for key in request['Keys']:
+                item = self.table.items.get((key['PK'], key['SK']))
+                if item is not None:
+                    found.append(_project(item, request))
+            responses[table_name] = found
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+
+class _FakeBatchWriter:
+    """Context manager mirroring boto3's BatchWriter."""
+
+    def __init__(self, table: FakeTable):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item: Dict[str, Any]) -> None:
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key: Dict[str, str]) -> None:
+        self.table.delete_item(Key=Key)
+
+
+def _request_key(request: Dict) -> Tuple[str, str]:
+    """(PK, SK) of a serialized batch write request."""
+    attrs = request['PutRequest']['Item'] if 'PutRequest' in request else request['DeleteRequest']['Key']
+    return attrs['PK']['S'], attrs['SK']['S']
+
+
+def _evaluate(condition, item: Dict[str, Any]) -> bool:
+    """Evaluate a boto3 condition (Key/Attr expression) against an item."""
+    expression = condition.get_expression()
+    operator = expression['operator']
+    values = expression['values']
+
+    if operator == 'AND':
+        return all(_evaluate(v, item) for v in values)
+    if operator == 'OR':
+        return any(_evaluate(v, item) for v in values)
+
+    name = values[0].name
+    if operator == 'attribute_not_exists':
+        return name not in item
+    if operator == 'attribute_exists':
+        return name in item
+    if name not in item:
+        return False
+
+    value = item[name]
+    if operator == '=':
+        return value == values[1]
+    if operator == 'begins_with':
+        return isinstance(value, str) and value.startswith(values[1])
+    if operator == '<':
+        return value < values[1]
+    if operator == '<=':
+        return value <= values[1]
+    if operator == '>':
+        return value > values[1]
+    if operator == '>=':
+        return value >= values[1]
+    if operator == 'BETWEEN':
+        return values[1] <= value <= values[2]
+    raise NotImplementedError(f"Unsupported condition operator: {operator}")
+
+
+class _ConditionParser:
+    """
+    Evaluates a ConditionExpression string with #name/:value placeholders.
+
+    Grammar: OR/AND/NOT, parentheses, attribute_exists, attribute_not_exists,
+    begins_with and the comparison operators.
+    """
+
+    _TOKEN = re.compile(r'\s*(<>|<=|>=|[=<>(),]|[#:]?\w+)')
+
+    def __init__(self, expression: str, names: Dict[str, str], values: Dict[str, Any]):
+        self.tokens = self._TOKEN.findall(expression)
+        self.names = names
+        self.values = values
+        self.pos = 0
+        self.item: Dict[str, Any] = {}
+
+    def evaluate(self, item: Dict[str, Any]) -> bool:
+        self.item = item
+        self.pos = 0
+        result = self._or()
+        if self.pos != len(self.tokens):
+            raise NotImplementedError(f"Unparsed condition tokens: {self.tokens[self.pos:]}")
+        return result
+
+    def _next(self) -> str:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _or(self) -> bool:
+        result = self._and()
+        while self._peek() == 'OR':
+            self._next()
+            right = self._and()
+            result = result or right
+        return result
+
+    def _and(self) -> bool:
+        result = self._not()
+        while self._peek() == 'AND':
+            self._next()
+            right = self._not()
+            result = result and right
+        return result
+
+    def _not(self) -> bool:
+        if self._peek() == 'NOT':
+            self._next()
+            return not self._not()
+        return self._primary()
+
+    def _primary(self) -> bool:
+        token = self._next()
+        if token == '(':
+            result = self._or()
+            self._next()  # ')'
+            return result
+        if token in ('attribute_exists', 'attribute_not_exists', 'begins_with'):
+            self._next()  # '('
+            name = self._name(self._next())
+            prefix = None
+            if token == 'begins_with':
+                self._next()  # ','
+                prefix = self._operand(self._next())
+            self._next()  # ')'
+            if token == 'attribute_exists':
+                return name in self.item
+            if token == 'attribute_not_exists':
+                return name not in self.item
+            value = self.item.get(name)
+            return isinstance(value, str) and value.startswith(prefix)
+
+        left = self._operand(token)
+        operator = self._next()
+        right = self._operand(self._next())
+        if left is None or right is None:
+            return False
+        if operator == '=':
+            return left == right
+        if operator == '<>':
+            return left != right
+        if operator == '<':
+            return left < right
+        if operator == '<=':
+            return left <= right
+        if operator == '>':
+            return left > right
+        if operator == '>=':
+            return left >= right
+        raise NotImplementedError(f"Unsupported condition operator: {operator}")
+
+    def _name(self, token: str) -> str:
+        return self.names.get(token, token)
+
+    def _operand(self, token: str) -> Any:
+        if token.startswith(':'):
+            return self.values[token]
+        return self.item.get(self._name(token))
+
+
+def _project(item: Dict[str, Any], kwargs: Dict) -> Dict[str, Any]:
+    """Apply ProjectionExpression (attribute names only) to an item copy."""
+    projection = kwargs.get('ProjectionExpression')
+    if not projection:
+        return copy.deepcopy(item)
+
+    names = kwargs.get('ExpressionAttributeNames', {})
+    fields = [names.get(f.strip(), f.strip()) for f in projection.split(',')]
+    return {f: copy.deepcopy(item[f]) for f in fields if f in item}
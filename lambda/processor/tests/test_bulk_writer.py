@@ -0,0 +1,149 @@
+"""
+Tests for BulkWriter.
+"""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_writer import BulkWriteError, BulkWriter
+from tests.fake_dynamodb import FakeClient, FakeTable
+
+
+def make_items(count, pk='SCHEDULE#28.12.2025'):
+    """Items with distinct keys."""
+    return [{'PK': pk, 'SK': f'LESSON#2026-01-29T10:00:00Z#{n:04d}', 'n': n} for n in range(count)]
+
+
+class TestBulkWriter(unittest.TestCase):
+    """Tests for BulkWriter against a throttling stand-in."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.table = FakeTable()
+        # No real sleeping during backoff
+        self.sleep = patch('bulk_writer.time.sleep').start()
+        self.addCleanup(patch.stopall)
+
+    def _writer(self, client, **kwargs):
+        return BulkWriter(client, 'test-table', base_delay=0.01, **kwargs)
+
+    def test_writes_in_batches(self):
+        """Test that items are split into batches of 25."""
+        client = FakeClient(self.table)
+        writer = self._writer(client)
+
+        written = writer.write(make_items(60))
+
+        self.assertEqual(written, 60)
+        self.assertEqual(len(self.table.items), 60)
+        stats = writer.stats()
+        self.assertEqual(stats['batch_calls'], 3)
+        self.assertEqual(stats['items'], 60)
+        self.assertEqual((stats['retries'], stats['throttles']), (0, 0))
+
+    def test_retries_unprocessed_with_jittered_backoff(self):
+        """Test that unprocessed items are retried after growing, jittered delays."""
+        client = FakeClient(self.table, unprocessed=[10, 5, 1])
+        writer = self._writer(client)
+
+        with patch('bulk_writer.random.uniform', side_effect=lambda lo, hi: hi) as uniform:
+            writer.write(make_items(20))
+
+        self.assertEqual(len(self.table.items), 20)
+        self.assertEqual([c.args for c in uniform.call_args_list], [(0, 0.01), (0, 0.02), (0, 0.04)])
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.01, 0.02, 0.04])
+        stats = writer.stats()
+        self.assertEqual(stats['retries'], 3)
+        self.assertEqual(stats['throttles'], 3)
+
+    def test_backoff_is_capped(self):
+        """Test that the backoff ceiling never exceeds max_delay."""
+        client = FakeClient(self.table, unprocessed=[1] * 6)
+        writer = self._writer(client, max_delay=0.05)
+
+        with patch('bulk_writer.random.uniform', side_effect=lambda lo, hi: hi):
+            writer.write(make_items(5))
+
+        self.assertEqual(max(c.args[0] for c in self.sleep.call_args_list), 0.05)
+
+    def test_throttling_errors_retried(self):
+        """Test that throttling exceptions are retried, not raised."""
+        client = FakeClient(self.table, throttled_calls=2)
+        writer = self._writer(client)
+
+        writer.write(make_items(10))
+
+        self.assertEqual(len(self.table.items), 10)
+        self.assertEqual(writer.stats()['throttles'], 2)
+
+    def test_other_errors_raised(self):
+        """Test that non-throttling errors are not retried."""
+        writer = self._writer(FakeClient(self.table))
+
+        with self.assertRaises(Exception) as ctx:
+            writer.write([{'PK': 'SCHEDULE#1', 'SK': 'x', 'value': 1.5}])  # floats not allowed
+
+        self.assertNotIsInstance(ctx.exception, BulkWriteError)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that a batch that never gets through raises BulkWriteError."""
+        client = FakeClient(self.table, throttled_calls=100)
+        writer = self._writer(client, max_retries=3)
+
+        with self.assertRaises(BulkWriteError):
+            writer.write(make_items(5))
+
+        self.assertEqual(client.batch_calls, 4)
+
+    def test_deduplicates_keys(self):
+        """Test that duplicate keys in one write are collapsed (last wins)."""
+        items = make_items(30)
+        items.append({**items[3], 'n': 'latest'})
+        writer = self._writer(FakeClient(self.table))
+
+        written = writer.write(items)
+
+        self.assertEqual(written, 30)
+        self.assertEqual(writer.stats()['duplicates'], 1)
+        self.assertEqual(self.table.items[(items[3]['PK'], items[3]['SK'])]['n'], 'latest')
+
+    def test_concurrency_adapts_to_throttling(self):
+        """Test that throttling halves concurrency and success restores it."""
+        client = FakeClient(self.table, throttled_calls=3)
+        writer = self._writer(client, max_concurrency=8)
+
+        writer.write(make_items(25))
+        self.assertEqual(writer.concurrency, 1)
+        self.assertEqual(writer.stats()['min_concurrency'], 1)
+
+        writer.write(make_items(25 * 8, pk='SCHEDULE#29.12.2025'))
+        self.assertEqual(writer.concurrency, 3)
+
+    def test_concurrency_limits_in_flight_batches(self):
+        """Test that threads never have more batches in flight than allowed."""
+        patch.stopall()  # real latency, so calls overlap
+        client = FakeClient(self.table, latency=0.01)
+        writer = self._writer(client, max_concurrency=3)
+        writer.concurrency = 2
+
+        threads = [
+            threading.Thread(target=writer.write, args=(make_items(50, pk=f'SCHEDULE#{n}'),))
+            for n in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(self.table.items), 300)
+        self.assertLessEqual(client.max_in_flight, 3)
+        self.assertGreater(client.max_in_flight, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
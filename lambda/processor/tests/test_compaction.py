@@ -0,0 +1,233 @@
+"""
+Tests for schedule history compaction.
+"""
+
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compaction import compact_date, keep_versions, list_dates
+from processors.storage import StorageProcessor
+from tests.fake_dynamodb import FakeResource, FakeTable
+
+
+RUNS = ['2026-01-29T08:10:00Z', '2026-01-29T08:40:00Z', '2026-01-29T09:20:00Z', '2026-01-29T10:05:00Z']
+
+# 12:00 in Prague on 29.01.2026
+NOW = datetime(2026, 1, 29, 11, 0, tzinfo=timezone.utc)
+
+
+class TestCompaction(unittest.TestCase):
+    """Tests for compact_date against the in-memory table."""
+
+    def setUp(self):
+        """Store four runs; each run edits one lesson per date."""
+        self.table = FakeTable(page_size=3)
+        self.resource = FakeResource(self.table)
+
+        for run, ts in enumerate(RUNS):
+            lessons = []
+            for date in ('28.01.2026', '29.01.2026'):
+                lessons.append(self._make_lesson(date, '09:00', notes=None))
+                lessons.append(self._make_lesson(date, '11:00', notes=f'run {run}'))
+            StorageProcessor(dynamodb_resource=self.resource, timestamp_override=ts).process({
+                'config': {'data_table': 'test-table'},
+                'lessons': lessons,
+                'metadata': {'data_sources': {}},
+            })
+
+    def _make_lesson(self, date, start, **overrides):
+        """Create a private lesson."""
+        lesson = {
+            'order_id': f'order-{start}',
+            'booking_id': f'booking-{start}',
+            'date': date,
+            'start': start,
+            'end': '10:50',
+            'level_key': 'dětská školka',
+            'group_type_key': 'privát',
+            'location_key': 'Stone bar',
+            'people': [{'name': 'Vera', 'language': 'de', 'sponsor': 'Ir.Sc.'}],
+            'people_count': 1,
+            'instructor': {'id': None, 'name': 'GoldSport Team', 'photo': 'assets/logo.png'},
+        }
+        lesson.update(overrides)
+        return lesson
+
+    def _current_lessons(self, date):
+        """Resolve the current schedule of a date through its manifest."""
+        pk = f'SCHEDULE#{date}'
+        manifest = self.table.get_item(Key={'PK': pk, 'SK': 'MANIFEST'})['Item']
+        return {
+            lesson_id: self.table.get_item(
+                Key={'PK': pk, 'SK': f"LESSON#{entry['version']}#{lesson_id}"}
+            ).get('Item')
+            for lesson_id, entry in manifest['lessons'].items()
+        }
+
+    def test_history_written(self):
+        """Test that every run adds a META item, without TTL."""
+        metas = [sk for sk in self.table.keys('SCHEDULE#28.01.2026') if sk.startswith('META#')]
+        self.assertEqual(len(metas), 4)
+        meta = self.table.get_item(Key={'PK': 'SCHEDULE#28.01.2026', 'SK': metas[0]})['Item']
+        self.assertNotIn('expires_at', meta)
+
+    def test_kept_versions_never_expire(self):
+        """Test that nothing compaction keeps carries a TTL (tombstones only)."""
+        StorageProcessor(dynamodb_resource=self.resource, timestamp_override='2026-01-29T10:30:00Z').process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [self._make_lesson('28.01.2026', '09:00', notes=None)],
+            'metadata': {'data_sources': {}},
+        })
+
+        compact_date(self.table, '28.01.2026', now=NOW)
+
+        expiring = [
+            sk for (pk, sk), item in self.table.items.items()
+            if pk == 'SCHEDULE#28.01.2026' and 'expires_at' in item
+        ]
+        self.assertEqual(expiring, [f"LESSON#2026-01-29T10:30:00Z#{self._lesson_id('28.01.2026', '11:00')}"])
+        latest = self.table.get_item(Key={'PK': 'SCHEDULE#28.01.2026', 'SK': 'LATEST'})['Item']
+        self.assertIn(f"META#{latest['version']}", self.table.keys('SCHEDULE#28.01.2026'))
+
+    def test_list_dates_by_key(self):
+        """Test that stored dates are found by key, without a table scan."""
+        self.table.scan = MagicMock(side_effect=AssertionError('scan'))
+
+        self.assertEqual(list_dates(self.resource, 'test-table', now=NOW), ['28.01.2026', '29.01.2026'])
+
+    def test_list_dates_finds_legacy_partitions(self):
+        """Test that past partitions without MANIFEST or LATEST are found within the window."""
+        for date in ('25.01.2026', '10.01.2026'):
+            pk = f'SCHEDULE#{date}'
+            self.table.put_item(Item={'PK': pk, 'SK': f'META#{RUNS[0]}', 'lesson_count': 1})
+            self.table.put_item(Item={'PK': pk, 'SK': f'LESSON#{RUNS[0]}#id0'})
+
+        self.assertEqual(
+            list_dates(self.resource, 'test-table', now=NOW),
+            ['25.01.2026', '28.01.2026', '29.01.2026'],
+        )
+        self.assertEqual(
+            list_dates(self.resource, 'test-table', now=NOW, days_back=30),
+            ['10.01.2026', '25.01.2026', '28.01.2026', '29.01.2026'],
+        )
+
+    def test_legacy_partition_compacted(self):
+        """Test that a partition without a manifest keeps only its latest version."""
+        pk = 'SCHEDULE#25.01.2026'
+        for ts in RUNS[:2]:
+            self.table.put_item(Item={'PK': pk, 'SK': f'META#{ts}', 'lesson_count': 1})
+            self.table.put_item(Item={'PK': pk, 'SK': f'LESSON#{ts}#id0'})
+
+        result = compact_date(self.table, '25.01.2026', now=NOW)
+
+        self.assertEqual(result['metas_deleted'] + result['lessons_deleted'], 2)
+        self.assertEqual(self.table.keys(pk), [f'LESSON#{RUNS[1]}#id0', f'META#{RUNS[1]}'])
+
+    def test_past_day_keeps_final_version(self):
+        """Test that a past day keeps only its latest version."""
+        before = self._current_lessons('28.01.2026')
+
+        result = compact_date(self.table, '28.01.2026', now=NOW)
+
+        self.assertEqual(result['kept_versions'], 1)
+        self.assertEqual(result['metas_deleted'], 3)
+        self.assertEqual(result['lessons_deleted'], 3)
+        self.assertEqual(self.table.keys('SCHEDULE#28.01.2026'), sorted([
+            'LATEST',
+            'MANIFEST',
+            f'META#{RUNS[-1]}',
+            f"LESSON#{RUNS[0]}#{self._lesson_id('28.01.2026', '09:00')}",
+            f"LESSON#{RUNS[-1]}#{self._lesson_id('28.01.2026', '11:00')}",
+        ]))
+
+        # Unchanged lesson from the first run is still referenced and kept
+        self.assertEqual(self._current_lessons('28.01.2026'), before)
+
+    def test_current_day_keeps_hourly_checkpoints(self):
+        """Test that the current day keeps the last version of each hour."""
+        result = compact_date(self.table, '29.01.2026', now=NOW)
+
+        self.assertEqual(result['kept_versions'], 3)
+        keys = self.table.keys('SCHEDULE#29.01.2026')
+        self.assertEqual(
+            [sk for sk in keys if sk.startswith('META#')],
+            [f'META#{ts}' for ts in RUNS[1:]],
+        )
+
+        # Every kept version can still be reconstructed
+        for ts in RUNS[1:]:
+            meta = self.table.get_item(Key={'PK': 'SCHEDULE#29.01.2026', 'SK': f'META#{ts}'})['Item']
+            for lesson_id, entry in meta['lessons'].items():
+                self.assertIn(f"LESSON#{entry['version']}#{lesson_id}", keys)
+
+    def test_compaction_is_idempotent(self):
+        """Test that a second compaction deletes nothing."""
+        compact_date(self.table, '28.01.2026', now=NOW)
+        result = compact_date(self.table, '28.01.2026', now=NOW)
+
+        self.assertEqual(result['metas_deleted'] + result['lessons_deleted'], 0)
+
+    def test_keeps_lessons_of_run_in_progress(self):
+        """Test that LESSON items newer than every META are not deleted."""
+        in_progress = f"LESSON#2026-01-29T10:30:00Z#{self._lesson_id('28.01.2026', '11:00')}"
+        self.table.put_item(Item={'PK': 'SCHEDULE#28.01.2026', 'SK': in_progress})
+
+        compact_date(self.table, '28.01.2026', now=NOW)
+
+        self.assertIn(in_progress, self.table.keys('SCHEDULE#28.01.2026'))
+
+    def test_keep_versions(self):
+        """Test version selection."""
+        self.assertEqual(keep_versions(RUNS, is_today=False), {RUNS[-1]})
+        self.assertEqual(keep_versions(RUNS, is_today=True), set(RUNS[1:]))
+        self.assertEqual(keep_versions([], is_today=True), set())
+
+    def _lesson_id(self, date, start):
+        """Lesson ID as stored by StorageProcessor."""
+        processor = StorageProcessor(dynamodb_resource=self.resource)
+        return processor._generate_lesson_id(self._make_lesson(date, start))
+
+
+class TestSnapshotCompaction(unittest.TestCase):
+    """Tests for compaction of the snapshot layout."""
+
+    def test_keeps_manifest_snapshot(self):
+        """Test that old snapshots and their S3 overflow objects are deleted."""
+        table = FakeTable()
+        resource = FakeResource(table)
+        mock_s3 = MagicMock()
+
+        for run, ts in enumerate(RUNS):
+            processor = StorageProcessor(
+                dynamodb_resource=resource, timestamp_override=ts,
+                layout='snapshot', s3_client=mock_s3,
+            )
+            # First run overflows to S3
+            processor.SNAPSHOT_MAX_BYTES = 10 if run == 0 else 350_000
+            processor.process({
+                'config': {'data_table': 'test-table', 'input_bucket': 'input-bucket'},
+                'lessons': [{
+                    'order_id': 'o1', 'date': '28.01.2026', 'start': '09:00', 'end': '10:00',
+                    'group_type_key': 'privát', 'notes': f'run {run}',
+                }],
+                'metadata': {'data_sources': {}},
+            })
+
+        result = compact_date(table, '28.01.2026', now=NOW, s3_client=mock_s3)
+
+        self.assertEqual(result['lessons_deleted'], 3)
+        self.assertEqual(table.keys(), sorted([
+            'LATEST', 'MANIFEST', f'META#{RUNS[-1]}', f'SNAPSHOT#{RUNS[-1]}',
+        ]))
+        mock_s3.delete_object.assert_called_once_with(
+            Bucket='input-bucket', Key=f'snapshots/28.01.2026/{RUNS[0]}.zlib',
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
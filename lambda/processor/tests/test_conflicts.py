@@ -0,0 +1,180 @@
+"""
+Tests for ConflictDetectionProcessor.
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.conflicts import ConflictDetectionProcessor
+
+
+class TestConflictDetectionProcessor(unittest.TestCase):
+    """Tests for ConflictDetectionProcessor."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_s3 = MagicMock()
+        self.processor = ConflictDetectionProcessor(s3_client=self.mock_s3)
+
+    def _make_lesson(self, lesson_id, start, end, location='Stone bar',
+                     instructor_id='jan-novak', date='28.01.2026'):
+        """Create a merged lesson."""
+        return {
+            'lesson_id': lesson_id,
+            'booking_id': f'booking-{lesson_id}',
+            'date': date,
+            'start': start,
+            'end': end,
+            'location_key': location,
+            'instructor': {'id': instructor_id, 'name': 'Jan Novák', 'photo': ''},
+        }
+
+    def _run(self, lessons, enrichment=None):
+        data = {
+            'config': {
+                'input_bucket': 'test-input-bucket',
+                'website_bucket': 'test-web-bucket',
+                'enrichment': enrichment or {},
+            },
+            'lessons': lessons,
+            'metadata': {},
+        }
+        return self.processor.process(data)
+
+    def test_no_conflicts(self):
+        """Test back-to-back lessons at the same location."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50'),
+            self._make_lesson('b', '11:00', '12:50'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 0)
+        self.assertEqual(result['metadata']['conflicts']['transfers'], 0)
+
+    def test_overlap_detected(self):
+        """Test that overlapping lessons of one instructor are reported."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50'),
+            self._make_lesson('b', '10:00', '11:50'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 1)
+
+        body = json.loads(self.mock_s3.put_object.call_args[1]['Body'])
+        ids = [l['lesson_id'] for l in body['overlaps'][0]['lessons']]
+        self.assertEqual(ids, ['a', 'b'])
+
+    def test_all_overlapping_pairs_reported(self):
+        """Test that a lesson overlapping two others yields two conflicts."""
+        overlaps, _ = self.processor.find_conflicts([
+            self._make_lesson('a', '09:00', '12:00'),
+            self._make_lesson('b', '09:30', '10:00'),
+            self._make_lesson('c', '10:30', '11:00'),
+        ], travel_minutes=15)
+
+        pairs = {tuple(l['lesson_id'] for l in o['lessons']) for o in overlaps}
+        self.assertEqual(pairs, {('a', 'b'), ('a', 'c')})
+
+    def test_different_instructors_not_conflicting(self):
+        """Test that only lessons of the same instructor are compared."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50', instructor_id='jan-novak'),
+            self._make_lesson('b', '09:00', '10:50', instructor_id='petra-svobodova'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 0)
+
+    def test_default_instructor_ignored(self):
+        """Test that unassigned lessons never conflict."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50', instructor_id=None),
+            self._make_lesson('b', '09:00', '10:50', instructor_id=None),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 0)
+
+    def test_different_dates_not_conflicting(self):
+        """Test that the same times on different dates are fine."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50', date='28.01.2026'),
+            self._make_lesson('b', '09:00', '10:50', date='29.01.2026'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 0)
+
+    def test_impossible_transfer_detected(self):
+        """Test a short gap between different meeting points."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50', location='Stone bar'),
+            self._make_lesson('b', '11:00', '12:50', location='Ski areál'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['transfers'], 1)
+        body = json.loads(self.mock_s3.put_object.call_args[1]['Body'])
+        self.assertEqual(body['transfers'][0]['gap_minutes'], 10)
+
+    def test_travel_time_configurable(self):
+        """Test that travel time comes from the enrichment config."""
+        result = self._run([
+            self._make_lesson('a', '09:00', '10:50', location='Stone bar'),
+            self._make_lesson('b', '11:00', '12:50', location='Ski areál'),
+        ], enrichment={'conflicts': {'travel_minutes': 5}})
+
+        self.assertEqual(result['metadata']['conflicts']['transfers'], 0)
+
+    def test_uploads_conflicts_json(self):
+        """Test that conflicts.json is written to the private input bucket."""
+        self._run([self._make_lesson('a', '09:00', '10:50')])
+
+        call_kwargs = self.mock_s3.put_object.call_args[1]
+        self.assertEqual(call_kwargs['Bucket'], 'test-input-bucket')
+        self.assertEqual(call_kwargs['Key'], 'reports/conflicts.json')
+        self.mock_s3.delete_object.assert_called_once_with(Bucket='test-web-bucket', Key='data/conflicts.json')
+
+    def test_legacy_deleted_only_if_present(self):
+        """Test that the old public conflicts.json is not deleted again once gone."""
+        self.mock_s3.head_object.side_effect = ClientError(
+            {'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject',
+        )
+
+        self._run([self._make_lesson('a', '09:00', '10:50')])
+
+        self.mock_s3.head_object.assert_called_once_with(Bucket='test-web-bucket', Key='data/conflicts.json')
+        self.mock_s3.delete_object.assert_not_called()
+
+    def test_invalid_times_skipped(self):
+        """Test that lessons with unusable times are not compared."""
+        result = self._run([
+            self._make_lesson('a', '', '10:50'),
+            self._make_lesson('b', '09:00', '10:50'),
+        ])
+
+        self.assertEqual(result['metadata']['conflicts']['overlaps'], 0)
+
+    def test_lessons_unchanged(self):
+        """Test that conflict detection does not filter lessons."""
+        lessons = [
+            self._make_lesson('a', '09:00', '10:50'),
+            self._make_lesson('b', '10:00', '11:50'),
+        ]
+        result = self._run(lessons)
+
+        self.assertEqual(len(result['lessons']), 2)
+
+    def test_empty_lessons(self):
+        """Test with empty lessons list."""
+        result = self._run([])
+
+        self.mock_s3.put_object.assert_not_called()
+        self.assertNotIn('conflicts', result['metadata'])
+
+
+if __name__ == '__main__':
+    unittest.main()
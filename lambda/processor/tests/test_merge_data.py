@@ -2,13 +2,14 @@
 Tests for MergeDataProcessor.
 """
 
+import copy
 import unittest
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.merge_data import MergeDataProcessor
+from processors.merge_data import MergeDataProcessor, MergeState
 
 
 SAMPLE_ORDERS = [
@@ -122,6 +123,25 @@ class TestMergeDataProcessor(unittest.TestCase):
         self.assertEqual(lesson1['start'], '09:00')
         self.assertEqual(lesson1['end'], '10:50')
 
+    def test_epoch_minutes(self):
+        """Test that epoch minutes are carried and local times use Prague."""
+        orders = [dict(SAMPLE_ORDERS[0],
+                       timestamp_start='2025-12-28T08:00:00Z',
+                       timestamp_end='2025-12-28T09:50:00Z')]
+        data = {
+            'raw': {'orders': orders, 'instructors': {}},
+            'lessons': [],
+            'metadata': {},
+        }
+
+        result = self.processor.process(data)
+
+        lesson = result['lessons'][0]
+        # 08:00 UTC is 09:00 CET
+        self.assertEqual(lesson['start'], '09:00')
+        self.assertEqual(lesson['end'], '10:50')
+        self.assertEqual(lesson['end_min'] - lesson['start_min'], 110)
+
     def test_lesson_fields(self):
         """Test that merged lessons have all required fields."""
         data = {
@@ -161,5 +181,142 @@ class TestMergeDataProcessor(unittest.TestCase):
         self.assertEqual(result['lessons'], [])
 
 
+class TestIncrementalMerge(unittest.TestCase):
+    """Tests for MergeDataProcessor with a MergeState (incremental mode)."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.state = MergeState()
+        self.processor = MergeDataProcessor(state=self.state)
+
+    def _run(self, orders, instructors):
+        data = {
+            'raw': {
+                'orders': copy.deepcopy(orders),
+                'instructors': copy.deepcopy(instructors),
+            },
+            'lessons': [],
+            'metadata': {},
+        }
+        return self.processor.process(data)
+
+    def test_first_run_is_full_merge(self):
+        """Test that the first run merges everything and primes the state."""
+        result = self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        self.assertEqual(len(result['lessons']), 2)
+        self.assertNotIn('merge', result['metadata'])
+        self.assertTrue(self.state.is_primed)
+
+    def test_unchanged_run_reuses_lessons(self):
+        """Test that an identical run rebuilds nothing."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+        result = self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        stats = result['metadata']['merge']
+        self.assertEqual(stats['rebuilt'], 0)
+        self.assertEqual(stats['reused'], 2)
+        self.assertEqual(result['lessons'][0]['instructor']['name'], 'Jan Novák')
+
+    def test_changed_order_rebuilds_only_that_lesson(self):
+        """Test that a new participant rebuilds just the affected lesson."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        orders = copy.deepcopy(SAMPLE_ORDERS)
+        orders[1]['people'].append({'name': 'Child3', 'language': 'cz', 'sponsor': 'Test Person'})
+        orders[1]['people_count'] = 3
+        result = self._run(orders, SAMPLE_INSTRUCTORS)
+
+        self.assertEqual(result['metadata']['merge']['rebuilt'], 1)
+        self.assertEqual(result['lessons'][1]['people_count'], 3)
+
+    def test_reassignment_rebuilds_only_that_lesson(self):
+        """Test that a roster reassignment rebuilds just the affected lesson."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        instructors = copy.deepcopy(SAMPLE_INSTRUCTORS)
+        instructors['roster']['assignments'][0]['booking_ids'].append('no-instructor-booking')
+        result = self._run(SAMPLE_ORDERS, instructors)
+
+        stats = result['metadata']['merge']
+        self.assertEqual(stats['rebuilt'], 1)
+        self.assertEqual(stats['changed_bookings'], 1)
+        self.assertEqual(result['lessons'][1]['instructor']['id'], 'jan-novak')
+
+    def test_profile_edit_rebuilds_assigned_lessons(self):
+        """Test that editing a profile rebuilds lessons of that instructor."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        instructors = copy.deepcopy(SAMPLE_INSTRUCTORS)
+        instructors['profiles']['jan-novak']['name'] = 'Jan Novák st.'
+        result = self._run(SAMPLE_ORDERS, instructors)
+
+        self.assertEqual(result['metadata']['merge']['rebuilt'], 1)
+        self.assertEqual(result['lessons'][0]['instructor']['name'], 'Jan Novák st.')
+
+    def test_removed_order_dropped(self):
+        """Test that lessons of removed orders are no longer emitted."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+        result = self._run(SAMPLE_ORDERS[:1], SAMPLE_INSTRUCTORS)
+
+        self.assertEqual(len(result['lessons']), 1)
+        self.assertEqual(result['metadata']['merge']['removed'], 1)
+
+    def test_roster_only_run_reuses_orders(self):
+        """Test that a roster upload without orders re-merges previous orders."""
+        self._run(SAMPLE_ORDERS, {})
+        result = self._run([], SAMPLE_INSTRUCTORS)
+
+        self.assertEqual(len(result['lessons']), 2)
+        self.assertEqual(result['metadata']['merge']['rebuilt'], 1)
+        self.assertEqual(result['lessons'][0]['instructor']['id'], 'jan-novak')
+
+    def test_roster_only_upload_keeps_profiles(self):
+        """Test that a run with only a roster file reuses the profiles of the previous run."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        # instructors/roster-*.json trigger: no orders, no profiles
+        result = self._run([], {'roster': SAMPLE_INSTRUCTORS['roster']})
+
+        self.assertEqual(result['lessons'][0]['instructor']['name'], 'Jan Novák')
+        self.assertEqual(result['metadata']['merge']['rebuilt'], 0)
+
+    def test_profiles_only_upload_keeps_roster(self):
+        """Test that a run with only profiles reuses the roster of the previous run."""
+        self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+        profiles = copy.deepcopy(SAMPLE_INSTRUCTORS['profiles'])
+        profiles['jan-novak']['photo'] = 'assets/instructors/jan-novak-2.jpg'
+
+        result = self._run([], {'profiles': profiles})
+
+        self.assertEqual(result['lessons'][0]['instructor']['id'], 'jan-novak')
+        self.assertEqual(result['lessons'][0]['instructor']['photo'], 'assets/instructors/jan-novak-2.jpg')
+        self.assertEqual(result['metadata']['merge']['rebuilt'], 1)
+
+    def test_matches_full_merge(self):
+        """Test that incremental output equals a full merge of the same input."""
+        self._run(SAMPLE_ORDERS, {})
+        incremental = self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)['lessons']
+
+        full = MergeDataProcessor().process({
+            'raw': {'orders': copy.deepcopy(SAMPLE_ORDERS), 'instructors': SAMPLE_INSTRUCTORS},
+            'lessons': [],
+            'metadata': {},
+        })['lessons']
+
+        self.assertEqual(incremental, full)
+
+    def test_stored_lessons_isolated_from_pipeline(self):
+        """Test that downstream in-place edits do not leak into the state."""
+        first = self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+        first['lessons'][0]['people'][0]['sponsor'] = 'Ir.Sc.'
+        first['lessons'][0]['sponsor'] = 'Ir.Sc.'
+
+        result = self._run(SAMPLE_ORDERS, SAMPLE_INSTRUCTORS)
+
+        self.assertEqual(result['lessons'][0]['people'][0]['sponsor'], 'Iryna Schröder')
+        self.assertNotIn('sponsor', result['lessons'][0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,16 +2,23 @@
 Tests for OutputProcessor.
 """
 
+import gzip
+import hashlib
+import io
 import json
+import re
 import unittest
 from unittest.mock import MagicMock, patch
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.output import OutputProcessor
+from processors.output import OutputProcessor, compress_variants, serialize_schedule, split_timeline
+from time_index import PRAGUE, epoch_minutes, local_to_epoch_minutes
 
 
 class TestOutputProcessor(unittest.TestCase):
@@ -20,6 +27,9 @@ class TestOutputProcessor(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.mock_s3 = MagicMock()
+        self.mock_s3.head_object.return_value = {}  # No previous upload
+        self.mock_s3.get_object.side_effect = Exception('NoSuchKey')  # No previous pointer
+        self.mock_s3.list_objects_v2.return_value = {}  # No versions to collect
         self.processor = OutputProcessor(s3_client=self.mock_s3)
 
     def _make_lesson(self, **overrides):
@@ -45,11 +55,69 @@ class TestOutputProcessor(unittest.TestCase):
         base.update(overrides)
         return base
 
+    def _put_keys(self, prefix=''):
+        """Keys written with put_object, in order."""
+        return [
+            c[1]['Key'] for c in self.mock_s3.put_object.call_args_list
+            if c[1]['Key'].startswith(prefix)
+        ]
+
+    def _version_key(self, name, edition=''):
+        """Last uploaded version key of a document (data/v/{name}.{hash}{edition}.json)."""
+        pattern = re.compile(rf'data/v/{re.escape(name)}\.[0-9a-f]{{16}}{re.escape(edition)}\.json')
+        return [key for key in self._put_keys() if pattern.fullmatch(key)][-1]
+
+    def _schedule(self):
+        """Last uploaded full schedule version."""
+        return self._uploaded_json(self._version_key('schedule'))
+
+    def _serve_uploads(self):
+        """
+        Let get_object/head_object return what put_object stored last, with an
+        ETag; puts honour IfMatch/IfNoneMatch like S3 (412 PreconditionFailed).
+
+        Returns:
+            Dict of stored objects (key -> put_object kwargs plus ETag)
+        """
+        objects = {}
+
+        def store(**kwargs):
+            current = objects.get(kwargs['Key'])
+            if ('IfMatch' in kwargs and (not current or current['ETag'] != kwargs['IfMatch'])) or \
+                    ('IfNoneMatch' in kwargs and current):
+                raise ClientError({'Error': {'Code': 'PreconditionFailed', 'Message': ''}}, 'PutObject')
+            objects[kwargs['Key']] = {**kwargs, 'ETag': f'"{hashlib.md5(kwargs["Body"]).hexdigest()}"'}
+            return {'ETag': objects[kwargs['Key']]['ETag']}
+
+        def stored(Bucket, Key):
+            if Key not in objects:
+                raise Exception('NoSuchKey')
+            obj = objects[Key]
+            return {'Body': io.BytesIO(obj['Body']), 'Metadata': obj['Metadata'], 'ETag': obj['ETag']}
+
+        for c in self.mock_s3.put_object.call_args_list:
+            store(**{k: v for k, v in c[1].items() if k not in ('IfMatch', 'IfNoneMatch')})
+        self.mock_s3.put_object.side_effect = store
+        self.mock_s3.get_object.side_effect = stored
+        self.mock_s3.head_object.side_effect = stored
+        return objects
+
+    def _racing_pointer(self, objects, **fields):
+        """Side effect storing the pointer with fields changed, as a concurrent writer would."""
+        def race(*args, **kwargs):
+            pointer = {**json.loads(objects['data/current.json']['Body']), **fields}
+            self.mock_s3.put_object(
+                Bucket='test-bucket', Key='data/current.json', Body=serialize_schedule(pointer),
+                Metadata={}, CacheControl='max-age=5', ContentType='application/json',
+            )
+            return race.original(*args, **kwargs)
+        return race
+
     @patch('processors.output.datetime')
     def test_generates_schedule_json(self, mock_datetime):
         """Test that schedule.json is generated and uploaded."""
         # Mock current time
-        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -61,19 +129,23 @@ class TestOutputProcessor(unittest.TestCase):
 
         result = self.processor.process(data)
 
-        # Should have uploaded to S3
-        self.mock_s3.put_object.assert_called_once()
-        call_kwargs = self.mock_s3.put_object.call_args[1]
+        # Versions first (plain object after its variants), then the pointer
+        schedule_key = self._version_key('schedule')
+        keys = self._put_keys()
+        swap = keys.index('data/current.json')
+        self.assertEqual(keys[swap - 2:swap + 1], [schedule_key + '.gz', schedule_key, 'data/current.json'])
+        call_kwargs = self.mock_s3.put_object.call_args_list[swap][1]
 
         self.assertEqual(call_kwargs['Bucket'], 'test-web-bucket')
-        self.assertEqual(call_kwargs['Key'], 'data/schedule.json')
         self.assertEqual(call_kwargs['ContentType'], 'application/json')
+        self.assertEqual(json.loads(call_kwargs['Body'])['schedule'], schedule_key)
+        self.assertEqual(result['metadata']['output']['key'], schedule_key)
 
     @patch('processors.output.datetime')
     def test_current_lesson_detection(self, mock_datetime):
         """Test that current lessons are correctly identified."""
         # Time is 10:30, lesson 10:00-11:50 should be current
-        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -94,7 +166,7 @@ class TestOutputProcessor(unittest.TestCase):
     def test_upcoming_lesson_detection(self, mock_datetime):
         """Test that upcoming lessons are correctly identified."""
         # Time is 09:00, lesson 10:00-11:50 should be upcoming
-        mock_now = datetime(2026, 1, 28, 9, 0, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 9, 0, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -115,7 +187,7 @@ class TestOutputProcessor(unittest.TestCase):
     def test_past_lesson_excluded(self, mock_datetime):
         """Test that past lessons are excluded."""
         # Time is 15:00, lesson 10:00-11:50 is past
-        mock_now = datetime(2026, 1, 28, 15, 0, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 15, 0, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -136,7 +208,7 @@ class TestOutputProcessor(unittest.TestCase):
     @patch('processors.output.datetime')
     def test_other_date_excluded(self, mock_datetime):
         """Test that lessons from other dates are excluded."""
-        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -153,6 +225,95 @@ class TestOutputProcessor(unittest.TestCase):
         self.assertEqual(result['metadata']['output']['current_lessons'], 0)
         self.assertEqual(result['metadata']['output']['upcoming_lessons'], 0)
 
+    @patch('processors.output.datetime')
+    def test_uses_prague_time_not_utc(self, mock_datetime):
+        """Test that current/upcoming is decided in resort time."""
+        # 08:30 UTC is 09:30 in Prague (CET), so a 09:00 lesson is running
+        mock_now = datetime(2026, 1, 28, 8, 30, tzinfo=timezone.utc)
+        mock_datetime.now.return_value = mock_now
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(start='09:00', end='10:50')],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['current_lessons'], 1)
+        self.assertEqual(result['metadata']['output']['upcoming_lessons'], 0)
+
+    @patch('processors.output.datetime')
+    def test_today_is_prague_date(self, mock_datetime):
+        """Test that just after local midnight, today is the Prague date."""
+        # 23:30 UTC on 27.01 is 00:30 on 28.01 in Prague
+        mock_now = datetime(2026, 1, 27, 23, 30, tzinfo=timezone.utc)
+        mock_datetime.now.return_value = mock_now
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(date='28.01.2026')],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        schedule = self._schedule()
+        self.assertEqual(schedule['date'], '2026-01-28')
+        self.assertEqual(result['metadata']['output']['upcoming_lessons'], 1)
+
+    @patch('processors.output.datetime')
+    def test_summer_time(self, mock_datetime):
+        """Test classification after the switch to CEST (UTC+2)."""
+        # 07:30 UTC on 29.03.2026 is 09:30 CEST
+        mock_now = datetime(2026, 3, 29, 7, 30, tzinfo=timezone.utc)
+        mock_datetime.now.return_value = mock_now
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [
+                self._make_lesson(date='29.03.2026', start='09:00', end='10:50'),
+                self._make_lesson(date='29.03.2026', start='09:45', end='10:50'),
+            ],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['current_lessons'], 1)
+        self.assertEqual(result['metadata']['output']['upcoming_lessons'], 1)
+
+    @patch('processors.output.datetime')
+    def test_epoch_minutes_preferred(self, mock_datetime):
+        """Test that start_min/end_min from the parser drive classification."""
+        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        mock_datetime.now.return_value = mock_now
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+
+        long_lesson = self._make_lesson(start='08:00', end='12:00')
+        long_lesson['start_min'] = local_to_epoch_minutes('28.01.2026', '08:00')
+        long_lesson['end_min'] = local_to_epoch_minutes('28.01.2026', '12:00')
+
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [
+                long_lesson,
+                self._make_lesson(start='09:00', end='10:00'),  # Finished
+                self._make_lesson(start='10:00', end='11:00'),  # Current
+                self._make_lesson(start='11:00', end='12:00'),  # Upcoming
+            ],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        schedule = self._schedule()
+        self.assertEqual([l['start'] for l in schedule['current_lessons']], ['08:00', '10:00'])
+        self.assertEqual([l['start'] for l in schedule['upcoming_lessons']], ['11:00'])
+
     def test_no_bucket_configured(self):
         """Test error when no bucket is configured."""
         data = {
@@ -169,7 +330,7 @@ class TestOutputProcessor(unittest.TestCase):
     @patch('processors.output.datetime')
     def test_output_format(self, mock_datetime):
         """Test that output has correct format."""
-        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=timezone.utc)
+        mock_now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
         mock_datetime.now.return_value = mock_now
         mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
 
@@ -182,8 +343,7 @@ class TestOutputProcessor(unittest.TestCase):
         self.processor.process(data)
 
         # Parse uploaded JSON
-        call_kwargs = self.mock_s3.put_object.call_args[1]
-        schedule = json.loads(call_kwargs['Body'])
+        schedule = self._schedule()
 
         # Check structure
         self.assertIn('generated_at', schedule)
@@ -201,5 +361,791 @@ class TestOutputProcessor(unittest.TestCase):
         self.assertEqual(lesson['instructor']['name'], 'Jan Novák')
 
 
+    @patch('processors.output.time')
+    def test_reports_publish_latency(self, mock_time):
+        """Test that the time from trigger to upload is reported."""
+        mock_time.time.return_value = 1000.25
+
+        with patch('processors.output.emit_metrics') as emit:
+            result = self.processor.process({
+                'trigger': {'bucket': 'input', 'key': 'orders.tsv', 'triggered_at': 998.0},
+                'config': {'website_bucket': 'test-bucket'},
+                'lessons': [],
+                'metadata': {'data_sources': {}},
+            })
+
+        self.assertEqual(result['metadata']['output']['publish_latency_ms'], 2250)
+        emit.assert_called_once_with({'PublishLatency': 2250}, {'Stage': 'Output'}, unit='Milliseconds')
+
+    @patch('processors.output.datetime')
+    def test_skips_unchanged_upload(self, mock_datetime):
+        """Test that a schedule differing only in generated_at is not re-uploaded."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        self._serve_uploads()
+        uploads = self.mock_s3.put_object.call_count
+
+        # Same content a few seconds later
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, 5, tzinfo=PRAGUE)
+        result = self.processor.process(data)
+
+        self.assertEqual(self.mock_s3.put_object.call_count, uploads)
+        self.assertEqual(result['metadata']['output']['uploads_skipped'], 1)
+        self.assertEqual(result['metadata']['output']['shards']['unchanged'], 1)
+        self.assertEqual(result['metadata']['output']['uploaded'], 0)
+        self.assertEqual(result['metadata']['output']['pointer_swapped'], 0)
+
+    @patch('processors.output.datetime')
+    def test_uploads_changed_content(self, mock_datetime):
+        """Test that changed content becomes a new version and the pointer is swapped to it."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self._serve_uploads()
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        first = self._version_key('schedule')
+
+        data['lessons'] = [self._make_lesson(notes='Meet at the lift')]
+        result = self.processor.process(data)
+
+        second = self._version_key('schedule')
+        self.assertNotEqual(second, first)
+        self.assertEqual(len(self._put_keys('data/v/schedule.')), 4)
+        self.assertEqual(self._uploaded_json('data/current.json')['schedule'], second)
+        self.assertEqual(result['metadata']['output']['uploads_skipped'], 0)
+        self.assertEqual(result['metadata']['output']['pointer_swapped'], 1)
+
+    @patch('processors.output.datetime')
+    def test_immutable_versions_and_short_pointer(self, mock_datetime):
+        """Test that versions are cached for a year and only the pointer has a short TTL."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        cache_control = {c[1]['Key']: c[1]['CacheControl'] for c in self.mock_s3.put_object.call_args_list}
+        self.assertEqual(cache_control.pop('data/current.json'), 'max-age=5')
+        self.assertEqual(cache_control.pop('data/today.json'), 'max-age=5')
+        self.assertEqual(cache_control.pop('data/today.json.gz'), 'max-age=5')
+        for key, value in cache_control.items():
+            if key.startswith('data/v/'):
+                self.assertEqual(value, 'public, max-age=31536000, immutable', key)
+            elif not key.startswith('data/feed/'):
+                self.assertRegex(key, r'^data/(schedule|manifest|feed)\.json', key)  # Legacy documents
+                self.assertEqual(value, 'max-age=60', key)
+
+        pointer = self._uploaded_json('data/current.json')
+        self.assertEqual(
+            set(pointer),
+            {'generated_at', 'seq', 'min_seq', 'manifest', 'schedule', 'displays', 'displays_date'},
+        )
+        self.assertEqual(self._uploaded_json(pointer['manifest'])['dates']['2026-01-28']['key'],
+                         self._version_key('2026-01-28'))
+
+    @patch('processors.output.datetime')
+    def test_collects_unreferenced_versions(self, mock_datetime):
+        """Test that only versions no longer referenced and older than the retention are deleted."""
+        now = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        mock_datetime.now.return_value = now
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+        current = self._version_key('schedule')
+        old = now - timedelta(hours=2)
+        self.mock_s3.list_objects_v2.return_value = {'Contents': [
+            {'Key': current, 'LastModified': old},
+            {'Key': current + '.gz', 'LastModified': old},
+            {'Key': 'data/v/schedule.0000000000000000.json', 'LastModified': old},
+            {'Key': 'data/v/schedule.0000000000000000.json.gz', 'LastModified': old},
+            {'Key': 'data/v/schedule.1111111111111111.json', 'LastModified': now},
+        ]}
+
+        result = self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        self.assertEqual(result['metadata']['output']['versions_deleted'], 2)
+        deleted = self.mock_s3.delete_objects.call_args[1]['Delete']['Objects']
+        self.assertEqual(deleted, [
+            {'Key': 'data/v/schedule.0000000000000000.json'},
+            {'Key': 'data/v/schedule.0000000000000000.json.gz'},
+        ])
+
+    @patch('processors.output.datetime')
+    def test_version_cleanup_failure_is_not_fatal(self, mock_datetime):
+        """Test that a failing version listing does not fail the run."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self.mock_s3.list_objects_v2.side_effect = Exception('AccessDenied')
+
+        result = self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        self.assertEqual(result['metadata']['output']['versions_deleted'], 0)
+        self.assertIn('data/current.json', self._put_keys())
+        self.assertEqual(result['metadata']['output']['pointer_swapped'], 1)
+
+    @patch('processors.output.datetime')
+    def test_compact_and_gzip_variants(self, mock_datetime):
+        """Test that the plain object is compact and the gzip variant decodes to it."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+
+        result = self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        puts = {c[1]['Key']: c[1] for c in self.mock_s3.put_object.call_args_list}
+        plain = puts[self._version_key('schedule')]
+        compressed = puts[self._version_key('schedule') + '.gz']
+        self.assertNotIn(b'\n', plain['Body'])
+        self.assertNotIn(b'", "', plain['Body'])
+        self.assertNotIn('ContentEncoding', plain)
+        self.assertEqual(compressed['ContentEncoding'], 'gzip')
+        self.assertEqual(compressed['ContentType'], 'application/json')
+        self.assertEqual(gzip.decompress(compressed['Body']), plain['Body'])
+        self.assertEqual(compressed['Metadata'], plain['Metadata'])
+
+        sizes = result['metadata']['output']['bytes']
+        self.assertEqual(sizes['identity'], len(plain['Body']))
+        self.assertLess(sizes['gzip'], sizes['identity'])
+
+    def test_variants_are_byte_stable(self):
+        """Test that compressing the same body later gives the same bytes (stable ETag)."""
+        body = serialize_schedule({'lessons': [self._make_lesson()]})
+
+        with patch('time.time', return_value=1769590000):
+            first = compress_variants(body)
+        with patch('time.time', return_value=1769600000):
+            second = compress_variants(body)
+
+        self.assertEqual(first['.gz'], second['.gz'])
+
+    @patch('processors.output.brotli')
+    def test_brotli_variant_when_available(self, mock_brotli):
+        """Test that a brotli variant is added when the package is installed."""
+        mock_brotli.compress.return_value = b'br-body'
+
+        variants = compress_variants(b'{"a":1}')
+
+        self.assertEqual(variants['.br'], ('br', b'br-body'))
+        self.assertEqual(variants['.gz'][0], 'gzip')
+
+    @patch('processors.output.datetime')
+    def test_writes_per_date_shards(self, mock_datetime):
+        """Test that each date gets a shard and the manifest lists them."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+
+        result = self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [
+                self._make_lesson(),
+                self._make_lesson(start='08:00', booking_id='b2'),
+                self._make_lesson(date='29.01.2026'),
+            ],
+            'metadata': {'data_sources': {}},
+        })
+
+        shard_key = self._version_key('2026-01-28')
+        shard = self._uploaded_json(shard_key)
+        self.assertEqual(shard['date'], '28.01.2026')
+        self.assertEqual([l['start'] for l in shard['lessons']], ['08:00', '10:00'])
+        self.assertIn(shard_key + '.gz', self._put_keys())
+
+        manifest_key = self._uploaded_json('data/current.json')['manifest']
+        manifest = self._uploaded_json(manifest_key)
+        self.assertEqual(list(manifest['dates']), ['2026-01-28', '2026-01-29'])
+        self.assertEqual(manifest['dates']['2026-01-29']['key'], self._version_key('2026-01-29'))
+        self.assertEqual(manifest['dates']['2026-01-28']['count'], 2)
+        self.assertEqual(result['metadata']['output']['shards'], {'written': 2, 'unchanged': 0, 'removed': 0, 'seq': 1})
+
+        # Manifest is written after the shards
+        keys = self._put_keys()
+        self.assertLess(keys.index(self._version_key('2026-01-29')), keys.index(manifest_key))
+
+    @patch('processors.output.datetime')
+    def test_rewrites_only_changed_shards(self, mock_datetime):
+        """Test that unchanged shards are kept and removed dates leave the manifest."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [
+                self._make_lesson(date='27.01.2026'),
+                self._make_lesson(),
+                self._make_lesson(date='29.01.2026'),
+            ],
+            'metadata': {'data_sources': {}},
+        })
+        self._serve_uploads()
+        uploads = self.mock_s3.put_object.call_count
+
+        # 27.01. dropped, 29.01. changed
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 35, tzinfo=PRAGUE)
+        result = self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(), self._make_lesson(date='29.01.2026', notes='Lift B')],
+            'metadata': {'data_sources': {}},
+        })
+
+        self.assertEqual(result['metadata']['output']['shards'], {'written': 1, 'unchanged': 1, 'removed': 1, 'seq': 2})
+        shard_key = self._version_key('2026-01-29')
+        self.assertEqual(self._put_keys()[uploads:uploads + 2], [shard_key + '.gz', shard_key])
+        manifest = self._uploaded_json(self._uploaded_json('data/current.json')['manifest'])
+        self.assertEqual(list(manifest['dates']), ['2026-01-28', '2026-01-29'])
+
+    def _uploaded_json(self, key):
+        """Last JSON document uploaded to key."""
+        puts = [c[1] for c in self.mock_s3.put_object.call_args_list if c[1]['Key'] == key]
+        return json.loads(puts[-1]['Body'])
+
+    @patch('processors.output.datetime')
+    def test_feed_delta_operations(self, mock_datetime):
+        """Test that a delta upserts changed lessons and removes deleted IDs."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(start='09:00'), self._make_lesson(start='10:00')],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        self._serve_uploads()
+        ids = {l['start']: l['id'] for l in self._uploaded_json(self._version_key('2026-01-28'))['lessons']}
+
+        self.assertEqual(self._uploaded_json('data/feed/1.json')['dates'], {
+            '2026-01-28': {'full': True, 'count': 2},
+        })
+
+        # 09:00 edited, 10:00 cancelled, 12:00 added
+        data['lessons'] = [
+            self._make_lesson(start='09:00', notes='Meet at the lift'),
+            self._make_lesson(start='12:00'),
+        ]
+        self.processor.process(data)
+
+        delta = self._uploaded_json('data/feed/2.json')['dates']['2026-01-28']
+        self.assertEqual(delta['remove'], [ids['10:00']])
+        self.assertEqual(
+            {l['start']: l['notes'] for l in delta['upsert'].values()},
+            {'09:00': 'Meet at the lift', '12:00': None},
+        )
+        self.assertIn(ids['09:00'], delta['upsert'])
+        self.assertEqual(delta['count'], 2)
+        pointer = self._uploaded_json('data/current.json')
+        self.assertEqual(pointer['seq'], 2)
+        self.assertEqual(self._uploaded_json(pointer['manifest'])['seq'], 2)
+
+    @patch('processors.output.datetime')
+    def test_feed_retention(self, mock_datetime):
+        """Test that deltas beyond the retention are deleted."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self._serve_uploads()
+        self.processor.FEED_RETENTION = 2
+
+        for run in range(3):
+            self.processor.process({
+                'config': {'website_bucket': 'test-bucket'},
+                'lessons': [self._make_lesson(notes=f'run {run}')],
+                'metadata': {'data_sources': {}},
+            })
+
+        pointer = self._uploaded_json('data/current.json')
+        self.assertEqual((pointer['seq'], pointer['min_seq']), (3, 2))
+        deleted = self.mock_s3.delete_objects.call_args[1]['Delete']['Objects']
+        self.assertIn({'Key': 'data/feed/1.json'}, deleted)
+
+    @patch('processors.output.datetime')
+    def test_feed_delta_race_supersedes_run(self, mock_datetime):
+        """Test that a run finding its seq already written stops instead of overwriting the delta."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        objects = self._serve_uploads()
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        pointer = objects['data/current.json']['Body']
+
+        # A concurrent run that read the same pointer claims seq 2 first
+        def race(*args, **kwargs):
+            self.mock_s3.put_object(
+                Bucket='test-bucket', Key='data/feed/2.json.gz', Body=b'winner', Metadata={},
+            )
+            return original(*args, **kwargs)
+        original = self.processor._append_feed
+
+        data['lessons'] = [self._make_lesson(notes='Meet at the lift')]
+        with patch.object(self.processor, '_append_feed', side_effect=race):
+            result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['superseded'], 1)
+        self.assertEqual(objects['data/feed/2.json.gz']['Body'], b'winner')
+        self.assertNotIn('data/feed/2.json', objects)
+        self.assertEqual(objects['data/current.json']['Body'], pointer)
+        self.assertTrue(all(
+            c[1].get('IfNoneMatch') == '*'
+            for c in self.mock_s3.put_object.call_args_list if c[1]['Key'].startswith('data/feed/')
+            and c[1]['Body'] != b'winner'
+        ))
+
+    @patch('processors.output.datetime')
+    def test_feed_continues_without_pointer(self, mock_datetime):
+        """Test that a lost pointer doesn't restart the feed on seqs still in it."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        feed = [
+            {'Key': 'data/feed/6.json', 'LastModified': datetime(2026, 1, 28, tzinfo=timezone.utc)},
+            {'Key': 'data/feed/7.de.json.gz', 'LastModified': datetime(2026, 1, 28, tzinfo=timezone.utc)},
+        ]
+        self.mock_s3.list_objects_v2.side_effect = lambda Bucket, Prefix: (
+            {'Contents': feed} if Prefix == 'data/feed/' else {}
+        )
+
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        self.assertEqual(self._uploaded_json('data/current.json')['seq'], 8)
+        self.assertIn('data/feed/8.json', self._put_keys())
+
+    @patch('processors.output.datetime')
+    def test_language_editions(self, mock_datetime):
+        """Test that each configured language gets a translated shard and delta."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        config = {
+            'website_bucket': 'test-bucket',
+            'ui_translations': {
+                'de': {'no_lessons': 'Keine Kurse'},
+                'en': {'no_lessons': 'No lessons'},
+            },
+            'dictionaries': {
+                'levels': {'dětská školka': {'de': 'Kinderskischule', 'en': 'Kids Ski School'}},
+                'locations': {'Stone bar': {'de': 'Stone Bar'}},
+            },
+        }
+
+        result = self.processor.process({
+            'config': config,
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        })
+
+        german = self._uploaded_json(self._version_key('2026-01-28', '.de'))
+        self.assertEqual(german['lang'], 'de')
+        self.assertEqual(german['ui'], {'no_lessons': 'Keine Kurse'})
+        lesson = german['lessons'][0]
+        self.assertEqual((lesson['level'], lesson['location']), ('Kinderskischule', 'Stone Bar'))
+        self.assertEqual(lesson['level_key'], 'dětská školka')
+
+        english = self._uploaded_json(self._version_key('2026-01-28', '.en'))
+        self.assertEqual(english['lessons'][0]['location'], 'Stone bar')  # No translation
+        self.assertNotIn('level', self._uploaded_json(self._version_key('2026-01-28'))['lessons'][0])
+
+        manifest = self._uploaded_json(self._uploaded_json('data/current.json')['manifest'])
+        self.assertEqual(manifest['languages'], ['de', 'en'])
+        self.assertIn('data/feed/1.de.json', self._put_keys())
+        self.assertFalse(any(key.endswith('.pl.json') for key in self._put_keys()))
+        self.assertEqual(result['metadata']['output']['shards']['written'], 1)
+
+    @patch('processors.output.datetime')
+    def test_translation_change_rewrites_shards(self, mock_datetime):
+        """Test that changed dictionaries rewrite unchanged lessons' shards."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self._serve_uploads()
+        data = {
+            'config': {
+                'website_bucket': 'test-bucket',
+                'ui_translations': {'de': {}},
+                'dictionaries': {'levels': {}},
+            },
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+
+        data['config']['dictionaries'] = {'levels': {'dětská školka': {'de': 'Kinderskischule'}}}
+        result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['shards']['written'], 1)
+        delta = self._uploaded_json('data/feed/2.de.json')['dates']['2026-01-28']
+        self.assertEqual([l['level'] for l in delta['upsert'].values()], ['Kinderskischule'])
+        self.assertEqual(self._uploaded_json('data/feed/2.json')['dates']['2026-01-28']['upsert'], {})
+
+    @patch('processors.output.datetime')
+    def test_rotation_pages(self, mock_datetime):
+        """Test that lessons are grouped into slot pages and full slots are split."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 8, 0, tzinfo=PRAGUE)
+        lessons = [self._make_lesson(start='09:00'), self._make_lesson(start='10:00')]
+        lessons += [self._make_lesson(start='11:00', location_key=f'Point {n}') for n in range(15)]
+
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': lessons,
+            'metadata': {'data_sources': {}},
+        })
+
+        shard = self._uploaded_json(self._version_key('2026-01-28'))
+        pages = shard['pages']
+        self.assertEqual([p['label'] for p in pages], ['09:00', '11:00 1/2', '11:00 2/2'])
+        self.assertEqual([len(p['lesson_ids']) for p in pages], [2, 8, 7])
+        self.assertEqual(pages[1]['main_window'], [600, 719])
+        self.assertEqual(pages[1]['durations_ms']['main'], 15000)
+
+        # The slot table also lists the slots without lessons (13:00, 14:30)
+        self.assertEqual([s['label'] for s in shard['slots']], ['09:00', '11:00', '13:00', '14:30'])
+        self.assertEqual(shard['slots'][2]['main_window'], [720, 839])
+
+        # Every lesson is on exactly one page
+        ids = [lesson_id for page in pages for lesson_id in page['lesson_ids']]
+        self.assertEqual(sorted(ids), sorted(l['id'] for l in shard['lessons']))
+
+    @patch('processors.output.datetime')
+    def test_cards_per_page_config(self, mock_datetime):
+        """Test that enrichment display.cards_per_page sets the page capacity."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 8, 0, tzinfo=PRAGUE)
+        self._serve_uploads()
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(start='13:00', location_key=f'Point {n}') for n in range(3)],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+
+        data['config']['enrichment'] = {'display': {'cards_per_page': 2}}
+        result = self.processor.process(data)
+
+        # Same lessons, new capacity: shard rewritten, delta carries the pages
+        self.assertEqual(result['metadata']['output']['shards']['written'], 1)
+        delta = self._uploaded_json('data/feed/2.json')['dates']['2026-01-28']
+        self.assertEqual(delta['upsert'], {})
+        self.assertEqual([len(p['lesson_ids']) for p in delta['pages']], [2, 1])
+
+    @patch('processors.output.datetime')
+    def test_timeline(self, mock_datetime):
+        """Test that shards carry a start-sorted timeline that splits like the schedule."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [
+                self._make_lesson(start='13:00', end='14:00', booking_id='b3'),
+                self._make_lesson(start='08:00', end='09:00', booking_id='b1'),
+                self._make_lesson(booking_id='b2'),
+            ],
+            'metadata': {'data_sources': {}},
+        })
+
+        shard = self._uploaded_json(self._version_key('2026-01-28'))
+        timeline = shard['timeline']
+        self.assertEqual(timeline['starts'], sorted(timeline['starts']))
+        self.assertEqual(timeline['ends'][0] - timeline['starts'][0], 60)
+        self.assertEqual(timeline['ids'], [l['id'] for l in shard['lessons']])
+
+        schedule = self._schedule()
+        now_min = epoch_minutes(datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE))
+        current, upcoming = split_timeline(timeline, now_min)
+        self.assertEqual(current, [l['id'] for l in schedule['current_lessons']])
+        self.assertEqual(upcoming, [l['id'] for l in schedule['upcoming_lessons']])
+        self.assertEqual(split_timeline(timeline, now_min + 24 * 60), ([], []))
+
+    @patch('processors.output.datetime')
+    def test_rerender_updates_today_view(self, mock_datetime):
+        """Test that rerender only rewrites data/today.json, from today's shard."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 9, 0, tzinfo=PRAGUE)
+        self._serve_uploads()
+        self.processor.process({
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson(), self._make_lesson(date='29.01.2026')],
+            'metadata': {'data_sources': {}},
+        })
+        view = self._uploaded_json('data/today.json')
+        self.assertEqual((len(view['current_lessons']), len(view['upcoming_lessons'])), (0, 1))
+        uploads = self.mock_s3.put_object.call_count
+
+        # Nothing started or ended: no upload
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 9, 30, tzinfo=PRAGUE)
+        result = self.processor.rerender('test-bucket')
+        self.assertEqual(result, {'current_lessons': 0, 'upcoming_lessons': 1, 'uploaded': 0, 'displays_rebuilt': 0})
+        self.assertEqual(self.mock_s3.put_object.call_count, uploads)
+
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 5, tzinfo=PRAGUE)
+        result = self.processor.rerender('test-bucket')
+
+        self.assertEqual(result, {'current_lessons': 1, 'upcoming_lessons': 0, 'uploaded': 1, 'displays_rebuilt': 0})
+        # No version and no pointer swap: displays polling the pointer keep their 304s
+        self.assertEqual(self._put_keys()[uploads:], ['data/today.json.gz', 'data/today.json'])
+        view = self._uploaded_json('data/today.json')
+        self.assertEqual(view['date'], '2026-01-28')
+        self.assertEqual(view['current_lessons'][0]['start'], '10:00')
+        self.assertEqual(view['upcoming_lessons'], [])
+
+        # Next day without lessons: the view is emptied
+        mock_datetime.now.return_value = datetime(2026, 1, 30, 9, 0, tzinfo=PRAGUE)
+        result = self.processor.rerender('test-bucket')
+        self.assertEqual(result, {'current_lessons': 0, 'upcoming_lessons': 0, 'uploaded': 1, 'displays_rebuilt': 0})
+        self.assertEqual(self._uploaded_json('data/today.json')['date'], '2026-01-30')
+
+    @patch('processors.output.datetime')
+    def test_display_payloads(self, mock_datetime):
+        """Test that each registered display gets today's lessons of its location and levels."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 8, 0, tzinfo=PRAGUE)
+        self._serve_uploads()
+        data = {
+            'config': {
+                'website_bucket': 'test-bucket',
+                'ui_translations': {'de': {'no_lessons': 'Keine Kurse'}},
+                'dictionaries': {'locations': {'Stone bar': {'de': 'Stone Bar'}}},
+                'enrichment': {'displays': [
+                    {'id': 'stone-bar', 'location': 'Stone bar', 'levels': ['dětská školka'], 'language': 'de'},
+                    {'id': 'lanovka', 'location': 'Lanovka', 'language': 'en'},
+                    {'id': 'Bad ID!', 'location': 'Lanovka'},
+                ]},
+            },
+            'lessons': [
+                self._make_lesson(),
+                self._make_lesson(start='09:00', level_key='začátečník'),
+                self._make_lesson(start='11:00', location_key='Lanovka'),
+                self._make_lesson(date='29.01.2026'),
+            ],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        stone_bar = self._uploaded_json(self._version_key('display.stone-bar'))
+        self.assertEqual(stone_bar['date'], '28.01.2026')
+        self.assertEqual([l['start'] for l in stone_bar['lessons']], ['10:00'])
+        self.assertEqual(stone_bar['lessons'][0]['location'], 'Stone Bar')
+        self.assertEqual(stone_bar['ui'], {'no_lessons': 'Keine Kurse'})
+        self.assertEqual(stone_bar['timeline']['ids'], [stone_bar['lessons'][0]['id']])
+
+        lanovka_key = self._version_key('display.lanovka')
+        lanovka = self._uploaded_json(lanovka_key)
+        self.assertEqual([l['location_key'] for l in lanovka['lessons']], ['Lanovka'])
+        self.assertEqual(lanovka['lang'], 'en')  # Not prerendered: client translates
+        self.assertNotIn('ui', lanovka)
+        self.assertIn(lanovka_key + '.gz', self._put_keys())
+        self.assertEqual(self._uploaded_json('data/current.json')['displays'], {
+            'stone-bar': self._version_key('display.stone-bar'),
+            'lanovka': lanovka_key,
+        })
+        self.assertEqual(result['metadata']['output']['displays'], {'written': 2, 'unchanged': 0})
+
+        # Same content on the next run: nothing rewritten
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 8, 5, tzinfo=PRAGUE)
+        result = self.processor.process(data)
+        self.assertEqual(result['metadata']['output']['displays'], {'written': 0, 'unchanged': 2})
+
+    def _display_data(self):
+        """Pipeline data registering two displays, with lessons on 28. and 29.01."""
+        return {
+            'config': {
+                'website_bucket': 'test-bucket',
+                'ui_translations': {'de': {'no_lessons': 'Keine Kurse'}},
+                'dictionaries': {'locations': {'Stone bar': {'de': 'Stone Bar'}}},
+                'enrichment': {'displays': [
+                    {'id': 'stone-bar', 'location': 'Stone bar', 'levels': ['dětská školka'], 'language': 'de'},
+                    {'id': 'all', 'language': 'en'},
+                ]},
+            },
+            'lessons': [
+                self._make_lesson(),
+                self._make_lesson(date='29.01.2026', start='09:00'),
+                self._make_lesson(date='29.01.2026', start='11:00', level_key='začátečník'),
+                self._make_lesson(date='29.01.2026', start='12:00', location_key='Lanovka'),
+            ],
+            'metadata': {'data_sources': {}},
+        }
+
+    @patch('processors.output.datetime')
+    def test_rerender_rebuilds_displays_after_midnight(self, mock_datetime):
+        """Test that rerender rebuilds yesterday's display payloads as the pipeline would."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 16, 0, tzinfo=PRAGUE)
+        self._serve_uploads()
+        self.processor.process(self._display_data())
+        pointer = self._uploaded_json('data/current.json')
+        self.assertEqual(pointer['displays_date'], '2026-01-28')
+
+        mock_datetime.now.return_value = datetime(2026, 1, 29, 7, 0, tzinfo=PRAGUE)
+        result = self.processor.rerender('test-bucket')
+
+        self.assertEqual(result['displays_rebuilt'], 2)
+        swapped = self._uploaded_json('data/current.json')
+        self.assertEqual(swapped['displays_date'], '2026-01-29')
+        self.assertEqual(
+            {k: v for k, v in swapped.items() if k not in ('displays', 'displays_date')},
+            {k: v for k, v in pointer.items() if k not in ('displays', 'displays_date')},
+        )
+        stone_bar = self._uploaded_json(swapped['displays']['stone-bar'])
+        self.assertEqual(stone_bar['date'], '29.01.2026')
+        self.assertEqual([l['start'] for l in stone_bar['lessons']], ['09:00'])
+        self.assertEqual(stone_bar['lessons'][0]['location'], 'Stone Bar')
+        self.assertEqual(stone_bar['ui'], {'no_lessons': 'Keine Kurse'})
+        everything = self._uploaded_json(swapped['displays']['all'])
+        self.assertEqual([l['start'] for l in everything['lessons']], ['09:00', '11:00', '12:00'])
+        self.assertNotIn('ui', everything)
+
+        # Rebuilt once per day
+        uploads = self.mock_s3.put_object.call_count
+        mock_datetime.now.return_value = datetime(2026, 1, 29, 7, 1, tzinfo=PRAGUE)
+        self.assertEqual(self.processor.rerender('test-bucket')['displays_rebuilt'], 0)
+        self.assertEqual(self.mock_s3.put_object.call_count, uploads)
+
+        # The next pipeline run produces the same payloads
+        result = self.processor.process(self._display_data())
+        self.assertEqual(result['metadata']['output']['displays'], {'written': 0, 'unchanged': 2})
+
+    @patch('processors.output.datetime')
+    def test_pointer_swap_is_conditional(self, mock_datetime):
+        """Test that the pointer is swapped with If-None-Match first and If-Match on the read ETag after."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        objects = self._serve_uploads()
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        etag = objects['data/current.json']['ETag']
+
+        data['lessons'] = [self._make_lesson(notes='Meet at the lift')]
+        self.processor.process(data)
+
+        swaps = [c[1] for c in self.mock_s3.put_object.call_args_list if c[1]['Key'] == 'data/current.json']
+        self.assertEqual(swaps[0]['IfNoneMatch'], '*')
+        self.assertEqual(swaps[1]['IfMatch'], etag)
+
+    @patch('processors.output.datetime')
+    def test_pointer_swap_retries_over_older_writer(self, mock_datetime):
+        """Test that a run losing the race to an older pointer (e.g. the re-render) retries."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        objects = self._serve_uploads()
+        data = {
+            'config': {'website_bucket': 'test-bucket'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+        self.processor.process(data)
+        older = json.loads(objects['data/current.json']['Body'])['generated_at']
+
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 35, tzinfo=PRAGUE)
+        data['lessons'] = [self._make_lesson(notes='Meet at the lift')]
+        race = self._racing_pointer(objects, generated_at=older, displays_date='2026-01-29')
+        race.original = self.processor._upload_schedule
+        with patch.object(self.processor, '_upload_schedule', side_effect=race):
+            result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['pointer_swapped'], 1)
+        conditional = [
+            c[1] for c in self.mock_s3.put_object.call_args_list
+            if c[1]['Key'] == 'data/current.json' and 'IfMatch' in c[1]
+        ]
+        self.assertEqual(len(conditional), 2)  # Lost the race once, then retried on the new ETag
+        pointer = json.loads(objects['data/current.json']['Body'])
+        self.assertEqual(pointer['schedule'], self._version_key('schedule'))
+        self.assertEqual(pointer['generated_at'], datetime(2026, 1, 28, 10, 35, tzinfo=PRAGUE).isoformat())
+
+    @patch('processors.output.datetime')
+    def test_pointer_swap_skipped_for_newer_writer(self, mock_datetime):
+        """Test that a run losing the race to a newer pipeline run leaves its pointer and mutable documents."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 10, 30, tzinfo=PRAGUE)
+        objects = self._serve_uploads()
+        data = self._display_data()
+        self.processor.process(data)
+        mutable = {
+            key: objects[key]['Body']
+            for key in ('data/today.json', 'data/schedule.json', 'data/manifest.json', 'data/displays/stone-bar.json')
+        }
+        self.mock_s3.list_objects_v2.reset_mock()
+
+        data['lessons'][0]['notes'] = 'Meet at the lift'
+        race = self._racing_pointer(objects, generated_at='2099-01-01T00:00:00+00:00')
+        race.original = self.processor._upload_schedule
+        with patch.object(self.processor, '_upload_schedule', side_effect=race):
+            result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['output']['superseded'], 1)
+        self.assertEqual(result['metadata']['output']['pointer_swapped'], 0)
+        pointer = json.loads(objects['data/current.json']['Body'])
+        self.assertEqual(pointer['generated_at'], '2099-01-01T00:00:00+00:00')
+        self.assertNotEqual(pointer['schedule'], self._version_key('schedule'))
+        # Today view, legacy documents and version cleanup are left to the newer run
+        self.assertEqual({key: objects[key]['Body'] for key in mutable}, mutable)
+        self.mock_s3.list_objects_v2.assert_not_called()
+        self.mock_s3.delete_objects.assert_not_called()
+
+    @patch('processors.output.datetime')
+    def test_rerender_swap_skipped_after_pipeline_run(self, mock_datetime):
+        """Test that the re-render's display rebuild doesn't overwrite a pointer a pipeline run swapped."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 16, 0, tzinfo=PRAGUE)
+        objects = self._serve_uploads()
+        self.processor.process(self._display_data())
+
+        mock_datetime.now.return_value = datetime(2026, 1, 29, 7, 0, tzinfo=PRAGUE)
+        newer = datetime(2026, 1, 29, 7, 0, 30, tzinfo=PRAGUE).isoformat()
+        race = self._racing_pointer(objects, generated_at=newer)
+        race.original = self.processor._put_display
+        with patch.object(self.processor, '_put_display', side_effect=race):
+            self.processor.rerender('test-bucket')
+
+        pointer = json.loads(objects['data/current.json']['Body'])
+        self.assertEqual(pointer['generated_at'], newer)
+        self.assertEqual(pointer['displays_date'], '2026-01-28')
+
+    @patch('processors.output.datetime')
+    def test_legacy_documents_kept_in_sync(self, mock_datetime):
+        """Test that the mutable keys of pre-pointer clients are still written, only when changed."""
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 16, 0, tzinfo=PRAGUE)
+        self._serve_uploads()
+        result = self.processor.process(self._display_data())
+
+        self.assertEqual(result['metadata']['output']['legacy_written'], 5)  # 3 documents, 2 displays
+        pointer = self._uploaded_json('data/current.json')
+        self.assertEqual(self._uploaded_json('data/manifest.json'), self._uploaded_json(pointer['manifest']))
+        self.assertEqual(self._uploaded_json('data/schedule.json'), self._uploaded_json(pointer['schedule']))
+        self.assertEqual(
+            self._uploaded_json('data/feed.json'),
+            {'seq': pointer['seq'], 'min_seq': pointer['min_seq'], 'generated_at': pointer['generated_at']},
+        )
+        self.assertEqual(
+            self._uploaded_json('data/displays/stone-bar.json'),
+            self._uploaded_json(pointer['displays']['stone-bar']),
+        )
+        self.assertIn('data/displays/stone-bar.json.gz', self._put_keys())
+        self.assertNotIn('data/manifest.json.gz', self._put_keys())
+
+        # Unchanged content: nothing rewritten
+        uploads = self.mock_s3.put_object.call_count
+        mock_datetime.now.return_value = datetime(2026, 1, 28, 16, 5, tzinfo=PRAGUE)
+        result = self.processor.process(self._display_data())
+        self.assertEqual(result['metadata']['output']['legacy_written'], 0)
+        self.assertEqual(self.mock_s3.put_object.call_count, uploads)
+
+    def test_rerender_without_published_schedule(self):
+        """Test that rerender does nothing before the first pipeline run."""
+        result = self.processor.rerender('test-bucket')
+
+        self.assertEqual(result['uploaded'], 0)
+        self.mock_s3.put_object.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -10,7 +10,11 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.parse_instructors import ParseInstructorsProcessor, get_instructor_for_booking
+from processors.parse_instructors import (
+    ParseInstructorsProcessor,
+    build_booking_index,
+    get_instructor_for_booking,
+)
 
 
 SAMPLE_ROSTER = {
@@ -131,6 +135,21 @@ class TestParseInstructorsProcessor(unittest.TestCase):
         instructor = get_instructor_for_booking({}, 'any-booking')
         self.assertIsNone(instructor)
 
+    def test_build_booking_index(self):
+        """Test that the booking index agrees with get_instructor_for_booking."""
+        instructors_data = {
+            'roster': SAMPLE_ROSTER,
+            'profiles': SAMPLE_PROFILES
+        }
+
+        index = build_booking_index(instructors_data)
+
+        for booking_id, instructor_id in index.items():
+            instructor = get_instructor_for_booking(instructors_data, booking_id)
+            self.assertEqual(instructor['id'], instructor_id)
+        self.assertEqual(index['2405020a-b5a4-469e-81ab-18713fc5198a'], 'jan-novak')
+        self.assertEqual(build_booking_index({}), {})
+
 
 if __name__ == '__main__':
     unittest.main()
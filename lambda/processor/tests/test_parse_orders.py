@@ -132,6 +132,52 @@ class TestParseOrdersProcessor(unittest.TestCase):
             for field in required_fields:
                 self.assertIn(field, order, f"Missing field: {field}")
 
+    def test_epoch_minutes_parsed(self):
+        """Test that lesson timestamps are converted to epoch minutes."""
+        self._mock_s3_response(SAMPLE_TSV)
+
+        data = {
+            'trigger': {'bucket': 'test-bucket', 'key': 'orders/test.tsv'},
+            'raw': {'orders': [], 'instructors': {}, 'overrides': []},
+            'metadata': {'data_sources': {}, 'processing_errors': []},
+        }
+
+        result = self.processor.process(data)
+        order = result['raw']['orders'][0]
+
+        # 2025-12-28T09:00:00+01:00 == 2025-12-28T08:00:00Z
+        self.assertEqual(order['start_min'], 29448480)
+        self.assertEqual(order['end_min'] - order['start_min'], 110)
+
+    def test_rejects_unparseable_rows(self):
+        """Test that rows with bad timestamps are rejected and counted per reason."""
+        rows = SAMPLE_TSV.splitlines()
+        bad_start = rows[1].replace('2025-12-28T09:00:00+01:00', '2025-12-28T25:00:00+01:00')
+        bad_end = rows[2].replace('2025-12-28T10:50:00+01:00', 'soon')
+        self._mock_s3_response('\n'.join([rows[0], bad_start, bad_end, rows[3], rows[4]]))
+
+        data = {
+            'trigger': {'bucket': 'test-bucket', 'key': 'orders/test.tsv'},
+            'raw': {'orders': [], 'instructors': {}, 'overrides': []},
+            'metadata': {'data_sources': {}, 'processing_errors': []},
+        }
+
+        with patch('processors.parse_orders.emit_metrics') as emit:
+            result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['rows_rejected'], {
+            'invalid_date': 1,
+            'invalid_start_time': 1,
+            'invalid_end_time': 1,
+        })
+        emit.assert_called_once()
+        self.assertEqual(emit.call_args.kwargs['dimensions'], {'Stage': 'ParseOrders'})
+
+        # Only the valid row became a lesson
+        orders = result['raw']['orders']
+        self.assertEqual(len(orders), 1)
+        self.assertEqual([p['name'] for p in orders[0]['people']], ['Gerda'])
+
 
 if __name__ == '__main__':
     unittest.main()
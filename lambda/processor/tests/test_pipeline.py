@@ -0,0 +1,84 @@
+"""
+Tests for Pipeline.
+"""
+
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline import PipelineBuilder
+from processors import Processor, ProcessorError
+
+
+class RecordingProcessor(Processor):
+    """Appends its name to data['ran'], optionally failing."""
+
+    def __init__(self, label, fail=False):
+        self.label = label
+        self.fail = fail
+
+    @property
+    def name(self):
+        return self.label
+
+    def process(self, data):
+        if self.fail:
+            raise ProcessorError(self.name, 'table throttled')
+        data['ran'].append(self.name)
+        return data
+
+
+class TestPipeline(unittest.TestCase):
+    """Tests for Pipeline."""
+
+    def _data(self):
+        return {'ran': [], 'metadata': {'processing_errors': []}}
+
+    def test_runs_in_order(self):
+        """Test that processors run in sequence, write-behind last."""
+        pipeline = (PipelineBuilder()
+            .add_write_behind(RecordingProcessor('storage'))
+            .add(RecordingProcessor('parse'))
+            .add(RecordingProcessor('output'))
+            .build())
+
+        result = pipeline.run(self._data())
+
+        self.assertEqual(result['ran'], ['parse', 'output', 'storage'])
+        self.assertEqual(result['metadata']['write_behind'], {'storage': 'ok'})
+
+    def test_write_behind_failure_reported(self):
+        """Test that a failing write-behind processor does not fail the run."""
+        pipeline = (PipelineBuilder()
+            .add(RecordingProcessor('output'))
+            .add_write_behind(RecordingProcessor('storage', fail=True))
+            .build())
+
+        result = pipeline.run(self._data())
+
+        self.assertEqual(result['ran'], ['output'])
+        self.assertEqual(result['metadata']['write_behind'], {'storage': 'failed'})
+        self.assertEqual(
+            result['metadata']['processing_errors'],
+            [{'processor': 'storage', 'error': 'table throttled'}],
+        )
+
+    def test_chain_failure_raises(self):
+        """Test that a failing chain processor fails the run before write-behind."""
+        storage = RecordingProcessor('storage')
+        pipeline = (PipelineBuilder()
+            .add(RecordingProcessor('output', fail=True))
+            .add_write_behind(storage)
+            .build())
+
+        data = self._data()
+        with self.assertRaises(ProcessorError):
+            pipeline.run(data)
+
+        self.assertEqual(data['ran'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.privacy import PrivacyProcessor
+from processors.privacy import PrivacyProcessor, abbreviate_sponsor, abbreviate_sponsors
 
 
 class TestPrivacyProcessor(unittest.TestCase):
@@ -133,6 +133,41 @@ class TestPrivacyProcessor(unittest.TestCase):
         names = [p['name'] for p in result['lessons'][0]['people']]
         self.assertEqual(names, ['Vera', 'Eugen'])
 
+    def test_abbreviate_sponsors_batch(self):
+        """Test batch abbreviation of distinct sponsor names."""
+        result = abbreviate_sponsors(['Iryna Schröder', 'Madonna', 'Iryna Schröder', ''])
+
+        self.assertEqual(result, {
+            'Iryna Schröder': 'Ir.Sc.',
+            'Madonna': 'Ma.',
+            '': '',
+        })
+
+    def test_sponsor_abbreviation_memoized(self):
+        """Test that repeated sponsors are served from the cache."""
+        abbreviate_sponsor.cache_clear()
+        people = [
+            {'name': f'Child{i}', 'language': 'de', 'sponsor': 'Iryna Schröder'}
+            for i in range(3)
+        ]
+        lessons = [self._make_lesson(sponsor='Iryna Schröder', people=list(people))
+                   for _ in range(2)]
+
+        result = self.processor.process({'lessons': lessons, 'metadata': {}})
+        again = self.processor.process({
+            'lessons': [self._make_lesson(sponsor='Iryna Schröder', people=list(people))],
+            'metadata': {},
+        })
+
+        first = result['metadata']['privacy']
+        stats = again['metadata']['privacy']
+        self.assertEqual(first['unique_sponsors'], 1)
+        self.assertEqual((first['cache_misses'], first['cache_hits'], first['cache_added']), (1, 0, 1))
+
+        # Second run (same warm cache): only its own lookups are counted
+        self.assertEqual((stats['cache_misses'], stats['cache_hits'], stats['cache_added']), (0, 1, 0))
+        self.assertEqual(again['lessons'][0]['people'][2]['sponsor'], 'Ir.Sc.')
+
     def test_empty_lessons(self):
         """Test with empty lessons list."""
         data = {
@@ -0,0 +1,191 @@
+"""
+Tests for ScheduleReader.
+"""
+
+import unittest
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compaction import compact_date
+from schedule_reader import ScheduleReader
+from processors.storage import StorageProcessor
+from tests.fake_dynamodb import FakeResource, FakeTable
+
+
+RUNS = ['2026-01-29T08:10:00Z', '2026-01-29T08:40:00Z', '2026-01-29T09:20:00Z']
+
+
+def make_lesson(start, **overrides):
+    """Create a private lesson on 28.12.2025."""
+    hour, minute = int(start[:2]), int(start[3:])
+    lesson = {
+        'order_id': f'order-{start}',
+        'booking_id': f'booking-{start}',
+        'date': '28.12.2025',
+        'start': start,
+        'end': f'{hour + 1:02d}:{minute:02d}',
+        'start_min': 29448420 + hour * 60 + minute,
+        'end_min': 29448480 + hour * 60 + minute,
+        'level_key': 'dětská školka',
+        'group_type_key': 'privát',
+        'location_key': 'Stone bar',
+        'people': [{'name': 'Vera', 'language': 'de', 'sponsor': 'Ir.Sc.'}],
+        'people_count': 1,
+        'instructor': {'id': 'jan-novak', 'name': 'Jan Novák', 'photo': 'x.jpg'},
+        'notes': None,
+    }
+    lesson.update(overrides)
+    return lesson
+
+
+# Lessons per run: 09:00 never changes, 11:00 changes, 13:00 removed in run 2
+SEASON = [
+    [make_lesson('09:00'), make_lesson('11:00', notes='run 0'), make_lesson('13:00')],
+    [make_lesson('09:00'), make_lesson('11:00', notes='run 1'), make_lesson('13:00')],
+    [make_lesson('09:00'), make_lesson('11:00', notes='run 2')],
+]
+
+
+class TestScheduleReader(unittest.TestCase):
+    """Tests for ScheduleReader against the in-memory table."""
+
+    layout = 'items'
+
+    def setUp(self):
+        """Store three runs."""
+        self.resource = FakeResource(FakeTable(page_size=2))
+        for ts, lessons in zip(RUNS, SEASON):
+            StorageProcessor(
+                dynamodb_resource=self.resource, timestamp_override=ts, layout=self.layout,
+            ).process({
+                'config': {'data_table': 'test-table'},
+                'lessons': [dict(l) for l in lessons],
+                'metadata': {'data_sources': {}},
+            })
+        self.reader = ScheduleReader('test-table', dynamodb_resource=self.resource)
+
+    def _expected(self, run):
+        """Stored form of the lessons of a run."""
+        processor = StorageProcessor(dynamodb_resource=self.resource)
+        return [
+            {'lesson_id': processor._generate_lesson_id(l), **processor._prepare_lesson_item(l)}
+            for l in SEASON[run]
+        ]
+
+    def test_latest_pointer(self):
+        """Test that LATEST points at the last run."""
+        self.assertEqual(self.reader.get_latest_version('28.12.2025'), RUNS[-1])
+
+    def test_latest_pointer_not_regressed(self):
+        """Test that a slower, older run doesn't move LATEST back."""
+        StorageProcessor(
+            dynamodb_resource=self.resource, timestamp_override='2026-01-29T08:00:00Z',
+            layout=self.layout,
+        ).process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [make_lesson('15:00')],
+            'metadata': {'data_sources': {}},
+        })
+
+        self.assertEqual(self.reader.get_latest_version('28.12.2025'), RUNS[-1])
+
+    def test_get_latest_schedule(self):
+        """Test reading the latest schedule."""
+        schedule = self.reader.get_schedule('28.12.2025')
+
+        self.assertEqual(schedule['version'], RUNS[-1])
+        self.assertEqual(schedule['layout'], self.layout)
+        self.assertEqual(schedule['lessons'], self._expected(2))
+        self.assertIsInstance(schedule['lessons'][0]['start_min'], int)
+
+    def test_get_older_version(self):
+        """Test reading a specific version (unchanged lessons come from older runs)."""
+        schedule = self.reader.get_schedule('28.12.2025', version=RUNS[1])
+
+        self.assertEqual(schedule['lessons'], self._expected(1))
+
+    def test_missing_date(self):
+        """Test that unknown dates and versions return None."""
+        self.assertIsNone(self.reader.get_schedule('01.01.2026'))
+        self.assertIsNone(self.reader.get_schedule('28.12.2025', version='2020-01-01T00:00:00Z'))
+
+    def test_read_after_compaction(self):
+        """Test that the latest schedule survives compaction."""
+        compact_date(self.resource.table, '28.12.2025')
+
+        self.assertEqual(self.reader.get_schedule('28.12.2025')['lessons'], self._expected(2))
+
+    def test_read_without_meta(self):
+        """Test that the latest schedule is read from the manifest once its META is gone."""
+        for ts in RUNS:
+            self.resource.table.delete_item(Key={'PK': 'SCHEDULE#28.12.2025', 'SK': f'META#{ts}'})
+
+        schedule = self.reader.get_schedule('28.12.2025')
+        self.assertEqual(schedule['version'], RUNS[-1])
+        self.assertEqual(schedule['layout'], self.layout)
+        self.assertEqual(schedule['lessons'], self._expected(2))
+        self.assertEqual(
+            self.reader.get_schedule('28.12.2025', version=RUNS[-1])['lessons'], self._expected(2),
+        )
+        self.assertIsNone(self.reader.get_schedule('28.12.2025', version=RUNS[1]))
+
+
+    @patch('schedule_reader.time.sleep')
+    def test_unprocessed_keys_backoff(self, mock_sleep):
+        """Test that unprocessed lesson keys are retried with growing delays."""
+        if self.layout != 'items':
+            self.skipTest('snapshot reads do not batch')
+        batch_get_item = self.resource.batch_get_item
+        calls = []
+
+        def throttled(RequestItems):
+            calls.append(RequestItems)
+            if len(calls) > 2:
+                return batch_get_item(RequestItems=RequestItems)
+            return {'Responses': {}, 'UnprocessedKeys': RequestItems}
+
+        self.resource.batch_get_item = throttled
+        schedule = self.reader.get_schedule('28.12.2025')
+
+        self.assertEqual(schedule['lessons'], self._expected(2))
+        self.assertEqual(
+            [c.args[0] for c in mock_sleep.call_args_list],
+            [ScheduleReader.RETRY_BASE_DELAY, ScheduleReader.RETRY_BASE_DELAY * 2],
+        )
+
+
+class TestScheduleReaderSnapshot(TestScheduleReader):
+    """Same tests for the snapshot layout."""
+
+    layout = 'snapshot'
+
+
+class TestScheduleReaderLegacy(unittest.TestCase):
+    """Versions written before manifests (all lessons under LESSON#{version}#)."""
+
+    def test_query_version(self):
+        """Test that legacy versions are read with a paginated query."""
+        table = FakeTable(page_size=2)
+        resource = FakeResource(table)
+        ts = '2026-01-10T08:00:00Z'
+        pk = 'SCHEDULE#28.12.2025'
+        table.put_item(Item={'PK': pk, 'SK': f'META#{ts}', 'lesson_count': 3})
+        for n, start in enumerate(['09:00', '10:00', '11:00']):
+            table.put_item(Item={'PK': pk, 'SK': f'LESSON#{ts}#id{n}', 'start': start})
+        table.put_item(Item={'PK': pk, 'SK': 'LESSON#2026-01-11T08:00:00Z#id0', 'start': '12:00'})
+
+        schedule = ScheduleReader('test-table', dynamodb_resource=resource).get_schedule(
+            '28.12.2025', version=ts,
+        )
+
+        self.assertEqual(
+            [(l['lesson_id'], l['start']) for l in schedule['lessons']],
+            [('id0', '09:00'), ('id1', '10:00'), ('id2', '11:00')],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
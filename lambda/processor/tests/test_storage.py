@@ -5,11 +5,15 @@ Tests for StorageProcessor.
 import unittest
 from unittest.mock import MagicMock, patch, call
 
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.storage import StorageProcessor
+from processors import ProcessorError
+from processors.storage import StorageProcessor, decode_snapshot, encode_snapshot, load_snapshot
+from tests.fake_dynamodb import FakeResource
 
 
 class TestStorageProcessor(unittest.TestCase):
@@ -21,13 +25,14 @@ class TestStorageProcessor(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures."""
         self.mock_dynamodb = MagicMock()
-        self.mock_table = MagicMock()
-        self.mock_dynamodb.Table.return_value = self.mock_table
+        self.mock_dynamodb.batch_get_item.return_value = {'Responses': {}, 'UnprocessedKeys': {}}
+
+        # Mock low-level client used for all item reads and writes
+        self.mock_client = self.mock_dynamodb.meta.client
+        self.mock_client.batch_write_item.return_value = {'UnprocessedItems': {}}
 
-        # Mock batch writer context manager
-        self.mock_batch = MagicMock()
-        self.mock_table.batch_writer.return_value.__enter__ = MagicMock(return_value=self.mock_batch)
-        self.mock_table.batch_writer.return_value.__exit__ = MagicMock(return_value=False)
+        # No manifest stored yet (first run)
+        self.mock_client.get_item.return_value = {}
 
         # Use fixed timestamp for predictable SK values
         self.processor = StorageProcessor(
@@ -60,6 +65,45 @@ class TestStorageProcessor(unittest.TestCase):
         base.update(overrides)
         return base
 
+    def _batch_items(self):
+        """Items written with batch_write_item (deserialized)."""
+        deserializer = TypeDeserializer()
+        return [
+            {k: deserializer.deserialize(v) for k, v in request['PutRequest']['Item'].items()}
+            for c in self.mock_client.batch_write_item.call_args_list
+            for request in c[1]['RequestItems']['test-table']
+        ]
+
+    def _put_items(self, sk_prefix):
+        """Items written with put_item whose SK starts with sk_prefix (deserialized)."""
+        deserializer = TypeDeserializer()
+        items = [
+            {k: deserializer.deserialize(v) for k, v in c[1]['Item'].items()}
+            for c in self.mock_client.put_item.call_args_list
+        ]
+        return [item for item in items if item['SK'].startswith(sk_prefix)]
+
+    def _stored(self, item):
+        """get_item response for an item (serialized as the client returns it)."""
+        serializer = TypeSerializer()
+        return {'Item': {k: serializer.serialize(v) for k, v in item.items()}}
+
+    def _manifest_for(self, lessons):
+        """Manifest item as a previous run would have written it for lessons."""
+        versions = {}
+        for lesson in lessons:
+            item = self.processor._prepare_lesson_item(lesson)
+            versions[self.processor._generate_lesson_id(lesson)] = {
+                'hash': self.processor._content_hash(item),
+                'version': '2026-01-29T09:00:00Z',
+            }
+        return {
+            'PK': 'SCHEDULE#28.12.2025',
+            'SK': 'MANIFEST',
+            'version': '2026-01-29T09:00:00Z',
+            'lessons': versions,
+        }
+
     def test_stores_lessons(self):
         """Test that lessons are stored in DynamoDB with versioning."""
         data = {
@@ -70,17 +114,23 @@ class TestStorageProcessor(unittest.TestCase):
 
         result = self.processor.process(data)
 
-        # Should have called Table
-        self.mock_dynamodb.Table.assert_called_once_with('test-table')
+        # Should have written to the configured table through the client
+        self.assertTrue(all(
+            c[1]['TableName'] == 'test-table'
+            for c in self.mock_client.put_item.call_args_list
+        ))
+        self.mock_dynamodb.Table.assert_not_called()
 
-        # Should have stored metadata with versioned SK
-        self.mock_table.put_item.assert_called_once()
-        meta_call = self.mock_table.put_item.call_args
-        self.assertEqual(meta_call[1]['Item']['PK'], 'SCHEDULE#28.12.2025')
-        self.assertEqual(meta_call[1]['Item']['SK'], f'META#{self.TEST_TIMESTAMP}')
+        # Should have stored metadata with versioned SK, pointing at the manifest
+        meta_items = self._put_items('META#')
+        self.assertEqual(len(meta_items), 1)
+        self.assertEqual(meta_items[0]['PK'], 'SCHEDULE#28.12.2025')
+        self.assertEqual(meta_items[0]['SK'], f'META#{self.TEST_TIMESTAMP}')
+        self.assertEqual(meta_items[0]['manifest_sk'], 'MANIFEST')
+        self.assertEqual(len(self._put_items('MANIFEST')), 1)
 
         # Should have stored lesson via batch writer
-        self.mock_batch.put_item.assert_called_once()
+        self.assertEqual(len(self._batch_items()), 1)
 
     def test_groups_by_date(self):
         """Test that lessons are grouped by date."""
@@ -97,7 +147,7 @@ class TestStorageProcessor(unittest.TestCase):
         result = self.processor.process(data)
 
         # Should have stored 2 metadata items (one per date)
-        self.assertEqual(self.mock_table.put_item.call_count, 2)
+        self.assertEqual(len(self._put_items('META#')), 2)
 
     def test_metadata_stored(self):
         """Test that correct metadata is stored."""
@@ -112,8 +162,7 @@ class TestStorageProcessor(unittest.TestCase):
 
         self.processor.process(data)
 
-        meta_call = self.mock_table.put_item.call_args
-        item = meta_call[1]['Item']
+        item = self._put_items('META#')[0]
 
         self.assertEqual(item['lesson_count'], 1)
         self.assertEqual(item['data_sources'], {'orders': 'orders-2026.tsv'})
@@ -130,8 +179,7 @@ class TestStorageProcessor(unittest.TestCase):
 
         self.processor.process(data)
 
-        batch_call = self.mock_batch.put_item.call_args
-        item = batch_call[1]['Item']
+        item = self._batch_items()[-1]
 
         self.assertEqual(item['PK'], 'SCHEDULE#28.12.2025')
         self.assertTrue(item['SK'].startswith('LESSON#'))
@@ -163,7 +211,8 @@ class TestStorageProcessor(unittest.TestCase):
         result = self.processor.process(data)
 
         # Should not call DynamoDB
-        self.mock_dynamodb.Table.assert_not_called()
+        self.mock_client.get_item.assert_not_called()
+        self.mock_client.put_item.assert_not_called()
 
     def test_lesson_without_booking_id(self):
         """Test that lessons without booking_id get generated ID."""
@@ -176,8 +225,7 @@ class TestStorageProcessor(unittest.TestCase):
 
         self.processor.process(data)
 
-        batch_call = self.mock_batch.put_item.call_args
-        item = batch_call[1]['Item']
+        item = self._batch_items()[-1]
 
         # Should have versioned SK: LESSON#{timestamp}#{hash}
         self.assertTrue(item['SK'].startswith(f'LESSON#{self.TEST_TIMESTAMP}#'))
@@ -197,8 +245,7 @@ class TestStorageProcessor(unittest.TestCase):
 
         self.processor.process(data)
 
-        batch_call = self.mock_batch.put_item.call_args
-        item = batch_call[1]['Item']
+        item = self._batch_items()[-1]
 
         # Should have versioned SK: LESSON#{timestamp}#{hash}
         self.assertTrue(item['SK'].startswith(f'LESSON#{self.TEST_TIMESTAMP}#'))
@@ -207,6 +254,411 @@ class TestStorageProcessor(unittest.TestCase):
         lesson_id = parts[-1]  # Last part is the hash
         self.assertEqual(len(lesson_id), 16)  # MD5 truncated to 16 chars
 
+    def test_unchanged_lessons_not_written(self):
+        """Test that a date matching its manifest is not written at all."""
+        lessons = [self._make_lesson(), self._make_lesson(start='11:00', end='12:00')]
+        self.mock_client.get_item.return_value = self._stored(self._manifest_for(lessons))
+        data = {
+            'config': {'data_table': 'test-table'},
+            'lessons': lessons,
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        self.mock_client.batch_write_item.assert_not_called()
+        self.mock_client.put_item.assert_not_called()
+        self.assertEqual(result['metadata']['lessons_stored'], 0)
+        self.assertEqual(result['metadata']['storage']['unchanged'], 2)
+
+    def test_writes_only_changed_lessons(self):
+        """Test that only added, changed and removed lessons are written."""
+        kept = self._make_lesson()
+        changed = self._make_lesson(start='11:00', end='12:00')
+        removed = self._make_lesson(start='13:00', end='14:00')
+        self.mock_client.get_item.return_value = self._stored(
+            self._manifest_for([kept, changed, removed])
+        )
+
+        edited = self._make_lesson(start='11:00', end='12:00', notes='Meet at lift')
+        added = self._make_lesson(start='15:00', end='16:00')
+        data = {
+            'config': {'data_table': 'test-table'},
+            'lessons': [kept, edited, added],
+            'metadata': {'data_sources': {}},
+        }
+
+        result = self.processor.process(data)
+
+        stats = result['metadata']['storage']
+        self.assertEqual(
+            (stats['added'], stats['changed'], stats['removed'], stats['unchanged']),
+            (1, 1, 1, 1),
+        )
+
+        written = self._batch_items()
+        self.assertEqual(len(written), 3)
+        tombstones = [item for item in written if item.get('deleted')]
+        self.assertEqual(
+            [t['SK'] for t in tombstones],
+            [f"LESSON#{self.TEST_TIMESTAMP}#{self.processor._generate_lesson_id(removed)}"],
+        )
+
+        # Manifest keeps the old version for the unchanged lesson
+        manifest = self._put_items('MANIFEST')[0]
+        versions = manifest['lessons']
+        self.assertEqual(len(versions), 3)
+        self.assertEqual(
+            versions[self.processor._generate_lesson_id(kept)]['version'],
+            '2026-01-29T09:00:00Z',
+        )
+        self.assertEqual(
+            versions[self.processor._generate_lesson_id(edited)]['version'],
+            self.TEST_TIMESTAMP,
+        )
+        # 2 lesson versions + 1 tombstone, manifest, META, LATEST
+        self.assertEqual(result['metadata']['lessons_stored'], 6)
+
+    def test_retries_concurrent_manifest_update(self):
+        """Test that a conditional-check failure re-reads the manifest."""
+        from botocore.exceptions import ClientError
+
+        conflict = ClientError(
+            {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': ''}},
+            'PutItem',
+        )
+        self.mock_client.put_item.side_effect = [conflict, None, None, None]
+        data = {
+            'config': {'data_table': 'test-table'},
+            'lessons': [self._make_lesson()],
+            'metadata': {'data_sources': {}},
+        }
+
+        self.processor.process(data)
+
+        self.assertEqual(self.mock_client.get_item.call_count, 2)
+        self.assertEqual(len(self._put_items('MANIFEST')), 2)
+
+    def _season(self, dates=30, per_date=30):
+        """Lessons for several dates."""
+        return [
+            self._make_lesson(
+                date=f'{day:02d}.01.2026',
+                start=f'{8 + n // 6:02d}:{(n % 6) * 10:02d}',
+            )
+            for day in range(1, dates + 1)
+            for n in range(per_date)
+        ]
+
+    def test_parallel_dates_match_sequential(self):
+        """Test that parallel workers store the same items as a single worker."""
+        lessons = self._season()
+        tables = []
+        for workers in (1, 8):
+            resource = FakeResource()
+            processor = StorageProcessor(
+                dynamodb_resource=resource,
+                timestamp_override=self.TEST_TIMESTAMP,
+                max_workers=workers,
+            )
+            result = processor.process({
+                'config': {'data_table': 'test-table'},
+                'lessons': [dict(l) for l in lessons],
+                'metadata': {'data_sources': {}},
+            })
+            tables.append(resource.table.items)
+
+            stats = result['metadata']['storage']
+            self.assertEqual(stats['workers'], workers)
+            self.assertEqual(stats['added'], 900)
+            self.assertEqual(stats['dates_written'], 30)
+            # 30 lessons per date -> 2 batches per date
+            self.assertEqual(stats['batch_calls'], 60)
+            self.assertGreater(stats['items_per_second'], 0)
+
+        self.assertEqual(tables[0], tables[1])
+
+    def test_retries_unprocessed_items(self):
+        """Test that unprocessed batch items are retried by the worker."""
+        resource = FakeResource(unprocessed=[3, 1])
+        processor = StorageProcessor(
+            dynamodb_resource=resource,
+            timestamp_override=self.TEST_TIMESTAMP,
+            max_workers=1,
+        )
+        processor.RETRY_BASE_DELAY = 0
+
+        result = processor.process({
+            'config': {'data_table': 'test-table'},
+            'lessons': self._season(dates=1, per_date=10),
+            'metadata': {'data_sources': {}},
+        })
+
+        stats = result['metadata']['storage']
+        self.assertEqual(stats['unprocessed_retries'], 2)
+        self.assertEqual(stats['batch_calls'], 3)
+        lesson_keys = [sk for sk in resource.table.keys() if sk.startswith('LESSON#')]
+        self.assertEqual(len(lesson_keys), 10)
+
+    def test_reports_throttling(self):
+        """Test that throttled writes are retried and reported in metadata."""
+        resource = FakeResource(throttled_calls=2)
+        processor = StorageProcessor(
+            dynamodb_resource=resource,
+            timestamp_override=self.TEST_TIMESTAMP,
+        )
+        processor.RETRY_BASE_DELAY = 0
+
+        with patch('processors.storage.emit_metrics') as emit:
+            result = processor.process({
+                'config': {'data_table': 'test-table'},
+                'lessons': self._season(dates=2, per_date=10),
+                'metadata': {'data_sources': {}},
+            })
+
+        stats = result['metadata']['storage']
+        self.assertEqual(stats['throttles'], 2)
+        self.assertEqual(stats['unprocessed_retries'], 2)
+        self.assertLess(stats['min_concurrency'], 2)
+        self.assertEqual(emit.call_args[0][0]['WriteThrottles'], 2)
+        lesson_keys = [sk for sk in resource.table.keys() if sk.startswith('LESSON#')]
+        self.assertEqual(len(lesson_keys), 20)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that items still unprocessed after all retries fail the run."""
+        resource = FakeResource(unprocessed=[1] * 10)
+        processor = StorageProcessor(
+            dynamodb_resource=resource,
+            timestamp_override=self.TEST_TIMESTAMP,
+        )
+        processor.RETRY_BASE_DELAY = 0
+
+        with self.assertRaises(ProcessorError) as ctx:
+            processor.process({
+                'config': {'data_table': 'test-table'},
+                'lessons': [self._make_lesson()],
+                'metadata': {'data_sources': {}},
+            })
+
+        self.assertIn('unprocessed', str(ctx.exception))
+
+    def test_skips_unchanged_dates_beyond_horizon(self):
+        """Test that final dates are skipped unless their content changed."""
+        resource = FakeResource()
+        lessons = self._season(dates=30, per_date=2)
+        StorageProcessor(
+            dynamodb_resource=resource, timestamp_override='2026-01-29T09:00:00Z',
+        ).process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [dict(l) for l in lessons],
+            'metadata': {'data_sources': {}},
+        })
+
+        # Edit one final date; everything else is unchanged
+        lessons[18]['notes'] = 'moved'  # 10.01.2026
+        processor = StorageProcessor(
+            dynamodb_resource=resource,
+            timestamp_override=self.TEST_TIMESTAMP,
+            horizon_days=1,
+        )
+        with patch.object(resource.table, 'get_item', wraps=resource.table.get_item) as get_item:
+            result = processor.process({
+                'config': {'data_table': 'test-table'},
+                'lessons': lessons,
+                'metadata': {'data_sources': {}},
+            })
+
+        stats = result['metadata']['storage']
+        # 01.-27.01. are final; all but 10.01. are unchanged
+        self.assertEqual(stats['skipped_dates'], 26)
+        self.assertEqual(stats['changed'], 1)
+        self.assertEqual(stats['dates_written'], 1)
+        # Manifests are only read for 10.01. and the dates within the horizon
+        read = sorted({c[1]['Key']['PK'] for c in get_item.call_args_list})
+        self.assertEqual(read, [
+            'SCHEDULE#10.01.2026', 'SCHEDULE#28.01.2026',
+            'SCHEDULE#29.01.2026', 'SCHEDULE#30.01.2026',
+        ])
+        latest = resource.table.get_item(Key={'PK': 'SCHEDULE#10.01.2026', 'SK': 'LATEST'})['Item']
+        self.assertEqual(latest['version'], self.TEST_TIMESTAMP)
+
+    def test_cancelled_date_emptied(self):
+        """Test that a stored date without lessons in the run gets tombstones and an empty manifest."""
+        resource = FakeResource()
+        lessons = [
+            self._make_lesson(date='30.01.2026', booking_id='a'),
+            self._make_lesson(date='31.01.2026', booking_id='b', order_id='only-lesson'),
+        ]
+        StorageProcessor(
+            dynamodb_resource=resource, timestamp_override='2026-01-29T09:00:00Z',
+        ).process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [dict(l) for l in lessons],
+            'metadata': {'data_sources': {}},
+        })
+
+        # The only lesson of 31.01. is cancelled
+        result = StorageProcessor(
+            dynamodb_resource=resource, timestamp_override=self.TEST_TIMESTAMP,
+        ).process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [dict(lessons[0])],
+            'metadata': {'data_sources': {}},
+        })
+
+        stats = result['metadata']['storage']
+        self.assertEqual((stats['emptied_dates'], stats['removed'], stats['dates_written']), (1, 1, 1))
+        pk = 'SCHEDULE#31.01.2026'
+        manifest = resource.table.get_item(Key={'PK': pk, 'SK': 'MANIFEST'})['Item']
+        self.assertEqual((manifest['lessons'], manifest['lesson_count']), ({}, 0))
+        latest = resource.table.get_item(Key={'PK': pk, 'SK': 'LATEST'})['Item']
+        self.assertEqual((latest['version'], latest['lesson_count']), (self.TEST_TIMESTAMP, 0))
+        lesson_id = self.processor._generate_lesson_id(lessons[1])
+        tombstone = resource.table.get_item(Key={'PK': pk, 'SK': f'LESSON#{self.TEST_TIMESTAMP}#{lesson_id}'})
+        self.assertTrue(tombstone['Item']['deleted'])
+
+        # Already empty: nothing more to write
+        writes = resource.table.write_count
+        result = StorageProcessor(
+            dynamodb_resource=resource, timestamp_override='2026-01-29T10:05:00Z',
+        ).process({
+            'config': {'data_table': 'test-table'},
+            'lessons': [dict(lessons[0])],
+            'metadata': {'data_sources': {}},
+        })
+        self.assertEqual(result['metadata']['storage']['emptied_dates'], 0)
+        self.assertEqual(resource.table.write_count, writes)
+
+    def test_today_written_first(self):
+        """Test that today is stored first, then upcoming, then past dates."""
+        self.processor._processing_timestamp = self.TEST_TIMESTAMP
+        order = self.processor._order_dates({
+            '27.01.2026': [], '01.02.2026': [], '29.01.2026': [],
+            '31.12.2025': [], '30.01.2026': [], '28.01.2026': [],
+        })
+        self.assertEqual(list(order), [
+            '29.01.2026', '30.01.2026', '01.02.2026',
+            '28.01.2026', '27.01.2026', '31.12.2025',
+        ])
+
+
+class TestSnapshotLayout(unittest.TestCase):
+    """Tests for the compressed per-date snapshot layout."""
+
+    TEST_TIMESTAMP = '2026-01-29T10:00:00Z'
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.resource = FakeResource()
+        self.mock_s3 = MagicMock()
+        self.processor = StorageProcessor(
+            dynamodb_resource=self.resource,
+            timestamp_override=self.TEST_TIMESTAMP,
+            layout='snapshot',
+            s3_client=self.mock_s3,
+        )
+
+    def _lessons(self, count=40):
+        """Private lessons on one date."""
+        return [
+            {
+                'order_id': f'order-{n}',
+                'booking_id': f'booking-{n}',
+                'date': '28.12.2025',
+                'start': f'{8 + n // 6:02d}:{(n % 6) * 10:02d}',
+                'end': '16:00',
+                'start_min': 29448480 + n * 10,
+                'end_min': 29448480 + n * 10 + 50,
+                'level_key': 'dětská školka',
+                'group_type_key': 'privát',
+                'location_key': 'Stone bar',
+                'people': [{'name': f'Child {n}', 'language': 'de', 'sponsor': 'Te.Pe.'}],
+                'people_count': 1,
+                'instructor': {'id': 'jan-novak', 'name': 'Jan Novák', 'photo': 'x.jpg'},
+                'notes': None,
+            }
+            for n in range(count)
+        ]
+
+    def _data(self, lessons):
+        return {
+            'config': {'data_table': 'test-table', 'input_bucket': 'input-bucket'},
+            'lessons': lessons,
+            'metadata': {'data_sources': {}},
+        }
+
+    def test_encode_decode_roundtrip(self):
+        """Test that snapshot blobs decode to the original items."""
+        items = [{'lesson_id': 'a', 'start': '09:00', 'people': [{'name': 'Ä'}], 'notes': None},
+                 {'lesson_id': 'b', 'start': '10:00', 'people': []}]
+
+        decoded = decode_snapshot(encode_snapshot(items))
+
+        self.assertEqual(decoded[0], items[0])
+        self.assertEqual(decoded[1], {**items[1], 'notes': None})
+
+    def test_one_item_per_date(self):
+        """Test that a date is stored as a single snapshot item."""
+        lessons = self._lessons()
+
+        result = self.processor.process(self._data(lessons))
+
+        table = self.resource.table
+        self.assertEqual(self.resource.meta.client.batch_calls, 0)
+        self.assertEqual(table.keys(), sorted([
+            'LATEST', 'MANIFEST', f'META#{self.TEST_TIMESTAMP}', f'SNAPSHOT#{self.TEST_TIMESTAMP}',
+        ]))
+        manifest = table.get_item(Key={'PK': 'SCHEDULE#28.12.2025', 'SK': 'MANIFEST'})['Item']
+        self.assertEqual(manifest['snapshot_sk'], f'SNAPSHOT#{self.TEST_TIMESTAMP}')
+        self.assertEqual(result['metadata']['storage']['added'], 40)
+
+        snapshot = table.get_item(Key={'PK': 'SCHEDULE#28.12.2025', 'SK': manifest['snapshot_sk']})['Item']
+        stored = load_snapshot(snapshot)
+        self.assertEqual(len(stored), 40)
+        self.assertEqual(stored[3], {
+            'lesson_id': self.processor._generate_lesson_id(lessons[3]),
+            **self.processor._prepare_lesson_item(lessons[3]),
+        })
+
+    def test_unchanged_date_not_written(self):
+        """Test that the snapshot layout also skips unchanged dates."""
+        self.processor.process(self._data(self._lessons()))
+        writes = self.resource.table.write_count
+
+        StorageProcessor(
+            dynamodb_resource=self.resource,
+            timestamp_override='2026-01-29T10:05:00Z',
+            layout='snapshot',
+        ).process(self._data(self._lessons()))
+
+        self.assertEqual(self.resource.table.write_count, writes)
+
+    def test_overflow_to_s3(self):
+        """Test that oversized snapshots are stored in S3."""
+        self.processor.SNAPSHOT_MAX_BYTES = 100
+
+        self.processor.process(self._data(self._lessons()))
+
+        self.mock_s3.put_object.assert_called_once()
+        put = self.mock_s3.put_object.call_args[1]
+        self.assertEqual(put['Bucket'], 'input-bucket')
+        self.assertEqual(put['Key'], f'snapshots/28.12.2025/{self.TEST_TIMESTAMP}.zlib')
+
+        item = self.resource.table.get_item(
+            Key={'PK': 'SCHEDULE#28.12.2025', 'SK': f'SNAPSHOT#{self.TEST_TIMESTAMP}'}
+        )['Item']
+        self.assertNotIn('blob', item)
+
+        body = MagicMock()
+        body.read.return_value = put['Body']
+        self.mock_s3.get_object.return_value = {'Body': body}
+        self.assertEqual(len(load_snapshot(item, s3_client=self.mock_s3)), 40)
+
+    def test_unknown_layout(self):
+        """Test that an unknown layout is rejected."""
+        with self.assertRaises(ValueError):
+            StorageProcessor(dynamodb_resource=self.resource, layout='columns')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,7 +8,13 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from processors.validate import ValidateProcessor
+from unittest.mock import patch
+
+from processors.validate import (
+    REJECTED_SAMPLE_SIZE,
+    ValidateProcessor,
+    compile_schema,
+)
 
 
 class TestValidateProcessor(unittest.TestCase):
@@ -129,6 +135,97 @@ class TestValidateProcessor(unittest.TestCase):
 
         self.assertEqual(len(result['lessons']), 0)
 
+    def test_unicode_digits_rejected(self):
+        """Test that only ASCII digits are accepted in times."""
+        data = {
+            'lessons': [
+                self._make_lesson(start='０９:００'),
+                self._make_lesson(start='09:0²'),
+                self._make_lesson(end='10-50'),
+            ],
+            'metadata': {},
+        }
+
+        result = self.processor.process(data)
+
+        self.assertEqual(len(result['lessons']), 0)
+
+    def test_non_string_times_rejected(self):
+        """Test that unhashable or non-string times are rejected, not raised."""
+        data = {
+            'lessons': [
+                self._make_lesson(start=['09:00']),
+                self._make_lesson(end={'time': '10:50'}),
+                self._make_lesson(start=900),
+            ],
+            'metadata': {},
+        }
+
+        result = self.processor.process(data)
+
+        self.assertEqual(len(result['lessons']), 0)
+        self.assertEqual(
+            result['metadata']['filter_reasons'],
+            {'invalid_start_time': 2, 'invalid_end_time': 1},
+        )
+
+    def test_whitespace_only_field_filtered(self):
+        """Test that whitespace-only required fields count as missing."""
+        data = {
+            'lessons': [self._make_lesson(date='  ')],
+            'metadata': {},
+        }
+
+        result = self.processor.process(data)
+
+        self.assertEqual(result['metadata']['filter_reasons'], {'missing_date': 1})
+
+    def test_compile_schema(self):
+        """Test that schema rules compile to checks with reasons."""
+        schema = compile_schema([('date', 'required'), ('start', 'time')])
+
+        self.assertEqual([(f, r) for f, _, r in schema.checks],
+                         [('date', 'missing_date'), ('start', 'invalid_start_time')])
+        self.assertEqual(schema.validate({'date': 'x', 'start': '23:59'}), (True, ''))
+        self.assertEqual(schema.validate({'date': 'x', 'start': '24:00'}),
+                         (False, 'invalid_start_time'))
+        self.assertEqual(schema.validate({'start': 'bad'}), (False, 'missing_date'))
+
+    def test_rejected_sample_capped(self):
+        """Test that a capped sample of rejected keys goes to metadata."""
+        data = {
+            'lessons': [
+                self._make_lesson(booking_id=f'bad{i}', start='bad')
+                for i in range(REJECTED_SAMPLE_SIZE + 5)
+            ],
+            'metadata': {},
+        }
+
+        result = self.processor.process(data)
+
+        sample = result['metadata']['validation']['rejected_sample']
+        self.assertEqual(len(sample), REJECTED_SAMPLE_SIZE)
+        self.assertEqual(sample[0], {'key': 'bad0', 'reason': 'invalid_start_time'})
+
+    @patch('processors.validate.emit_metrics')
+    def test_reject_metric_emitted(self, mock_emit):
+        """Test that per-reason reject counts are emitted as one metric line."""
+        data = {
+            'lessons': [
+                self._make_lesson(date=''),
+                self._make_lesson(start='bad'),
+                self._make_lesson(start='bad'),
+            ],
+            'metadata': {},
+        }
+
+        self.processor.process(data)
+
+        mock_emit.assert_called_once_with(
+            {'Rejected.missing_date': 1, 'Rejected.invalid_start_time': 2},
+            dimensions={'Stage': 'Validate'},
+        )
+
     def test_mixed_valid_invalid(self):
         """Test with mix of valid and invalid lessons."""
         data = {
@@ -145,6 +242,10 @@ class TestValidateProcessor(unittest.TestCase):
 
         self.assertEqual(len(result['lessons']), 2)
         self.assertEqual(result['metadata']['records_filtered'], 2)
+        self.assertEqual(
+            result['metadata']['filter_reasons'],
+            {'missing_date': 1, 'invalid_start_time': 1},
+        )
         booking_ids = [l['booking_id'] for l in result['lessons']]
         self.assertIn('valid1', booking_ids)
         self.assertIn('valid2', booking_ids)
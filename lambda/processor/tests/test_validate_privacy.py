@@ -0,0 +1,113 @@
+"""
+Tests for ValidatePrivacyProcessor.
+"""
+
+import copy
+import unittest
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.validate import ValidateProcessor
+from processors.privacy import PrivacyProcessor
+from processors.validate_privacy import ValidatePrivacyProcessor
+
+
+class TestValidatePrivacyProcessor(unittest.TestCase):
+    """Tests for ValidatePrivacyProcessor."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.processor = ValidatePrivacyProcessor()
+
+    def _make_lesson(self, **overrides):
+        """Create a valid lesson with optional overrides."""
+        base = {
+            'booking_id': 'test-123',
+            'date': '28.12.2025',
+            'start': '09:00',
+            'end': '10:50',
+            'level_key': 'test',
+            'group_type_key': 'privát',
+            'location_key': 'Stone bar',
+            'people': [
+                {'name': ' Vera ', 'language': 'de', 'sponsor': 'Iryna Schröder'},
+                {'name': 'Eugen', 'language': 'de ', 'sponsor': 'Maria Anna Schmidt'},
+            ],
+            'people_count': 2,
+            'instructor': {'name': 'Test'},
+            'notes': None,
+        }
+        base.update(overrides)
+        return base
+
+    def _mixed_lessons(self):
+        return [
+            self._make_lesson(booking_id='valid1'),
+            self._make_lesson(booking_id='invalid1', date=''),
+            self._make_lesson(booking_id='valid2', sponsor='Jan Li', people=['Legacy', '']),
+            self._make_lesson(booking_id='invalid2', start='bad'),
+            self._make_lesson(booking_id='invalid3', end='10:60'),
+            self._make_lesson(booking_id='valid3', people=[]),
+        ]
+
+    def test_matches_separate_processors(self):
+        """Test that lessons and counters equal Validate + Privacy."""
+        lessons = self._mixed_lessons()
+
+        separate = {'lessons': copy.deepcopy(lessons), 'metadata': {'records_filtered': 1}}
+        separate = PrivacyProcessor().process(ValidateProcessor().process(separate))
+
+        fused = {'lessons': copy.deepcopy(lessons), 'metadata': {'records_filtered': 1}}
+        fused = self.processor.process(fused)
+
+        self.assertEqual(fused['lessons'], separate['lessons'])
+        for key in ('records_filtered', 'filter_reasons'):
+            self.assertEqual(fused['metadata'][key], separate['metadata'][key])
+        self.assertEqual(fused['metadata']['records_filtered'], 4)
+        self.assertEqual(fused['metadata']['filter_reasons'], {
+            'missing_date': 1,
+            'invalid_start_time': 1,
+            'invalid_end_time': 1,
+        })
+
+    def test_people_updated_in_place(self):
+        """Test that person dicts are reused rather than reallocated."""
+        lesson = self._make_lesson()
+        person = lesson['people'][0]
+
+        result = self.processor.process({'lessons': [lesson], 'metadata': {}})
+
+        self.assertIs(result['lessons'][0]['people'][0], person)
+        self.assertEqual(person, {'name': 'Vera', 'language': 'de', 'sponsor': 'Ir.Sc.'})
+
+    def test_lessons_filtered_in_place(self):
+        """Test that the lessons list itself is compacted."""
+        lessons = self._mixed_lessons()
+
+        result = self.processor.process({'lessons': lessons, 'metadata': {}})
+
+        self.assertIs(result['lessons'], lessons)
+        self.assertEqual([l['booking_id'] for l in lessons], ['valid1', 'valid2', 'valid3'])
+
+    def test_legacy_people_converted(self):
+        """Test that legacy string participants become person dicts."""
+        lesson = self._make_lesson(people=['Anna ', None, 'Petr'])
+
+        result = self.processor.process({'lessons': [lesson], 'metadata': {}})
+
+        self.assertEqual(result['lessons'][0]['people'], [
+            {'name': 'Anna', 'language': '', 'sponsor': ''},
+            {'name': 'Petr', 'language': '', 'sponsor': ''},
+        ])
+
+    def test_empty_lessons(self):
+        """Test with empty lessons list."""
+        result = self.processor.process({'lessons': [], 'metadata': {}})
+
+        self.assertEqual(result['lessons'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+GoldSport Scheduler - Time Index
+
+Converts lesson timestamps to integer epoch minutes once, so the rest of the
+pipeline compares integers instead of HH:MM strings. All local times and
+dates are in the resort's timezone (Europe/Prague), which keeps them correct
+across the CET/CEST switch.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# Resort timezone (CET in winter, CEST in summer)
+PRAGUE = ZoneInfo('Europe/Prague')
+
+
+def epoch_minutes(dt: datetime) -> int:
+    """
+    Convert an aware datetime to minutes since the Unix epoch.
+
+    Args:
+        dt: Timezone-aware datetime
+
+    Returns:
+        Whole minutes since 1970-01-01T00:00Z (seconds are truncated)
+    """
+    return int(dt.timestamp()) // 60
+
+
+def to_epoch_minutes(timestamp: str) -> Optional[int]:
+    """
+    Parse an ISO 8601 timestamp into epoch minutes.
+
+    Timestamps without an offset are taken as Prague local time.
+
+    Args:
+        timestamp: ISO timestamp (e.g., "2025-12-28T09:00:00+01:00")
+
+    Returns:
+        Epoch minutes, or None if the timestamp is missing or malformed
+    """
+    if not timestamp:
+        return None
+
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=PRAGUE)
+
+    return epoch_minutes(dt)
+
+
+def local_to_epoch_minutes(date: str, time: str) -> Optional[int]:
+    """
+    Convert a Prague local date and time to epoch minutes.
+
+    Args:
+        date: Date in DD.MM.YYYY format
+        time: Time in HH:MM format
+
+    Returns:
+        Epoch minutes, or None if either value is malformed
+    """
+    try:
+        dt = datetime.strptime(f"{date} {time}", '%d.%m.%Y %H:%M')
+    except (ValueError, TypeError):
+        return None
+
+    return epoch_minutes(dt.replace(tzinfo=PRAGUE))
+
+
+def to_local(minutes: int) -> datetime:
+    """Convert epoch minutes to a Prague local datetime."""
+    return datetime.fromtimestamp(minutes * 60, tz=timezone.utc).astimezone(PRAGUE)
+
+
+def local_time(minutes: int) -> str:
+    """Format epoch minutes as Prague local time (HH:MM)."""
+    return to_local(minutes).strftime('%H:%M')
+
+
+def local_date(minutes: int) -> str:
+    """Format epoch minutes as Prague local date (DD.MM.YYYY)."""
+    return to_local(minutes).strftime('%d.%m.%Y')
@@ -7,7 +7,15 @@
 // Configuration
 const CONFIG = {
     refreshInterval: 60000,  // 60 seconds
-    dataUrl: '/data/schedule.json',
+    idleRefreshInterval: 900000,  // 15 minutes outside operating hours
+    // Operating hours (Europe/Prague) - the fetcher only pulls new orders
+    // 08:00-17:00 (lambda/fetcher/handler.py should_fetch_now)
+    operatingHours: { start: 8, end: 17, timeZone: 'Europe/Prague' },
+    // Pointer to the current immutable versions (short TTL, the only object
+    // that is overwritten): { seq, min_seq, manifest, schedule, displays }
+    currentUrl: '/data/current.json',
+    shardSuffix: '.gz',  // Versions are fetched pre-compressed (Content-Encoding: gzip)
+    feedPrefix: '/data/feed/',   // Deltas: /data/feed/{seq}.json
     configUrl: {
         translations: '/config/ui-translations.json',
         dictionaries: '/config/dictionaries.json',
@@ -15,44 +23,11 @@ const CONFIG = {
     defaultLanguage: 'en',
 };
 
-// Time slot configuration for page rotation
-// Each slot groups lessons by start time, shown as separate pages
-const TIME_SLOTS = [
-    {
-        id: 1,
-        label: '09:00',
-        // Lessons starting 08:00-09:59 belong to this slot
-        startRange: { min: 480, max: 599 },  // minutes from midnight
-        // This slot is "main" (shown longer) when current time is 08:00-09:59
-        mainWindow: { min: 480, max: 599 },
-    },
-    {
-        id: 2,
-        label: '11:00',
-        // Lessons starting 11:00-11:59 belong to this slot
-        startRange: { min: 660, max: 719 },
-        // This slot is "main" when current time is 10:00-11:59
-        mainWindow: { min: 600, max: 719 },
-    },
-    {
-        id: 3,
-        label: '13:00',
-        // Lessons starting 13:00-13:59 belong to this slot
-        startRange: { min: 780, max: 839 },
-        // This slot is "main" when current time is 12:00-13:59
-        mainWindow: { min: 720, max: 839 },
-    },
-    {
-        id: 4,
-        label: '14:30',
-        // Lessons starting 14:30+ belong to this slot
-        startRange: { min: 870, max: 1439 },
-        // This slot is "main" when current time is 14:00-16:59
-        mainWindow: { min: 840, max: 1019 },
-    },
-];
+// Time slots and pages are computed by the processor (OutputProcessor.TIME_SLOTS);
+// each shard carries its page list: { slot, label, main_window, lesson_ids, durations_ms }
+// and the slot table: { slot, label, start_window, main_window } for every slot
 
-// Rotation timing configuration
+// Rotation timing configuration (fallback when a page has no durations_ms)
 const ROTATION_CONFIG = {
     currentDuration: 15000,    // 15 seconds for current/main slot
     previousDuration: 3000,    // 3 seconds for previous slots
@@ -66,8 +41,14 @@ const state = {
     translations: {},
     dictionaries: {},
     schedule: null,
+    edition: '',           // '.{lang}' when the server prerenders our language, else ''
+    seq: null,             // Feed sequence number the loaded shard corresponds to
+    loadedOn: null,        // Today's date (DD.MM.YYYY) when the shard was loaded
     lastUpdate: null,
     refreshTimer: null,
+    validators: {},        // url -> { etag, lastModified } of the last 200 response
+    displayId: null,       // ?display=stone-bar loads that display's payload
+    displayKey: null,      // Version key of the loaded display payload
     debugMode: false,      // ?debug=true shows all lessons
     dateOverride: null,    // ?date=28.01.2026 shows specific date
     timeOverride: null,    // ?time=09:30 simulates specific time
@@ -104,27 +85,26 @@ function getCurrentTimeMinutes() {
     return now.getHours() * 60 + now.getMinutes();
 }
 
-/**
- * Find which time slot a lesson belongs to based on its start time
- * @param {string} startTime - Lesson start time in HH:MM format
- * @returns {object|null} - The matching time slot or null
- */
-function getSlotForLesson(startTime) {
-    const minutes = timeToMinutes(startTime);
-    return TIME_SLOTS.find(slot =>
-        minutes >= slot.startRange.min && minutes <= slot.startRange.max
-    ) || null;
-}
-
 /**
  * Get the "main" slot for the current time (shown longer)
  * @returns {object|null} - The main time slot or null if outside operating hours
  */
 function getMainSlot() {
     const currentMinutes = getCurrentTimeMinutes();
-    return TIME_SLOTS.find(slot =>
-        currentMinutes >= slot.mainWindow.min && currentMinutes <= slot.mainWindow.max
-    ) || null;
+    // Resolve from the slot table, not the pages: the main slot may have no lessons
+    // and the pages around it still need to know whether they are previous or upcoming
+    const slots = (state.schedule && state.schedule.slots) || [];
+    const slot = slots.find(s =>
+        currentMinutes >= s.main_window[0] && currentMinutes <= s.main_window[1]
+    );
+    if (slot) {
+        return { id: slot.slot, label: slot.label };
+    }
+    // Shards published before the slot table: only slots with pages are known
+    const page = state.rotation.pages.find(p =>
+        currentMinutes >= p.slot.mainWindow.min && currentMinutes <= p.slot.mainWindow.max
+    );
+    return page ? page.slot : null;
 }
 
 /**
@@ -138,42 +118,28 @@ function isMainSlot(slot) {
 }
 
 /**
- * Group lessons by time slot for page rotation
- * @param {Array} lessons - Array of lesson objects
- * @returns {Array} - Array of {slot, lessons} objects, only includes slots with lessons
+ * Resolve the shard's precomputed pages to lesson objects
+ * @param {Object} schedule - Loaded shard with lessons and pages
+ * @returns {Array} - Array of {slot, lessons, durations} objects, only pages with lessons
  */
-function groupLessonsBySlot(lessons) {
-    if (!lessons || lessons.length === 0) {
-        return [];
-    }
-
-    // Group lessons by slot
-    const slotGroups = new Map();
-
-    lessons.forEach(lesson => {
-        const slot = getSlotForLesson(lesson.start);
-        if (slot) {
-            if (!slotGroups.has(slot.id)) {
-                slotGroups.set(slot.id, { slot, lessons: [] });
-            }
-            slotGroups.get(slot.id).lessons.push(lesson);
-        } else {
-            // Lesson doesn't fit any slot - add to "other" group
-            // For now, we'll add it to the nearest slot
-            console.warn(`Lesson at ${lesson.start} doesn't fit any time slot`);
-        }
-    });
-
-    // Convert to array and sort by slot ID
-    const pages = Array.from(slotGroups.values())
-        .sort((a, b) => a.slot.id - b.slot.id);
+function buildPages(schedule) {
+    const byId = new Map((schedule.lessons || []).map(lesson => [lesson.id, lesson]));
+
+    const pages = (schedule.pages || [])
+        .map(page => ({
+            slot: {
+                id: page.slot,
+                label: page.label,
+                mainWindow: { min: page.main_window[0], max: page.main_window[1] },
+            },
+            lessons: page.lesson_ids.map(id => byId.get(id)).filter(Boolean),
+            durations: page.durations_ms || {},
+        }))
+        .filter(page => page.lessons.length > 0);
 
     // Store in state for rotation
     state.rotation.pages = pages;
 
-    console.log(`Grouped ${lessons.length} lessons into ${pages.length} pages:`,
-        pages.map(p => `${p.slot.label}: ${p.lessons.length} lessons`));
-
     return pages;
 }
 
@@ -225,13 +191,13 @@ function scheduleNextRotation() {
     let slotType;
 
     if (isMainSlot(currentPage.slot)) {
-        duration = ROTATION_CONFIG.currentDuration;
+        duration = currentPage.durations.main ?? ROTATION_CONFIG.currentDuration;
         slotType = 'CURRENT';
     } else if (mainSlot && currentPage.slot.id < mainSlot.id) {
-        duration = ROTATION_CONFIG.previousDuration;
+        duration = currentPage.durations.previous ?? ROTATION_CONFIG.previousDuration;
         slotType = 'previous';
     } else {
-        duration = ROTATION_CONFIG.upcomingDuration;
+        duration = currentPage.durations.upcoming ?? ROTATION_CONFIG.upcomingDuration;
         slotType = 'upcoming';
     }
 
@@ -404,6 +370,7 @@ async function init() {
     state.language = urlParams.get('lang') || CONFIG.defaultLanguage;
     // Normalize Czech language code: 'cs' (ISO 639-1) → 'cz' (used in translations)
     if (state.language === 'cs') state.language = 'cz';
+    state.displayId = urlParams.get('display') || null;
     state.debugMode = urlParams.get('debug') === 'true';
     state.dateOverride = urlParams.get('date') || null;
     state.timeOverride = urlParams.get('time') || null;  // e.g., "09:30"
@@ -419,9 +386,8 @@ async function init() {
     updateDateTimeDisplay();
     setInterval(updateDateTimeDisplay, 1000); // Update every second
 
-    // Load configurations and data
+    // Load data (configs only if our language isn't prerendered)
     try {
-        await loadConfigs();
         await loadSchedule();
         startAutoRefresh();
     } catch (error) {
@@ -455,16 +421,168 @@ async function loadConfigs() {
 }
 
 /**
- * Load schedule data from API
+ * Convert DD.MM.YYYY to YYYY-MM-DD (manifest/shard key)
+ */
+function toIsoDate(ddmmyyyy) {
+    const [day, month, year] = ddmmyyyy.split('.');
+    return `${year}-${month}-${day}`;
+}
+
+/**
+ * Today's date in DD.MM.YYYY format
+ */
+function todayString() {
+    const now = new Date();
+    return `${now.getDate().toString().padStart(2, '0')}.${(now.getMonth() + 1).toString().padStart(2, '0')}.${now.getFullYear()}`;
+}
+
+/**
+ * Pick the date to show (DD.MM.YYYY) from the manifest's dates
+ */
+function resolveTargetDate(dates) {
+    // When user explicitly selects a date, show empty state if no data
+    if (state.dateOverride) return state.dateOverride;
+
+    const today = todayString();
+
+    // Fall back to first available date if today has no lessons
+    const first = Object.keys(dates).sort()[0];
+    if (!dates[toIsoDate(today)] && first) {
+        return dates[first].date;
+    }
+    return today;
+}
+
+/**
+ * Conditional GET: sends the validators of the last 200 for this URL.
+ * Returns null on 304 Not Modified, so the caller can skip parsing and
+ * re-rendering. cache: 'no-store' keeps the browser from answering from its
+ * own cache (which would turn the 304 into a 200 with the old body).
+ */
+async function fetchIfChanged(url) {
+    const validators = state.validators[url] || {};
+    const headers = {};
+    if (validators.etag) headers['If-None-Match'] = validators.etag;
+    if (validators.lastModified) headers['If-Modified-Since'] = validators.lastModified;
+
+    const response = await fetch(url, { headers, cache: 'no-store' });
+    if (response.status === 304) {
+        return null;
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    state.validators[url] = {
+        etag: response.headers.get('ETag'),
+        lastModified: response.headers.get('Last-Modified'),
+    };
+    return response;
+}
+
+/**
+ * Fetch an immutable version (data/v/...) by its key. Versions never change,
+ * so the browser and CloudFront may answer from cache.
+ */
+async function fetchVersion(key) {
+    const response = await fetch(`/${key}${CONFIG.shardSuffix}`);
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    return response.json();
+}
+
+/**
+ * Load the payload of a registered display (today's lessons of its meeting
+ * point, levels and language). Conditional: a 304 on the pointer, or a
+ * pointer still referencing the same payload version, keeps the current view.
+ */
+async function loadDisplay() {
+    if (state.schedule && state.schedule.date !== todayString()) {
+        // Day changed since the payload was loaded: re-check even an unchanged pointer
+        delete state.validators[CONFIG.currentUrl];
+        state.displayKey = null;
+    }
+    const response = await fetchIfChanged(CONFIG.currentUrl);
+    if (!response) {
+        return;
+    }
+    const key = ((await response.json()).displays || {})[state.displayId];
+    if (!key) {
+        throw new Error(`Display ${state.displayId} is not registered`);
+    }
+    if (key === state.displayKey) {
+        return;
+    }
+    const payload = await fetchVersion(key);
+    if (payload.date !== todayString()) {
+        // Built for another day (e.g. yesterday's, until the re-render rebuilds it
+        // after midnight): show no lessons and re-check the pointer on the next poll
+        delete state.validators[CONFIG.currentUrl];
+        state.displayKey = null;
+        state.schedule = { date: todayString(), generated_at: payload.generated_at, lessons: [] };
+        stopRotation();
+        renderSchedule();
+        return;
+    }
+    state.displayKey = key;
+
+    if (payload.lang) {
+        state.language = payload.lang;
+    }
+    if (payload.ui) {
+        state.translations = { [state.language]: payload.ui };
+        applyTranslations();
+    } else if (Object.keys(state.translations).length === 0) {
+        await loadConfigs();
+    }
+
+    state.schedule = payload;
+    state.lastUpdate = new Date();
+
+    stopRotation();
+    renderSchedule();
+    updateLastUpdateTime();
+}
+
+/**
+ * Load schedule data: pointer, manifest, then only the shard of the displayed date
  */
 async function loadSchedule() {
     try {
-        const response = await fetch(CONFIG.dataUrl);
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}`);
+        if (state.displayId) {
+            await loadDisplay();
+            return;
+        }
+
+        const pointerResponse = await fetch(CONFIG.currentUrl);
+        if (!pointerResponse.ok) {
+            throw new Error(`HTTP ${pointerResponse.status}`);
+        }
+        const pointer = await pointerResponse.json();
+        const manifest = await fetchVersion(pointer.manifest);
+        const dates = manifest.dates || {};
+        const targetDate = resolveTargetDate(dates);
+        const entry = dates[toIsoDate(targetDate)];
+
+        // Prerendered language edition (labels and UI texts resolved server-side)
+        state.edition = (manifest.languages || []).includes(state.language) ? `.${state.language}` : '';
+        if (!state.edition && Object.keys(state.translations).length === 0) {
+            await loadConfigs();
         }
 
-        state.schedule = await response.json();
+        let shard = { date: targetDate, generated_at: manifest.generated_at, lessons: [] };
+        if (entry) {
+            shard = await fetchVersion(entry.key.replace(/\.json$/, `${state.edition}.json`));
+        }
+
+        if (shard.ui) {
+            state.translations = { [state.language]: shard.ui };
+            applyTranslations();
+        }
+
+        state.schedule = shard;
+        state.seq = manifest.seq ?? null;
+        state.loadedOn = todayString();
         state.lastUpdate = new Date();
 
         // Stop existing rotation before re-rendering
@@ -473,10 +591,94 @@ async function loadSchedule() {
         updateLastUpdateTime();
     } catch (error) {
         console.error('Failed to load schedule:', error);
+        state.validators = {};  // Next refresh must not trust a 304
         showError('error_loading');
     }
 }
 
+/**
+ * Refresh from the delta feed: fetch only the deltas since state.seq and
+ * patch the loaded lessons. Falls back to a full load when the display is
+ * too far behind, the day changed, or a delta can't be applied.
+ */
+async function refreshSchedule() {
+    if (state.displayId) {
+        await loadSchedule();  // Display payloads are small; conditional GET instead of deltas
+        return;
+    }
+    try {
+        if (state.seq === null || state.loadedOn !== todayString()) {
+            await loadSchedule();
+            return;
+        }
+
+        const response = await fetchIfChanged(CONFIG.currentUrl);
+        if (!response) {
+            return;  // 304: pointer unchanged, nothing to parse or render
+        }
+        const head = await response.json();
+
+        if (head.min_seq > state.seq + 1) {
+            await loadSchedule();
+            return;
+        }
+        if (head.seq <= state.seq) {
+            return;  // Nothing changed
+        }
+
+        const isoDate = toIsoDate(state.schedule.date);
+        const todayIso = toIsoDate(todayString());
+        const lessons = new Map(state.schedule.lessons.map(lesson => [lesson.id, lesson]));
+        let pages = state.schedule.pages;
+        let changed = false;
+
+        for (let seq = state.seq + 1; seq <= head.seq; seq++) {
+            const deltaResponse = await fetch(`${CONFIG.feedPrefix}${seq}${state.edition}.json${CONFIG.shardSuffix}`);
+            if (!deltaResponse.ok) {
+                throw new Error(`HTTP ${deltaResponse.status}`);
+            }
+            const dates = (await deltaResponse.json()).dates || {};
+
+            // Showing a fallback date and today got lessons: switch to today
+            if (!state.dateOverride && isoDate !== todayIso && dates[todayIso]) {
+                await loadSchedule();
+                return;
+            }
+
+            const change = dates[isoDate];
+            if (!change) continue;
+            if (change.full) {
+                await loadSchedule();
+                return;
+            }
+            (change.remove || []).forEach(id => lessons.delete(id));
+            Object.entries(change.upsert || {}).forEach(([id, lesson]) => lessons.set(id, lesson));
+            if (lessons.size !== change.count) {
+                await loadSchedule();  // Missed an update; resync
+                return;
+            }
+            pages = change.pages || pages;
+            changed = true;
+        }
+
+        state.seq = head.seq;
+        state.lastUpdate = new Date();
+        if (!changed) return;
+
+        state.schedule.lessons = [...lessons.values()].sort((a, b) => a.start.localeCompare(b.start));
+        state.schedule.pages = pages;
+        state.schedule.generated_at = head.generated_at;
+
+        stopRotation();
+        renderSchedule();
+        updateLastUpdateTime();
+    } catch (error) {
+        console.error('Failed to refresh from feed:', error);
+        delete state.validators[CONFIG.currentUrl];
+        await loadSchedule();
+    }
+}
+
 /**
  * Day names for date display
  */
@@ -546,30 +748,11 @@ function translateValue(value, category) {
 function renderSchedule() {
     if (!state.schedule) return;
 
-    const allByDate = state.schedule.all_lessons_by_date || {};
-    const dates = Object.keys(allByDate).sort();
-
-    // Determine which date to show
-    let targetDate = state.dateOverride;
-    if (!targetDate) {
-        // Use today's date in DD.MM.YYYY format
-        const now = new Date();
-        targetDate = `${now.getDate().toString().padStart(2, '0')}.${(now.getMonth() + 1).toString().padStart(2, '0')}.${now.getFullYear()}`;
-    }
-
-    // Only fall back to first available date if no date override specified
-    // When user explicitly selects a date, show empty state if no data
-    if (!state.dateOverride && !allByDate[targetDate] && dates.length > 0) {
-        targetDate = dates[0];
-    }
-
-    const lessons = targetDate ? (allByDate[targetDate] || []) : [];
-
     // Store targetDate in state for title updates
-    state.targetDate = targetDate;
+    state.targetDate = state.schedule.date;
 
-    // Group lessons by time slot for page rotation
-    const pages = groupLessonsBySlot(lessons);
+    // Precomputed time slot pages of the loaded shard
+    buildPages(state.schedule);
 
     // Reset rotation to first page when schedule changes
     state.rotation.currentPageIndex = 0;
@@ -679,16 +862,18 @@ function renderLessons(containerId, lessons, emptyMessageKey) {
         const timeRange = `${lesson.start || '--:--'}-${lesson.end || '--:--'}`;
         card.querySelector('.lesson-time').textContent = timeRange;
 
+        // Labels prerendered by the server; translate locally only for the
+        // language-neutral shard
         // Group type (privát, malá skupina, velká skupina)
         card.querySelector('.lesson-group-type').textContent =
-            translateValue(lesson.group_type_key, 'group_types');
+            lesson.group_type ?? translateValue(lesson.group_type_key, 'group_types');
 
         card.querySelector('.lesson-level').textContent =
-            translateValue(lesson.level_key, 'levels');
+            lesson.level ?? translateValue(lesson.level_key, 'levels');
 
         // Location (translated)
         card.querySelector('.lesson-location').textContent =
-            translateValue(lesson.location_key, 'locations');
+            lesson.location ?? translateValue(lesson.location_key, 'locations');
 
         // Participants - sorted by sponsor, then name
         const participantList = card.querySelector('.participant-list');
@@ -749,20 +934,35 @@ function updateLastUpdateTime() {
     }
 }
 
+/**
+ * Whether new data can appear now (fetcher operating hours, Prague time)
+ */
+function isOperatingHours() {
+    const { start, end, timeZone } = CONFIG.operatingHours;
+    const hour = Number(new Intl.DateTimeFormat('en-GB', { timeZone, hour: '2-digit', hourCycle: 'h23' }).format(new Date()));
+    return hour >= start && hour < end;
+}
+
+/**
+ * Polling interval: every minute in operating hours, backed off outside
+ */
+function nextRefreshInterval() {
+    return isOperatingHours() ? CONFIG.refreshInterval : CONFIG.idleRefreshInterval;
+}
+
 /**
  * Start auto-refresh timer
  */
 function startAutoRefresh() {
     // Clear existing timer
-    if (state.refreshTimer) {
-        clearInterval(state.refreshTimer);
-    }
+    stopAutoRefresh();
 
-    // Set up new timer
-    state.refreshTimer = setInterval(async () => {
+    // Re-armed after every refresh so the interval follows operating hours
+    state.refreshTimer = setTimeout(async () => {
         console.log('Auto-refreshing data...');
-        await loadSchedule();
-    }, CONFIG.refreshInterval);
+        await refreshSchedule();
+        startAutoRefresh();
+    }, nextRefreshInterval());
 }
 
 /**
@@ -770,7 +970,7 @@ function startAutoRefresh() {
  */
 function stopAutoRefresh() {
     if (state.refreshTimer) {
-        clearInterval(state.refreshTimer);
+        clearTimeout(state.refreshTimer);
         state.refreshTimer = null;
     }
 }
@@ -1081,6 +1281,7 @@ if (typeof module !== 'undefined' && module.exports) {
         state,
         init,
         loadSchedule,
+        refreshSchedule,
         changeLanguage,
         translateValue,
         renderSchedule,